@@ -2,12 +2,20 @@
 
 import importlib.metadata
 
+from .connection import (
+    CLI_CONNECTION_PROFILE,
+    SERVICE_CONNECTION_PROFILE,
+    ConnectionProfile,
+)
+from .device_state import DeviceState
+from .dispatch import OverflowPolicy, threaded
 from .error import (
     APIUnavailableError,
     InvalidAuthError,
     ResellerNotExistError,
     SmartboxError,
 )
+from .fleet import FleetUpdateManager
 from .models import (
     AcmNodeStatus,
     DefaultNodeStatus,
@@ -17,11 +25,18 @@ from .models import (
     HtrNodeStatus,
     NodeExtraOptions,
     NodeFactoryOptions,
+    NodeProg,
     NodeSetup,
     NodeStatus,
     SmartboxNodeType,
+    ValidationMode,
+    convert_temperature,
 )
+from .recording import EventRecorder, read_recording, replay
+from .records import NodeStatusRecord
 from .reseller import AvailableResellers, SmartboxReseller
+from .sample_store import SampleStore
+from .samples import ColumnarSamples
 from .session import AsyncSmartboxSession, Session
 from .socket import SocketSession
 from .update_manager import UpdateManager
@@ -30,11 +45,18 @@ __version__ = importlib.metadata.version("smartbox")
 
 
 __all__ = [
+    "CLI_CONNECTION_PROFILE",
+    "SERVICE_CONNECTION_PROFILE",
     "APIUnavailableError",
     "AcmNodeStatus",
     "AsyncSmartboxSession",
     "AvailableResellers",
+    "ColumnarSamples",
+    "ConnectionProfile",
     "DefaultNodeStatus",
+    "DeviceState",
+    "EventRecorder",
+    "FleetUpdateManager",
     "GuestUser",
     "Guests",
     "HtrModNodeStatus",
@@ -42,13 +64,22 @@ __all__ = [
     "InvalidAuthError",
     "NodeExtraOptions",
     "NodeFactoryOptions",
+    "NodeProg",
     "NodeSetup",
     "NodeStatus",
+    "NodeStatusRecord",
+    "OverflowPolicy",
     "ResellerNotExistError",
+    "SampleStore",
     "Session",
     "SmartboxError",
     "SmartboxNodeType",
     "SmartboxReseller",
     "SocketSession",
     "UpdateManager",
+    "ValidationMode",
+    "convert_temperature",
+    "read_recording",
+    "replay",
+    "threaded",
 ]
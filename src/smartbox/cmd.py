@@ -4,9 +4,9 @@ import json
 import logging
 from typing import Any
 
-from aiohttp import ClientSession
 import asyncclick as click
 
+from smartbox.connection import CLI_CONNECTION_PROFILE
 from smartbox.reseller import AvailableResellers
 from smartbox.session import AsyncSmartboxSession
 from smartbox.socket import SocketSession
@@ -61,7 +61,7 @@ async def smartbox(
         basic_auth_credentials=basic_auth_creds,
         username=username,
         password=password,
-        websession=ClientSession(),
+        connection_profile=CLI_CONNECTION_PROFILE,
         x_referer=x_referer,
         x_serial_id=x_serial_id,
     )
@@ -0,0 +1,61 @@
+"""HTTP connection tuning for smartbox sessions."""
+
+import aiohttp
+from pydantic import BaseModel, ConfigDict
+
+
+class ConnectionProfile(BaseModel):
+    """Settings of the HTTP connection pool used to reach the API.
+
+    `limit` and `limit_per_host` bound the number of simultaneous
+    connections (0 means no limit), `keepalive_timeout` is how long idle
+    connections are kept open for reuse, `ttl_dns_cache` how long resolved
+    addresses are cached (None caches forever) and `accept_encoding` is sent
+    so that large bodies such as samples are transferred compressed.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 15.0
+    ttl_dns_cache: int | None = 10
+    accept_encoding: str = "gzip, deflate"
+    request_timeout: float | None = 300.0
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """Create a connector with the settings of this profile."""
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+
+    def create_client_session(self) -> aiohttp.ClientSession:
+        """Create an http client using a connector of this profile."""
+        return aiohttp.ClientSession(
+            connector=self.create_connector(),
+            headers={"Accept-Encoding": self.accept_encoding},
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+
+
+# Short lived command line usage: few connections, released quickly.
+CLI_CONNECTION_PROFILE = ConnectionProfile(
+    limit=10,
+    limit_per_host=4,
+    keepalive_timeout=5.0,
+    ttl_dns_cache=10,
+    request_timeout=60.0,
+)
+
+# Long running services polling many devices: a larger pool whose
+# connections and DNS entries are kept for reuse between polling cycles.
+SERVICE_CONNECTION_PROFILE = ConnectionProfile(
+    limit=100,
+    limit_per_host=20,
+    keepalive_timeout=60.0,
+    ttl_dns_cache=300,
+    request_timeout=120.0,
+)
@@ -0,0 +1,167 @@
+"""In-memory mirror of the state of a device fed by its socket."""
+
+from collections.abc import Iterator, Mapping
+import logging
+from typing import Any
+
+from smartbox.node_state import NodeKey
+
+_LOGGER = logging.getLogger(__name__)
+
+# Update paths whose body doesn't go where the path says in dev data
+_PATH_KEYS: dict[str, tuple[str, ...]] = {
+    "/mgr/away_status": ("away_status",),
+    "/connected": (),
+    "/htr_system/power_limit": ("htr_system", "setup"),
+}
+# Keys of the node update paths: node type, address and section
+_NODE_PATH_KEYS = 3
+
+
+def _merged(current: object, body: object) -> object:
+    """Get body merged into current, changing neither of them."""
+    if not isinstance(current, dict) or not isinstance(body, Mapping):
+        return body
+    merged = dict(current)
+    for name, value in body.items():
+        merged[name] = _merged(current.get(name), value)
+    return merged
+
+
+def _merged_at(
+    target: dict[str, Any], keys: tuple[str, ...], body: object
+) -> dict[str, Any]:
+    """Get target with body merged at keys, changing neither of them."""
+    if not keys:
+        merged = _merged(target, body)
+        return merged if isinstance(merged, dict) else target
+    child = target.get(keys[0])
+    if len(keys) > 1:
+        value: object = _merged_at(
+            child if isinstance(child, dict) else {}, keys[1:], body
+        )
+    else:
+        value = _merged(child, body)
+    return {**target, keys[0]: value}
+
+
+def _node_key(node: Mapping[str, Any]) -> NodeKey | None:
+    try:
+        return node["type"], int(node["addr"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class DeviceState:
+    """Current state of a device, from its dev data and updates.
+
+    Dev data seeds the state, then each update body is merged where its path
+    points. Nothing is copied up front: the state shares the dev data and
+    bodies and never changes a dict it holds, an update replaces the dicts
+    along its path with merged ones. Neither these messages nor the dicts
+    returned by the plain lookups of reads may be changed. Every change of
+    a node bumps its revision.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty device state."""
+        self._device: dict[str, Any] = {}
+        self._nodes: dict[NodeKey, dict[str, Any]] = {}
+        self._revisions: dict[NodeKey, int] = {}
+
+    def seed(self, dev_data: Mapping[str, Any]) -> None:
+        """Replace the state with the given dev data."""
+        if not isinstance(dev_data, Mapping):
+            _LOGGER.error("Invalid dev data %s", dev_data)
+            return
+        self._device = {
+            name: value for name, value in dev_data.items() if name != "nodes"
+        }
+        nodes = dev_data.get("nodes")
+        if isinstance(nodes, dict):
+            nodes = list(nodes.values())
+        self._nodes = {}
+        for node in nodes if isinstance(nodes, list) else ():
+            key = _node_key(node) if isinstance(node, Mapping) else None
+            if key is None:
+                _LOGGER.debug("Ignoring invalid node %s", node)
+                continue
+            self._nodes[key] = dict(node)
+            self._revisions[key] = self._revisions.get(key, 0) + 1
+
+    def apply_update(self, path: str, body: object) -> None:
+        """Merge the body of an update at its path."""
+        keys = _PATH_KEYS.get(path)
+        if keys is None:
+            keys = tuple(path.strip("/").split("/"))
+            if len(keys) == _NODE_PATH_KEYS and keys[1].isdecimal():
+                self._apply_node_update((keys[0], int(keys[1])), keys[2], body)
+                return
+        self._device = _merged_at(self._device, keys, body)
+
+    def _apply_node_update(
+        self, key: NodeKey, section: str, body: object
+    ) -> None:
+        node = self._nodes.get(key)
+        if node is None:
+            node = {"type": key[0], "addr": key[1]}
+        self._nodes[key] = _merged_at(node, (section,), body)
+        self._revisions[key] = self._revisions.get(key, 0) + 1
+
+    def node_keys(self) -> Iterator[NodeKey]:
+        """Iterate over the type and address of the known nodes."""
+        return iter(self._nodes)
+
+    def node(self, node_type: str, addr: int) -> dict[str, Any] | None:
+        """Get all the data of a node, if known."""
+        return self._nodes.get((node_type, addr))
+
+    def node_status(self, node_type: str, addr: int) -> dict[str, Any] | None:
+        """Get the status of a node, if known."""
+        return self._node_section(node_type, addr, "status")
+
+    def node_setup(self, node_type: str, addr: int) -> dict[str, Any] | None:
+        """Get the setup of a node, if known."""
+        return self._node_section(node_type, addr, "setup")
+
+    def node_version(self, node_type: str, addr: int) -> dict[str, Any] | None:
+        """Get the version of a node, if known."""
+        return self._node_section(node_type, addr, "version")
+
+    def _node_section(
+        self, node_type: str, addr: int, section: str
+    ) -> dict[str, Any] | None:
+        node = self._nodes.get((node_type, addr))
+        return None if node is None else node.get(section)
+
+    def revision(self, node_type: str, addr: int) -> int:
+        """Get the number of changes of a node, 0 if never seen."""
+        return self._revisions.get((node_type, addr), 0)
+
+    @property
+    def away_status(self) -> dict[str, Any] | None:
+        """Get the away status of the device, if known."""
+        away_status = self._device.get("away_status")
+        return away_status if isinstance(away_status, dict) else None
+
+    @property
+    def connected(self) -> bool | None:
+        """Get whether the device is connected, if known."""
+        connected = self._device.get("connected")
+        return None if connected is None else bool(connected)
+
+    @property
+    def power_limit(self) -> int | None:
+        """Get the power limit of the device, if known."""
+        htr_system = self._device.get("htr_system")
+        setup = (
+            htr_system.get("setup") if isinstance(htr_system, dict) else None
+        )
+        if not isinstance(setup, dict) or setup.get("power_limit") is None:
+            return None
+        return int(setup["power_limit"])
+
+    def clear(self) -> None:
+        """Forget the state, keeping the node revisions."""
+        self._device = {}
+        self._nodes = {}
@@ -0,0 +1,299 @@
+"""Dispatch of update callbacks outside of the socket receive loop."""
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Coroutine, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import StrEnum
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# (device id, update path or dev data match index) of the calls being
+# dispatched, telling apart the calls whose arguments don't
+CALL_ORIGIN: ContextVar[tuple[Hashable, Hashable]] = ContextVar(
+    "smartbox_call_origin", default=(None, None)
+)
+
+
+class OverflowPolicy(StrEnum):
+    """What to do with the events of a full callback queue."""
+
+    # Hold the event until there is space, the next socket message waits
+    # for space before being dispatched
+    BLOCK = "block"
+    # Drop the oldest queued event
+    DROP_OLDEST = "drop_oldest"
+    # Replace the queued event of the same origin (node, path), dropping
+    # the oldest one when there is none
+    COALESCE = "coalesce"
+
+
+@dataclass(slots=True)
+class CallbackQueueStats:
+    """Counters of a callback queue."""
+
+    callback: str
+    depth: int = 0
+    max_depth: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    # Calls of a blocking queue waiting for space
+    waiting: int = 0
+
+
+def _origin(args: tuple[Any, ...]) -> Hashable:
+    """Get the origin of a call, from the CALL_ORIGIN of its dispatch.
+
+    That is its device and all its arguments but the last, or its message
+    when there are none. Return None when the arguments can't be hashed.
+    """
+    device_id, message = CALL_ORIGIN.get()
+    origin = args[:-1] or message
+    if origin is None:
+        return None
+    key = (device_id, origin)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class AsyncCallbackQueue:
+    """Bounded queue of the calls of an async callback.
+
+    Calling the queue queues a call of the callback, which a worker task
+    awaits in order, so a slow callback doesn't hold up the socket. The
+    worker starts on the first call, which must happen in the event loop.
+    A full blocking queue holds the calls in a waiting line, moved to the
+    queue as calls are made: the dispatcher waits for space before
+    dispatching the next message, see wait_for_space.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        maxsize: int = 100,
+        policy: OverflowPolicy | str = OverflowPolicy.BLOCK,
+    ) -> None:
+        """Create a queue for callback holding up to maxsize calls."""
+        if maxsize < 1:
+            msg = f"Invalid callback queue size {maxsize}"
+            raise ValueError(msg)
+        self._callback = callback
+        self._maxsize = maxsize
+        self._policy = OverflowPolicy(policy)
+        # Entries are [key, args, kwargs], updated in place when coalescing
+        self._events: deque[list[Any]] = deque()
+        self._pending: dict[Hashable, list[Any]] = {}
+        self._waiting: deque[list[Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._worker: asyncio.Task[None] | None = None
+        self._stats = CallbackQueueStats(
+            getattr(callback, "__qualname__", repr(callback))
+        )
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        """Get the overflow policy of the queue."""
+        return self._policy
+
+    @property
+    def full(self) -> bool:
+        """Whether the queue holds maxsize calls."""
+        return len(self._events) >= self._maxsize
+
+    @property
+    def stats(self) -> CallbackQueueStats:
+        """Get the counters of the queue."""
+        return self._stats
+
+    def __call__(self, *args: object, **kwargs: object) -> None:
+        """Queue a call of the callback."""
+        key = None
+        if self._policy is OverflowPolicy.COALESCE:
+            # Calls that can't be keyed are never coalesced
+            key = _origin(args)
+            if key is None:
+                key = object()
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[1] = args
+                entry[2] = kwargs
+                self._stats.coalesced += 1
+                return
+        entry = [key, args, kwargs]
+        if self._policy is OverflowPolicy.BLOCK and (
+            self._waiting or self.full
+        ):
+            self._waiting.append(entry)
+            self._stats.waiting = len(self._waiting)
+            self._space.clear()
+        else:
+            if self.full:
+                dropped = self._events.popleft()
+                self._pending.pop(dropped[0], None)
+                self._stats.dropped += 1
+            self._put(entry)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._work())
+
+    def _put(self, entry: list[Any]) -> None:
+        self._events.append(entry)
+        if entry[0] is not None:
+            self._pending[entry[0]] = entry
+        depth = len(self._events)
+        self._stats.depth = depth
+        self._stats.max_depth = max(self._stats.max_depth, depth)
+        if depth >= self._maxsize:
+            self._space.clear()
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def wait_for_space(self) -> None:
+        """Wait until no call waits and the queue is no longer full."""
+        await self._space.wait()
+
+    async def join(self) -> None:
+        """Wait until all queued calls were made."""
+        await self._idle.wait()
+
+    def close(self) -> None:
+        """Stop the worker, dropping the queued calls."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._stats.dropped += len(self._events) + len(self._waiting)
+        self._events.clear()
+        self._waiting.clear()
+        self._pending.clear()
+        self._stats.depth = 0
+        self._stats.waiting = 0
+        self._space.set()
+        self._idle.set()
+
+    async def _work(self) -> None:
+        while True:
+            while not self._events:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            key, args, kwargs = self._events.popleft()
+            if key is not None:
+                self._pending.pop(key, None)
+            self._stats.depth = len(self._events)
+            if self._waiting:
+                self._put(self._waiting.popleft())
+                self._stats.waiting = len(self._waiting)
+            if not self.full:
+                self._space.set()
+            try:
+                await self._callback(*args, **kwargs)
+            except Exception:
+                _LOGGER.exception("Error in callback %s", self._stats.callback)
+                self._stats.errors += 1
+            else:
+                self._stats.delivered += 1
+
+
+class ThreadedCallback:
+    """Marks a callback to be called in the thread pool of the manager."""
+
+    def __init__(self, callback: Callable[..., Any]) -> None:
+        """Mark callback to be called in a thread."""
+        self.callback = callback
+
+    def __call__(self, *args: object, **kwargs: object) -> object:
+        """Call the callback in the current thread."""
+        return self.callback(*args, **kwargs)
+
+
+def threaded(callback: Callable[..., Any]) -> ThreadedCallback:
+    """Subscribe callback to be called in a worker thread.
+
+    For consumers doing blocking or CPU heavy work, e.g.
+    `manager.subscribe_to_node_status(threaded(store_status))`. The calls
+    for a node keep their order. The callback gets the same objects as the
+    other ones, it must not change them and copy the ones it keeps.
+    """
+    return ThreadedCallback(callback)
+
+
+class ExecutorLanes:
+    """Single thread executors, one per lane, running the threaded callbacks.
+
+    Calls are spread over the lanes by origin (node, path), so the calls of
+    an origin run in order while other origins run in parallel.
+    """
+
+    def __init__(self, workers: int = 4) -> None:
+        """Create lanes for workers threads."""
+        if workers < 1:
+            msg = f"Invalid number of executor workers {workers}"
+            raise ValueError(msg)
+        self._lanes = [
+            ThreadPoolExecutor(1, thread_name_prefix=f"smartbox-callback-{i}")
+            for i in range(workers)
+        ]
+
+    def submit(
+        self,
+        callback: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Future[None]:
+        """Call callback in the lane of the origin of its arguments."""
+        executor = self._lanes[hash(_origin(args)) % len(self._lanes)]
+        return executor.submit(_call_logged, callback, args, kwargs)
+
+    async def join(self) -> None:
+        """Wait until the calls submitted so far were made."""
+        await asyncio.gather(
+            *(
+                asyncio.wrap_future(lane.submit(lambda: None))
+                for lane in self._lanes
+            )
+        )
+
+    def shutdown(self) -> None:
+        """Stop the threads, dropping the calls not started yet."""
+        for lane in self._lanes:
+            lane.shutdown(wait=False, cancel_futures=True)
+
+
+def _call_logged(
+    callback: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> None:
+    try:
+        callback(*args, **kwargs)
+    except Exception:
+        _LOGGER.exception(
+            "Error in callback %s", getattr(callback, "__qualname__", callback)
+        )
+
+
+class ExecutorCallback:
+    """Callable submitting the calls of a callback to executor lanes."""
+
+    def __init__(
+        self, callback: Callable[..., Any], lanes: ExecutorLanes
+    ) -> None:
+        """Create a callable calling callback in lanes."""
+        self._callback = callback
+        self._lanes = lanes
+
+    def __call__(self, *args: object, **kwargs: object) -> None:
+        """Submit a call of the callback."""
+        self._lanes.submit(self._callback, args, kwargs)
@@ -0,0 +1,433 @@
+"""Local stand-in for the smartbox REST API, for load and retry testing."""
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+import copy
+import logging
+import random
+import secrets
+import time
+from typing import Any, Self
+
+from aiohttp import web
+import asyncclick as click
+
+_NODE_TYPES = ("htr", "acm", "htr_mod")
+_DEFAULT_TOKEN_LIFETIME = 4 * 3600
+_DEFAULT_SAMPLES_INTERVAL = 3600
+
+_LOGGER = logging.getLogger(__name__)
+
+_Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+def _node_status(node_type: str, addr: int) -> dict[str, Any]:
+    status: dict[str, Any] = {
+        "mtemp": f"{18 + addr % 5}.{addr % 10}",
+        "units": "C",
+        "sync_status": "ok",
+        "locked": False,
+        "mode": "auto",
+        "error_code": "none",
+        "eco_temp": "18.0",
+        "comf_temp": "22.0",
+        "act_duty": 45,
+        "pcb_temp": "30.0",
+        "power_pcb_temp": "35.0",
+        "presence": True,
+        "window_open": False,
+        "true_radiant_active": False,
+        "boost": False,
+        "boost_end_min": 0,
+        "boost_end_day": 0,
+        "stemp": "20.0",
+        "power": "1000",
+        "duty": 50,
+        "ice_temp": "5.0",
+        "active": False,
+    }
+    if node_type == "acm":
+        status.update({"charging": False, "charge_level": addr % 5})
+    elif node_type == "htr_mod":
+        status.update(
+            {
+                "on": True,
+                "selected_temp": "comfort",
+                "comfort_temp": "22.0",
+                "eco_offset": "4.0",
+            }
+        )
+    return status
+
+
+def _node_setup() -> dict[str, Any]:
+    return {
+        "sync_status": "ok",
+        "control_mode": 4,
+        "units": "C",
+        "power": "1000",
+        "offset": "0.0",
+        "away_mode": 0,
+        "away_offset": "0.0",
+        "modified_auto_span": 0,
+        "window_mode_enabled": False,
+        "true_radiant_enabled": False,
+        "user_duty_factor": 0,
+        "flash_version": "1.1",
+        "factory_options": {
+            "temp_compensation_enabled": False,
+            "window_mode_available": True,
+            "true_radiant_available": True,
+            "duty_limit": 0,
+            "boost_config": 2,
+            "button_double_press": False,
+            "prog_resolution": 0,
+            "bbc_value": 50,
+            "bbc_available": True,
+            "lst_value": 70,
+            "lst_available": True,
+            "fil_pilote_available": True,
+            "backlight_time": 15,
+            "button_down_code": 1,
+            "button_up_code": 2,
+            "button_mode_code": 4,
+            "button_prog_code": 8,
+            "button_off_code": 16,
+            "button_boost_code": 32,
+            "splash_screen_type": 0,
+        },
+        "extra_options": {"boost_temp": "24.0", "boost_time": 60},
+    }
+
+
+class FakeSmartboxServer:
+    """aiohttp server emulating a fleet of smartbox devices.
+
+    Devices are named device1..deviceN and spread over `homes` homes, each
+    with `nodes_per_device` nodes cycling through htr, acm and htr_mod.
+    Every request is delayed by `latency` seconds (plus up to `jitter`
+    seconds), API requests fail with a 500 error with probability
+    `error_rate`, and access tokens expire after `token_lifetime` seconds.
+    """
+
+    def __init__(
+        self,
+        devices: int = 1,
+        nodes_per_device: int = 3,
+        homes: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        token_lifetime: int = _DEFAULT_TOKEN_LIFETIME,
+        samples_interval: int = _DEFAULT_SAMPLES_INTERVAL,
+        seed: int | None = None,
+    ) -> None:
+        """Create the fake fleet and server application."""
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_lifetime = token_lifetime
+        self.samples_interval = samples_interval
+        self.stats: Counter[str] = Counter()
+        self._random = random.Random(seed)  # noqa: S311
+        self._access_tokens: dict[str, float] = {}
+        self._refresh_tokens: set[str] = set()
+        self._runner: web.AppRunner | None = None
+        self._api_host = ""
+
+        self.devices: dict[str, dict[str, Any]] = {}
+        for index in range(1, devices + 1):
+            dev_id = f"device{index}"
+            nodes = {}
+            for addr in range(nodes_per_device):
+                node_type = _NODE_TYPES[addr % len(_NODE_TYPES)]
+                nodes[(node_type, addr)] = {
+                    "node": {
+                        "name": f"Node {index} {addr}",
+                        "addr": addr,
+                        "type": node_type,
+                        "installed": True,
+                        "lost": False,
+                    },
+                    "status": _node_status(node_type, addr),
+                    "setup": _node_setup(),
+                }
+            self.devices[dev_id] = {
+                "device": {
+                    "dev_id": dev_id,
+                    "name": f"Device {index}",
+                    "product_id": "0001",
+                    "fw_version": "1.0",
+                    "serial_id": f"serial{index}",
+                },
+                "home": f"home{(index - 1) % homes + 1}",
+                "nodes": nodes,
+                "away_status": {
+                    "enabled": True,
+                    "away": False,
+                    "forced": False,
+                },
+                "power_limit": "0",
+                "connected": True,
+            }
+        self._homes = [f"home{index}" for index in range(1, homes + 1)]
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_post("/client/token", self._token)
+        api = "/api/v2"
+        dev = api + "/devs/{dev_id}"
+        node = dev + "/{node_type}/{addr:\\d+}"
+        routes: list[tuple[str, str, _Handler]] = [
+            ("GET", api + "/devs", self._get_devs),
+            ("GET", api + "/grouped_devs", self._get_grouped_devs),
+            ("GET", dev + "/connected", self._get_connected),
+            ("GET", dev + "/mgr/nodes", self._get_nodes),
+            ("GET", dev + "/mgr/away_status", self._get_away_status),
+            ("POST", dev + "/mgr/away_status", self._set_away_status),
+            ("GET", dev + "/htr_system/power_limit", self._get_power_limit),
+            ("POST", dev + "/htr_system/power_limit", self._set_power_limit),
+            ("GET", node + "/status", self._get_node_section),
+            ("POST", node + "/status", self._set_node_section),
+            ("GET", node + "/setup", self._get_node_section),
+            ("POST", node + "/setup", self._set_node_section),
+            ("GET", node + "/samples", self._get_samples),
+        ]
+        for method, path, handler in routes:
+            self.app.router.add_route(method, path, handler)
+
+    @property
+    def api_host(self) -> str:
+        """Get the base url of the running server."""
+        return self._api_host
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving, return the base url to use as api host."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self._api_host = f"http://{host}:{bound_port}"
+        _LOGGER.debug("Fake smartbox server listening on %s", self._api_host)
+        return self._api_host
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> Self:
+        """Start the server in an async with block."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop the server at the end of an async with block."""
+        await self.stop()
+
+    def expire_tokens(self) -> None:
+        """Expire all access tokens, forcing clients to refresh."""
+        self._access_tokens = dict.fromkeys(self._access_tokens, 0.0)
+
+    @web.middleware
+    async def _middleware(
+        self, request: web.Request, handler: _Handler
+    ) -> web.StreamResponse:
+        self.stats["requests"] += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(
+                self.latency + self._random.uniform(0, self.jitter)
+            )
+        if request.path.startswith("/api/"):
+            token = request.headers.get("Authorization", "")
+            expires_at = self._access_tokens.get(token.removeprefix("Bearer "))
+            if expires_at is None or expires_at < time.monotonic():
+                self.stats["unauthorized"] += 1
+                return web.json_response({"error": "invalid_token"}, status=401)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats["injected_errors"] += 1
+                return web.json_response(
+                    {"message": "Internal Server Error", "statusCode": 500},
+                    status=500,
+                )
+        return await handler(request)
+
+    def _device(self, request: web.Request) -> dict[str, Any]:
+        device = self.devices.get(request.match_info["dev_id"])
+        if device is None:
+            raise web.HTTPNotFound
+        return device
+
+    def _node(self, request: web.Request) -> dict[str, Any]:
+        key = (request.match_info["node_type"], int(request.match_info["addr"]))
+        node = self._device(request)["nodes"].get(key)
+        if node is None:
+            raise web.HTTPNotFound
+        return node
+
+    async def _token(self, request: web.Request) -> web.Response:
+        if not request.headers.get("Authorization", "").startswith("Basic "):
+            return web.json_response({"error": "invalid_client"}, status=401)
+        form = await request.post()
+        if form.get("grant_type") == "refresh_token":
+            refresh_token = str(form.get("refresh_token"))
+            if refresh_token not in self._refresh_tokens:
+                return web.json_response({"error": "invalid_grant"}, status=400)
+            self._refresh_tokens.discard(refresh_token)
+            self.stats["token_refreshes"] += 1
+        elif form.get("grant_type") != "password":
+            return web.json_response(
+                {"error": "unsupported_grant_type"}, status=400
+            )
+        access_token = secrets.token_hex(16)
+        refresh_token = secrets.token_hex(16)
+        self._access_tokens[access_token] = (
+            time.monotonic() + self.token_lifetime
+        )
+        self._refresh_tokens.add(refresh_token)
+        self.stats["tokens"] += 1
+        return web.json_response(
+            {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expires_in": self.token_lifetime,
+                "token_type": "bearer",
+            }
+        )
+
+    async def _get_devs(self, _request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "devs": [device["device"] for device in self.devices.values()],
+                "invited_to": [],
+            }
+        )
+
+    async def _get_grouped_devs(self, _request: web.Request) -> web.Response:
+        return web.json_response(
+            [
+                {
+                    "id": home_id,
+                    "name": f"Home {home_id}",
+                    "owner": True,
+                    "devs": [
+                        device["device"]
+                        for device in self.devices.values()
+                        if device["home"] == home_id
+                    ],
+                }
+                for home_id in self._homes
+            ]
+        )
+
+    async def _get_connected(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"connected": self._device(request)["connected"]}
+        )
+
+    async def _get_nodes(self, request: web.Request) -> web.Response:
+        nodes = self._device(request)["nodes"].values()
+        return web.json_response({"nodes": [node["node"] for node in nodes]})
+
+    async def _get_away_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self._device(request)["away_status"])
+
+    async def _set_away_status(self, request: web.Request) -> web.Response:
+        self._device(request)["away_status"].update(await request.json())
+        return web.json_response({})
+
+    async def _get_power_limit(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"power_limit": self._device(request)["power_limit"]}
+        )
+
+    async def _set_power_limit(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        self._device(request)["power_limit"] = str(data["power_limit"])
+        return web.json_response({})
+
+    async def _get_node_section(self, request: web.Request) -> web.Response:
+        section = request.path.rsplit("/", 1)[-1]
+        return web.json_response(self._node(request)[section])
+
+    async def _set_node_section(self, request: web.Request) -> web.Response:
+        section = request.path.rsplit("/", 1)[-1]
+        self._node(request)[section].update(await request.json())
+        return web.json_response({})
+
+    async def _get_samples(self, request: web.Request) -> web.Response:
+        node = self._node(request)
+        now = int(time.time())
+        try:
+            start = int(request.query.get("start", now - 3600))
+            end = int(request.query.get("end", now))
+        except ValueError as e:
+            raise web.HTTPBadRequest from e
+        interval = self.samples_interval
+        addr = node["node"]["addr"]
+        first = -(-start // interval) * interval
+        return web.json_response(
+            {
+                "samples": [
+                    {
+                        "t": t,
+                        "temp": f"{18 + (t // interval + addr) % 5}.0",
+                        "counter": (t // interval) * (10 + addr),
+                    }
+                    for t in range(first, end + 1, interval)
+                ]
+            }
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a copy of the current fleet state."""
+        return copy.deepcopy(self.devices)
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Address to listen on")
+@click.option("--port", default=8080, help="Port to listen on")
+@click.option("--devices", default=10, help="Number of devices")
+@click.option("--nodes-per-device", default=3, help="Number of nodes")
+@click.option("--homes", default=1, help="Number of homes")
+@click.option("--latency", default=0.0, help="Latency added (s)")
+@click.option("--jitter", default=0.0, help="Random extra latency (s)")
+@click.option("--error-rate", default=0.0, help="Fraction of 500 errors")
+@click.option(
+    "--token-lifetime",
+    default=_DEFAULT_TOKEN_LIFETIME,
+    help="Access token lifetime (s)",
+)
+async def main(
+    host: str,
+    port: int,
+    devices: int,
+    nodes_per_device: int,
+    homes: int,
+    latency: float,
+    jitter: float,
+    error_rate: float,
+    token_lifetime: int,
+) -> None:
+    """Run a fake smartbox REST API server until interrupted."""
+    server = FakeSmartboxServer(
+        devices=devices,
+        nodes_per_device=nodes_per_device,
+        homes=homes,
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        token_lifetime=token_lifetime,
+    )
+    api_host = await server.start(host, port)
+    click.echo(f"Fake smartbox API listening on {api_host}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    main()
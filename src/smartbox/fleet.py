@@ -0,0 +1,161 @@
+"""Update manager of a fleet of Smartbox devices."""
+
+import asyncio
+from collections.abc import Callable, Iterable, Mapping
+import logging
+from typing import TYPE_CHECKING, Any
+
+from smartbox.device_state import DeviceState
+from smartbox.dispatch import OverflowPolicy, ThreadedCallback
+from smartbox.node_state import NodeStates
+from smartbox.session import AsyncSmartboxSession
+from smartbox.socket import SocketSession
+from smartbox.update_manager import BaseUpdateManager, dispatched_device_id
+
+if TYPE_CHECKING:
+    from smartbox.recording import EventRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+_RESTART_DELAY = 1.0
+_MAX_RESTART_DELAY = 60.0
+# A socket failing after running that long is restarted after _RESTART_DELAY
+_HEALTHY_RUN_TIME = 60.0
+
+
+class _DeviceCallback:
+    """Callable passing the id of the dispatched device to a callback."""
+
+    def __init__(self, callback: Callable[..., Any]) -> None:
+        self._callback = callback
+
+    def __call__(self, *args: object, **kwargs: object) -> object:
+        return self._callback(dispatched_device_id(), *args, **kwargs)
+
+
+class FleetUpdateManager(BaseUpdateManager):
+    """Manages the sockets of many devices with shared subscriptions.
+
+    Every subscription applies to all the devices, its callback gets the
+    device id as first argument, e.g. `callback(device_id, node_type, addr,
+    status)` for node status. Messages of all the devices are routed through
+    the same subscription index, the device states are kept apart.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSmartboxSession,
+        device_ids: Iterable[str],
+        callback_queue_size: int = 100,
+        overflow_policy: OverflowPolicy | str = OverflowPolicy.BLOCK,
+        executor_workers: int = 4,
+        coalesce_interval: float | None = None,
+        recorder: "EventRecorder | None" = None,
+        **kwargs: dict[str, object],
+    ) -> None:
+        """Create a manager for the sockets of device_ids.
+
+        See UpdateManager for the arguments, kwargs are passed to every
+        SocketSession. The recorder is shared by the devices.
+        """
+        super().__init__(
+            callback_queue_size,
+            overflow_policy,
+            executor_workers,
+            coalesce_interval,
+            recorder,
+        )
+        self._session = session
+        self._socket_kwargs = kwargs
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._stopped: asyncio.Event | None = None
+        for device_id in device_ids:
+            self.add_device(device_id)
+
+    @property
+    def socket_sessions(self) -> Mapping[str, SocketSession]:
+        """Get the socket sessions by device id."""
+        return {
+            device_id: device.socket_session
+            for device_id, device in self._devices.items()
+        }
+
+    def device_state(self, device_id: str) -> DeviceState:
+        """Get the state of a device, as of its last received message."""
+        return self._devices[device_id].state
+
+    def node_states(self, device_id: str) -> NodeStates:
+        """Get the typed node states of a device."""
+        return self._devices[device_id].node_states
+
+    def add_device(self, device_id: str) -> None:
+        """Add a device, started right away if the manager is running."""
+        if device_id in self._devices:
+            return
+        self._add_device(self._session, device_id, self._socket_kwargs)
+        if self._stopped is not None:
+            self._start(device_id)
+
+    def _dispatcher(
+        self, callback: Callable[..., Any] | ThreadedCallback
+    ) -> Callable[..., Any]:
+        # The device id is bound before queueing, while it is known
+        return _DeviceCallback(super()._dispatcher(callback))
+
+    async def run(self) -> None:
+        """Run the sockets of all the devices until cancelled.
+
+        The socket of a device failing is restarted after an increasing
+        delay, without affecting the other devices. Cancelling it stops the
+        device tasks.
+        """
+        self._stopped = stopped = asyncio.Event()
+        for device_id in self._devices:
+            self._start(device_id)
+        try:
+            await stopped.wait()
+        finally:
+            self._stopped = None
+            await self._stop_tasks()
+
+    def _start(self, device_id: str) -> None:
+        self._tasks[device_id] = asyncio.get_running_loop().create_task(
+            self._supervise(device_id)
+        )
+
+    async def _supervise(self, device_id: str) -> None:
+        socket_session = self._devices[device_id].socket_session
+        loop = asyncio.get_running_loop()
+        delay = _RESTART_DELAY
+        while True:
+            started = loop.time()
+            try:
+                await socket_session.run()
+            except Exception:
+                if loop.time() - started >= _HEALTHY_RUN_TIME:
+                    delay = _RESTART_DELAY
+                _LOGGER.exception(
+                    "Socket of device %s failed, restarting in %ss",
+                    device_id,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _MAX_RESTART_DELAY)
+            else:
+                return
+
+    async def cancel(self) -> None:
+        """Disconnect all the devices and stop their tasks."""
+        for device_id in list(self._tasks):
+            await self._devices[device_id].socket_session.cancel()
+        await self._stop_tasks()
+        if self._stopped is not None:
+            self._stopped.set()
+        self._close_dispatch()
+
+    async def _stop_tasks(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
@@ -0,0 +1,208 @@
+"""Native evaluation of the simple jq expressions used by subscriptions."""
+
+from collections.abc import Callable, Iterator
+import re
+
+Evaluator = Callable[[object], Iterator[object]]
+
+_TOKEN_RE = re.compile(
+    r"\s*(\.\[\]|\.[A-Za-z_]\w*|\[\]|[A-Za-z_]\w*|[.|(){},?]|\S)"
+)
+_IDENT_RE = re.compile(r"[A-Za-z_]\w*")
+
+
+class _UnsupportedError(Exception):
+    """Expression outside of the natively evaluated subset."""
+
+
+class JqEvaluationError(ValueError):
+    """Failure of a natively evaluated expression, where jq raises."""
+
+
+def jq_type_name(value: object) -> str:
+    """Get the name jq gives to the type of a JSON value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int | float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _field(name: str) -> Evaluator:
+    def evaluate(value: object) -> Iterator[object]:
+        if value is None:
+            yield None
+        elif isinstance(value, dict):
+            yield value.get(name)
+        else:
+            msg = f'Cannot index {jq_type_name(value)} with "{name}"'
+            raise JqEvaluationError(msg)
+
+    return evaluate
+
+
+def _iterate(value: object) -> Iterator[object]:
+    if isinstance(value, dict):
+        yield from value.values()
+    elif isinstance(value, list):
+        yield from value
+    else:
+        msg = f"Cannot iterate over {jq_type_name(value)}"
+        raise JqEvaluationError(msg)
+
+
+def _identity(value: object) -> Iterator[object]:
+    yield value
+
+
+def _project(keys: list[str]) -> Evaluator:
+    def evaluate(value: object) -> Iterator[object]:
+        if value is None:
+            yield dict.fromkeys(keys)
+        elif isinstance(value, dict):
+            yield {key: value.get(key) for key in keys}
+        else:
+            msg = f'Cannot index {jq_type_name(value)} with "{keys[0]}"'
+            raise JqEvaluationError(msg)
+
+    return evaluate
+
+
+def _pipe(left: Evaluator, right: Evaluator) -> Evaluator:
+    def evaluate(value: object) -> Iterator[object]:
+        for item in left(value):
+            yield from right(item)
+
+    return evaluate
+
+
+def _try(inner: Evaluator) -> Evaluator:
+    def evaluate(value: object) -> Iterator[object]:
+        # Like jq, outputs before the error are kept
+        try:
+            yield from inner(value)
+        except ValueError:
+            return
+
+    return evaluate
+
+
+class _Parser:
+    """Recursive descent parser of the supported subset.
+
+    pipe := term ("|" term)*
+    term := ("(" pipe ")" | path | "{" ident ("," ident)* "}") "?"*
+    path := "." | (".name" | ".[]") (".name" | ".[]" | "[]")*
+    """
+
+    def __init__(self, expr: str) -> None:
+        self._tokens = _TOKEN_RE.findall(expr)
+        self._pos = 0
+
+    def parse(self) -> Evaluator:
+        evaluator = self._pipe()
+        if self._pos != len(self._tokens):
+            raise _UnsupportedError
+        return evaluator
+
+    def _peek(self) -> str | None:
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos]
+        return None
+
+    def _next(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise _UnsupportedError
+        self._pos += 1
+        return token
+
+    def _expect(self, expected: str) -> None:
+        if self._next() != expected:
+            raise _UnsupportedError
+
+    def _pipe(self) -> Evaluator:
+        evaluator = self._term()
+        while self._peek() == "|":
+            self._pos += 1
+            evaluator = _pipe(evaluator, self._term())
+        return evaluator
+
+    def _term(self) -> Evaluator:
+        token = self._next()
+        if token == "(":  # noqa: S105
+            evaluator = self._pipe()
+            self._expect(")")
+        elif token == "{":  # noqa: S105
+            evaluator = self._object()
+        elif token == ".":  # noqa: S105
+            evaluator = _identity
+        elif token.startswith("."):
+            self._pos -= 1
+            evaluator = self._path()
+        else:
+            raise _UnsupportedError
+        while self._peek() == "?":
+            self._pos += 1
+            evaluator = _try(evaluator)
+        return evaluator
+
+    def _path(self) -> Evaluator:
+        steps: list[Evaluator] = []
+        while (token := self._peek()) is not None:
+            if token in (".[]", "[]"):
+                steps.append(_iterate)
+            elif token.startswith(".") and len(token) > 1:
+                steps.append(_field(token[1:]))
+            else:
+                break
+            self._pos += 1
+        evaluator = steps[0]
+        for step in steps[1:]:
+            evaluator = _pipe(evaluator, step)
+        return evaluator
+
+    def _object(self) -> Evaluator:
+        keys: list[str] = []
+        while True:
+            key = self._next()
+            if not _IDENT_RE.fullmatch(key):
+                raise _UnsupportedError
+            keys.append(key)
+            token = self._next()
+            if token == "}":  # noqa: S105
+                return _project(keys)
+            if token != ",":  # noqa: S105
+                raise _UnsupportedError
+
+
+def compile_native(expr: str) -> Evaluator | None:
+    """Compile a jq expression to a native evaluator.
+
+    Supported are ".", field paths like ".a.b", iterations ".a[]", object
+    projections "{a, b}", pipes, parentheses and "?". Evaluators yield the
+    outputs jq would give and raise JqEvaluationError, a ValueError, where jq
+    fails, return None for other expressions.
+    """
+    try:
+        return _Parser(expr).parse()
+    except _UnsupportedError:
+        return None
+
+
+def field_path(expr: str) -> tuple[str, ...] | None:
+    """Get the fields of a plain path like ".a.b", None for other ones."""
+    tokens = _TOKEN_RE.findall(expr)
+    if not tokens or "".join(tokens) != expr.strip():
+        return None
+    if not all(
+        t.startswith(".") and _IDENT_RE.fullmatch(t[1:]) for t in tokens
+    ):
+        return None
+    return tuple(t[1:] for t in tokens)
@@ -1,8 +1,14 @@
 """Pydantic model of smartbox."""
 
+from collections.abc import Iterable, Mapping, Sequence
 from enum import StrEnum
+import functools
+from typing import Annotated, Any, Self
 
-from pydantic import BaseModel, RootModel
+from pydantic import BaseModel, Field, RootModel, TypeAdapter, field_validator
+
+_DAYS_PER_WEEK = 7
+_TEMPERATURE_UNITS = ("C", "F")
 
 
 class SmartboxNodeType(StrEnum):
@@ -15,6 +21,87 @@ class SmartboxNodeType(StrEnum):
     PMO = "pmo"
 
 
+class ValidationMode(StrEnum):
+    """How API responses are turned into results.
+
+    FULL validates them into models and RAW returns the decoded payloads.
+    """
+
+    FULL = "full"
+    RAW = "raw"
+
+
+def parse_number(value: str | float | None) -> float | None:
+    """Parse a numeric value sent as a string, empty values give None."""
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def celsius_to_fahrenheit(value: float) -> float:
+    """Convert a temperature from Celsius to Fahrenheit."""
+    return value * 9 / 5 + 32
+
+
+def fahrenheit_to_celsius(value: float) -> float:
+    """Convert a temperature from Fahrenheit to Celsius."""
+    return (value - 32) * 5 / 9
+
+
+def convert_temperature(
+    value: float | None,
+    from_units: str,
+    to_units: str,
+    *,
+    difference: bool = False,
+) -> float | None:
+    """Convert a temperature between "C" and "F" units.
+
+    With difference, value is a temperature difference (e.g. an offset)
+    which is only scaled.
+    """
+    for units in (from_units, to_units):
+        if units not in _TEMPERATURE_UNITS:
+            msg = f"Unknown temperature units {units}"
+            raise ValueError(msg)
+    if value is None or from_units == to_units:
+        return value
+    if difference:
+        return value * 9 / 5 if to_units == "F" else value * 5 / 9
+    if to_units == "F":
+        return celsius_to_fahrenheit(value)
+    return fahrenheit_to_celsius(value)
+
+
+class _ParsedValuesModel(BaseModel):
+    """Model caching the numbers parsed from its string fields.
+
+    The number of a field is the cached property `<field>_value`, it is
+    dropped when the field is assigned or updated by model_copy.
+    """
+
+    def __setattr__(self, name: str, value: object) -> None:
+        """Set a field, forgetting its parsed value."""
+        super().__setattr__(name, value)
+        self.__dict__.pop(f"{name}_value", None)
+
+    def model_copy(
+        self, *, update: Mapping[str, Any] | None = None, deep: bool = False
+    ) -> Self:
+        """Copy the model, forgetting the parsed values of updated fields."""
+        copy = super().model_copy(update=update, deep=deep)
+        if update:
+            clear_parsed_values(copy, update)
+        return copy
+
+
+def clear_parsed_values(model: BaseModel, names: Iterable[str]) -> None:
+    """Forget the parsed values of fields changed behind __setattr__."""
+    if isinstance(model, _ParsedValuesModel):
+        for name in names:
+            model.__dict__.pop(f"{name}_value", None)
+
+
 class NodeFactoryOptions(BaseModel):
     """NodeFactoryOptions model."""
 
@@ -55,7 +142,7 @@ class PmoSetup(BaseModel):
     reverse: bool
 
 
-class DefaultNodeSetup(BaseModel):
+class DefaultNodeSetup(_ParsedValuesModel):
     """NodeSetup model."""
 
     sync_status: str
@@ -73,6 +160,22 @@ class DefaultNodeSetup(BaseModel):
     factory_options: NodeFactoryOptions
     extra_options: NodeExtraOptions
 
+    @functools.cached_property
+    def power_value(self) -> float | None:
+        """Get the power as a number."""
+        return parse_number(self.power)
+
+    @functools.cached_property
+    def offset_value(self) -> float | None:
+        """Get the temperature offset as a number."""
+        return parse_number(self.offset)
+
+    def offset_in(self, units: str) -> float | None:
+        """Get the temperature offset in the given units."""
+        return convert_temperature(
+            self.offset_value, self.units, units, difference=True
+        )
+
 
 class NodeSetup(RootModel[DefaultNodeSetup | PmoSetup]):
     """NodeSetup model."""
@@ -91,7 +194,7 @@ class NodeVersion(BaseModel):
     uid: str
     pid: str
 
-class DefaultNodeStatus(BaseModel):
+class DefaultNodeStatus(_ParsedValuesModel):
     """Default Node Status."""
 
     mtemp: str
@@ -118,6 +221,42 @@ class DefaultNodeStatus(BaseModel):
     ice_temp: str
     active: bool
 
+    @functools.cached_property
+    def mtemp_value(self) -> float | None:
+        """Get the measured temperature as a number."""
+        return parse_number(self.mtemp)
+
+    @functools.cached_property
+    def stemp_value(self) -> float | None:
+        """Get the set temperature as a number."""
+        return parse_number(self.stemp)
+
+    @functools.cached_property
+    def comf_temp_value(self) -> float | None:
+        """Get the comfort temperature as a number."""
+        return parse_number(self.comf_temp)
+
+    @functools.cached_property
+    def eco_temp_value(self) -> float | None:
+        """Get the eco temperature as a number."""
+        return parse_number(self.eco_temp)
+
+    @functools.cached_property
+    def ice_temp_value(self) -> float | None:
+        """Get the frost protection temperature as a number."""
+        return parse_number(self.ice_temp)
+
+    @functools.cached_property
+    def power_value(self) -> float | None:
+        """Get the power as a number."""
+        return parse_number(self.power)
+
+    def temperature(self, field: str, units: str) -> float | None:
+        """Get a temperature field, e.g. "mtemp", in the given units."""
+        return convert_temperature(
+            getattr(self, f"{field}_value"), self.units, units
+        )
+
 
 class HtrModNodeStatus(DefaultNodeStatus):
     """NodeStatus for htr_mod node."""
@@ -164,6 +303,87 @@ class NodeStatus(
         return getattr(self.root, name)
 
 
+NODE_STATUS_MODELS: dict[SmartboxNodeType, type[DefaultNodeStatus]] = {
+    SmartboxNodeType.HTR: HtrNodeStatus,
+    SmartboxNodeType.THM: DefaultNodeStatus,
+    SmartboxNodeType.HTR_MOD: HtrModNodeStatus,
+    SmartboxNodeType.ACM: AcmNodeStatus,
+}
+
+NODE_SETUP_MODELS: dict[SmartboxNodeType, type[DefaultNodeSetup | PmoSetup]] = {
+    SmartboxNodeType.HTR: DefaultNodeSetup,
+    SmartboxNodeType.THM: DefaultNodeSetup,
+    SmartboxNodeType.HTR_MOD: DefaultNodeSetup,
+    SmartboxNodeType.ACM: DefaultNodeSetup,
+    SmartboxNodeType.PMO: PmoSetup,
+}
+
+
+# Each node type status is validated by one cached union validator trying
+# the model of the type first, so JSON bodies are only parsed once.
+_NODE_STATUS_ADAPTERS: dict[SmartboxNodeType, TypeAdapter[Any]] = {
+    node_type: TypeAdapter(
+        model
+        if model is DefaultNodeStatus
+        else Annotated[
+            model | DefaultNodeStatus, Field(union_mode="left_to_right")
+        ]
+    )
+    for node_type, model in NODE_STATUS_MODELS.items()
+}
+
+
+_NODE_TYPES: dict[str, SmartboxNodeType] = {
+    node_type.value: node_type for node_type in SmartboxNodeType
+}
+
+
+def _validate[ModelT: BaseModel](
+    model: type[ModelT], data: dict[str, Any] | bytes
+) -> ModelT:
+    """Validate a decoded payload or a raw JSON body with a model."""
+    if isinstance(data, bytes | str):
+        return model.model_validate_json(data)
+    return model.model_validate(data)
+
+
+def node_status_model(node_type: str) -> type[DefaultNodeStatus] | None:
+    """Get the status model of a node type, None if unknown."""
+    known_type = _NODE_TYPES.get(node_type)
+    return None if known_type is None else NODE_STATUS_MODELS[known_type]
+
+
+def validate_node_status(
+    node_type: SmartboxNodeType | str, data: dict[str, Any] | bytes
+) -> AcmNodeStatus | HtrNodeStatus | HtrModNodeStatus | DefaultNodeStatus:
+    """Validate a node status with the model of its node type.
+
+    Statuses lacking the fields specific to their node type fall back to
+    DefaultNodeStatus. Unknown node types are validated as NodeStatus.
+    `data` is either the decoded payload or the JSON body itself.
+    """
+    known_type = _NODE_TYPES.get(node_type)
+    adapter = (
+        None if known_type is None else _NODE_STATUS_ADAPTERS.get(known_type)
+    )
+    if adapter is None:
+        return _validate(NodeStatus, data).root
+    if isinstance(data, bytes | str):
+        return adapter.validate_json(data)
+    return adapter.validate_python(data)
+
+
+def validate_node_setup(
+    node_type: SmartboxNodeType | str, data: dict[str, Any] | bytes
+) -> NodeSetup:
+    """Validate a node setup with the model of its node type."""
+    known_type = _NODE_TYPES.get(node_type)
+    model = None if known_type is None else NODE_SETUP_MODELS.get(known_type)
+    if model is None:
+        return _validate(NodeSetup, data)
+    return NodeSetup(root=_validate(model, data))
+
+
 class Node(BaseModel):
     """Node model."""
 
@@ -173,6 +393,43 @@ class Node(BaseModel):
     installed: bool
     lost: bool | None = False
 
+
+class NodeProg(BaseModel):
+    """Weekly programme of a node, the slots of the 7 days back to back."""
+
+    prog: list[Annotated[int, Field(ge=0, le=255)]]
+
+    @field_validator("prog")
+    @classmethod
+    def _check_days(cls, prog: list[int]) -> list[int]:
+        if len(prog) % _DAYS_PER_WEEK:
+            msg = "A programme needs 7 days with the same number of slots"
+            raise ValueError(msg)
+        return prog
+
+    @property
+    def slots_per_day(self) -> int:
+        """Get the number of slots per day."""
+        return len(self.prog) // _DAYS_PER_WEEK
+
+    def days(self) -> tuple[bytes, ...]:
+        """Get the programme as one compact byte string per day."""
+        size = self.slots_per_day
+        data = bytes(self.prog)
+        return tuple(
+            data[day * size : (day + 1) * size] for day in range(_DAYS_PER_WEEK)
+        )
+
+    @classmethod
+    def from_days(cls, days: Iterable[bytes | Sequence[int]]) -> Self:
+        """Build a programme from the slots of each day."""
+        slots = [bytes(day) for day in days]
+        if len(slots) != _DAYS_PER_WEEK or len({len(day) for day in slots}) > 1:
+            msg = "A programme needs 7 days with the same number of slots"
+            raise ValueError(msg)
+        return cls(prog=list(b"".join(slots)))
+
+
 class Nodes(BaseModel):
     """Nodes model."""
 
@@ -219,13 +476,18 @@ class Homes(RootModel[list[Home]]):
     root: list[Home]
 
 
-class Sample(BaseModel):
+class Sample(_ParsedValuesModel):
     """Pmo Sample model."""
 
     t: int
     counter: float
     temp: str
 
+    @functools.cached_property
+    def temp_value(self) -> float | None:
+        """Get the temperature as a number."""
+        return parse_number(self.temp)
+
 
 class PmoSample(BaseModel):
     """Default Sample."""
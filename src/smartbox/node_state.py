@@ -0,0 +1,169 @@
+"""Typed node states kept up to date from partial socket updates."""
+
+from collections.abc import Mapping
+import functools
+import logging
+from typing import Annotated, Any, TypedDict
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import SchemaValidator
+
+from smartbox.models import (
+    AcmNodeStatus,
+    DefaultNodeStatus,
+    HtrModNodeStatus,
+    HtrNodeStatus,
+    NodeSetup,
+    clear_parsed_values,
+    node_status_model,
+    validate_node_setup,
+    validate_node_status,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+NodeKey = tuple[str, int]
+
+
+@functools.cache
+def _delta_validator(model: type[BaseModel]) -> SchemaValidator:
+    """Get the validator of partial bodies of a model."""
+    fields = {
+        name: Annotated[(field.annotation, *field.metadata)]
+        if field.metadata
+        else field.annotation
+        for name, field in model.model_fields.items()
+    }
+    # The functional syntax is called through a variable as the name isn't
+    # a literal, which type checkers don't accept
+    typed_dict: Any = TypedDict
+    delta = typed_dict(f"{model.__name__}Delta", fields, total=False)
+    # The core validator skips the overhead of TypeAdapter.validate_python
+    return TypeAdapter(delta).validator  # type: ignore[return-value]
+
+
+def _validate_delta(
+    model: BaseModel, body: Mapping[str, Any]
+) -> list[tuple[BaseModel, dict[str, Any]]]:
+    """Validate a partial body of a model and of its nested models.
+
+    Return the validated values of each model, nothing is changed.
+    """
+    changes = []
+    fields = body
+    for name, value in body.items():
+        if isinstance(value, Mapping):
+            current = getattr(model, name, None)
+            if isinstance(current, BaseModel):
+                changes.extend(_validate_delta(current, value))
+                if fields is body:
+                    fields = dict(body)
+                del fields[name]  # type: ignore[attr-defined]
+    values = _delta_validator(type(model)).validate_python(fields)
+    changes.append((model, values))
+    return changes
+
+
+def apply_delta[ModelT: BaseModel](
+    model: ModelT, body: Mapping[str, Any]
+) -> ModelT:
+    """Merge a partial update body into a model in place.
+
+    The fields present in body, nested models included, are all validated
+    before any is changed, so the model is left as is if one is invalid.
+    Keys unknown to the model are ignored. Return the model.
+    """
+    for target, values in _validate_delta(model, body):
+        target.__dict__.update(values)
+        target.__pydantic_fields_set__.update(values)
+        clear_parsed_values(target, values)
+    return model
+
+
+class NodeStates:
+    """Status and setup models of the nodes of a device.
+
+    Updates are merged into the stored models, so the same objects are
+    returned for a node as long as its type model doesn't change. A status
+    first seen without the fields of its node type model (e.g. an acm status
+    without charge information) is promoted once they show up.
+    """
+
+    def __init__(self) -> None:
+        """Create empty node states."""
+        self._statuses: dict[
+            NodeKey,
+            AcmNodeStatus
+            | HtrNodeStatus
+            | HtrModNodeStatus
+            | DefaultNodeStatus,
+        ] = {}
+        self._setups: dict[NodeKey, NodeSetup] = {}
+
+    def status(
+        self, node_type: str, addr: int
+    ) -> (
+        AcmNodeStatus
+        | HtrNodeStatus
+        | HtrModNodeStatus
+        | DefaultNodeStatus
+        | None
+    ):
+        """Get the status of a node, if known."""
+        return self._statuses.get((node_type, addr))
+
+    def setup(self, node_type: str, addr: int) -> NodeSetup | None:
+        """Get the setup of a node, if known."""
+        return self._setups.get((node_type, addr))
+
+    def apply_status(
+        self, node_type: str, addr: int, body: Mapping[str, Any]
+    ) -> AcmNodeStatus | HtrNodeStatus | HtrModNodeStatus | DefaultNodeStatus:
+        """Merge a status update of a node and return its typed status."""
+        key = (node_type, addr)
+        current = self._statuses.get(key)
+        if current is None or self._needs_promotion(node_type, current, body):
+            data = (
+                dict(body)
+                if current is None
+                else {**current.model_dump(), **body}
+            )
+            status = validate_node_status(node_type, data)
+            _LOGGER.debug("(%s) Status of node %s validated", node_type, addr)
+            self._statuses[key] = status
+            return status
+        return apply_delta(current, body)
+
+    def apply_setup(
+        self, node_type: str, addr: int, body: Mapping[str, Any]
+    ) -> NodeSetup:
+        """Merge a setup update of a node and return its typed setup."""
+        key = (node_type, addr)
+        current = self._setups.get(key)
+        if current is None:
+            setup = validate_node_setup(node_type, dict(body))
+            self._setups[key] = setup
+            return setup
+        apply_delta(current.root, body)
+        return current
+
+    @staticmethod
+    def _needs_promotion(
+        node_type: str,
+        current: DefaultNodeStatus,
+        body: Mapping[str, Any],
+    ) -> bool:
+        """Whether body carries fields of the node type model only."""
+        model = node_status_model(node_type)
+        if model is None or isinstance(current, model):
+            return False
+        return any(
+            name in model.model_fields
+            and name not in type(current).model_fields
+            for name in body
+        )
+
+    def clear(self) -> None:
+        """Forget all node states."""
+        self._statuses.clear()
+        self._setups.clear()
@@ -0,0 +1,178 @@
+"""Record and replay of the messages of Smartbox sockets."""
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass
+import gzip
+import inspect
+import json
+import logging
+from pathlib import Path
+import time
+from typing import IO, Any, Self
+
+from smartbox.update_manager import BaseUpdateManager
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class RecordedEvent:
+    """Socket message received at timestamp (seconds since the epoch)."""
+
+    timestamp: float
+    event: str
+    data: Any
+    device_id: str | None = None
+
+
+class EventRecorder:
+    """Write socket messages to a gzip compressed JSON lines file.
+
+    Pass it to SocketSession (or UpdateManager) as recorder to record every
+    dev data and update dispatched. Each line holds the timestamp `t`, the
+    `event` name, the `device_id` and the message `data`.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Create a recorder writing to path, replacing any existing file."""
+        self._path = Path(path)
+        self._file: IO[str] | None = gzip.open(  # noqa: SIM115
+            self._path, "wt", encoding="utf-8"
+        )
+        self._count = 0
+
+    @property
+    def path(self) -> Path:
+        """Get the path of the recording."""
+        return self._path
+
+    @property
+    def count(self) -> int:
+        """Get the number of recorded messages."""
+        return self._count
+
+    def record(
+        self, event: str, data: object, device_id: str | None = None
+    ) -> None:
+        """Record a message received now."""
+        if self._file is None:
+            _LOGGER.debug("Recorder closed, ignoring %s", event)
+            return
+        line = {
+            "t": time.time(),
+            "event": event,
+            "device_id": device_id,
+            "data": data,
+        }
+        self._file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self._count += 1
+
+    def close(self) -> None:
+        """Flush and close the recording."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> Self:
+        """Enter the recording context."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the recording."""
+        self.close()
+
+
+def read_recording(path: str | Path) -> Iterator[RecordedEvent]:
+    """Iterate over the messages of a recording."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            yield RecordedEvent(
+                entry["t"],
+                entry["event"],
+                entry["data"],
+                entry.get("device_id"),
+            )
+
+
+@dataclass(slots=True, frozen=True)
+class ReplayStats:
+    """Dispatch throughput and latency (in seconds) of a replay."""
+
+    events: int
+    duration: float
+    throughput: float
+    latency_mean: float
+    latency_p50: float
+    latency_p99: float
+    latency_max: float
+
+    @classmethod
+    def from_latencies(cls, latencies: list[float], duration: float) -> Self:
+        """Compute the stats of the dispatch latencies of a replay."""
+        if not latencies:
+            return cls(0, duration, 0.0, 0.0, 0.0, 0.0, 0.0)
+        ordered = sorted(latencies)
+        count = len(ordered)
+        return cls(
+            events=count,
+            duration=duration,
+            throughput=count / duration if duration > 0 else float("inf"),
+            latency_mean=sum(ordered) / count,
+            latency_p50=ordered[(count - 1) // 2],
+            latency_p99=ordered[min(count - 1, int(count * 0.99))],
+            latency_max=ordered[-1],
+        )
+
+
+async def _paced(
+    events: Iterable[RecordedEvent], speed: float | None
+) -> AsyncIterator[RecordedEvent]:
+    """Yield events at their recorded pace divided by speed."""
+    loop = asyncio.get_running_loop()
+    start = first = 0.0
+    for index, event in enumerate(events):
+        if speed is not None:
+            if index == 0:
+                start, first = loop.time(), event.timestamp
+            delay = start + (event.timestamp - first) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield event
+
+
+async def replay(
+    manager: BaseUpdateManager,
+    recording: str | Path | Iterable[RecordedEvent],
+    speed: float | None = 1.0,
+) -> ReplayStats:
+    """Feed the messages of a recording to a manager.
+
+    With speed, messages are fed at their recorded pace sped up by speed
+    (1.0 for real time), as fast as possible otherwise. Latency is the time
+    taken by each dispatch, including the wait for blocking callback queues.
+    Messages are fed to the device they were recorded for when the manager
+    has it, to its default device otherwise.
+    """
+    if speed is not None and speed <= 0:
+        msg = f"Invalid replay speed {speed}"
+        raise ValueError(msg)
+    events = (
+        read_recording(recording)
+        if isinstance(recording, str | Path)
+        else recording
+    )
+    device_ids = set(manager.device_ids)
+    latencies: list[float] = []
+    started = time.perf_counter()
+    async for event in _paced(events, speed):
+        device_id = event.device_id if event.device_id in device_ids else None
+        dispatch_start = time.perf_counter()
+        result = manager.feed(event.event, event.data, device_id)
+        if inspect.isawaitable(result):
+            await result
+        latencies.append(time.perf_counter() - dispatch_start)
+    return ReplayStats.from_latencies(latencies, time.perf_counter() - started)
@@ -0,0 +1,144 @@
+"""Compact read-only records of node data for large fleets."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+import json
+import sys
+from typing import Any, Self
+
+from smartbox.models import SmartboxNodeType, parse_number
+
+
+def _intern[T: (str, str | None)](value: T) -> T:
+    """Share the few distinct strings of enumerated fields between records."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+_TRUE_STRINGS = frozenset({"1", "on", "t", "true", "y", "yes"})
+_FALSE_STRINGS = frozenset({"0", "off", "f", "false", "n", "no"})
+
+
+def _bool(value: object) -> bool:
+    """Parse a boolean like the models do, e.g. "false" is False."""
+    if type(value) is bool:
+        return value
+    if type(value) is int and value in {0, 1}:
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+    msg = f"Invalid boolean {value!r}"
+    raise ValueError(msg)
+
+
+def _optional_bool(value: object) -> bool | None:
+    return None if value is None else _bool(value)
+
+
+def _optional_int(value: str | float | None) -> int | None:
+    return None if value is None else int(value)
+
+
+@dataclass(slots=True, frozen=True)
+class NodeStatusRecord:
+    """Node status with numeric values parsed once.
+
+    A lighter alternative to the status models when many nodes are kept in
+    memory: no per instance dict nor validation state, enumerated strings
+    such as `mode` are interned, temperatures and power are floats in the
+    units of the node (`units`). The fields specific to a node type are None
+    for the other types.
+    """
+
+    node_type: str | None
+    mode: str
+    units: str
+    mtemp: float | None
+    stemp: float | None
+    comf_temp: float | None
+    eco_temp: float | None
+    ice_temp: float | None
+    pcb_temp: float | None
+    power_pcb_temp: float | None
+    power: float | None
+    act_duty: int
+    duty: int
+    active: bool
+    locked: bool
+    presence: bool
+    window_open: bool
+    true_radiant_active: bool
+    boost: bool
+    boost_end_min: int
+    boost_end_day: int
+    sync_status: str
+    error_code: str
+    charging: bool | None = None
+    charge_level: int | None = None
+    on: bool | None = None
+    selected_temp: str | None = None
+    comfort_temp: float | None = None
+    eco_offset: float | None = None
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: Mapping[str, Any],
+        node_type: SmartboxNodeType | str | None = None,
+    ) -> Self:
+        """Build a record from a status payload.
+
+        Booleans are parsed like the models do but the other fields aren't
+        validated. Raise ValueError when a field is missing or can't be
+        parsed.
+        """
+        try:
+            return cls(
+                node_type=node_type,
+                mode=_intern(data["mode"]),
+                units=_intern(data["units"]),
+                mtemp=parse_number(data["mtemp"]),
+                stemp=parse_number(data["stemp"]),
+                comf_temp=parse_number(data["comf_temp"]),
+                eco_temp=parse_number(data["eco_temp"]),
+                ice_temp=parse_number(data["ice_temp"]),
+                pcb_temp=parse_number(data["pcb_temp"]),
+                power_pcb_temp=parse_number(data["power_pcb_temp"]),
+                power=parse_number(data["power"]),
+                act_duty=int(data["act_duty"]),
+                duty=int(data["duty"]),
+                active=_bool(data["active"]),
+                locked=_bool(data["locked"]),
+                presence=_bool(data["presence"]),
+                window_open=_bool(data["window_open"]),
+                true_radiant_active=_bool(data["true_radiant_active"]),
+                boost=_bool(data["boost"]),
+                boost_end_min=int(data["boost_end_min"]),
+                boost_end_day=int(data["boost_end_day"]),
+                sync_status=_intern(data["sync_status"]),
+                error_code=_intern(data["error_code"]),
+                charging=_optional_bool(data.get("charging")),
+                charge_level=_optional_int(data.get("charge_level")),
+                on=_optional_bool(data.get("on")),
+                selected_temp=_intern(data.get("selected_temp")),
+                comfort_temp=parse_number(data.get("comfort_temp")),
+                eco_offset=parse_number(data.get("eco_offset")),
+            )
+        except KeyError as e:
+            msg = f"Missing node status field {e}"
+            raise ValueError(msg) from e
+        except TypeError as e:
+            msg = f"Invalid node status: {e}"
+            raise ValueError(msg) from e
+
+    @classmethod
+    def from_json(
+        cls,
+        body: bytes | str,
+        node_type: SmartboxNodeType | str | None = None,
+    ) -> Self:
+        """Build a record from a JSON status body."""
+        return cls.from_dict(json.loads(body), node_type)
@@ -0,0 +1,191 @@
+"""Routing of socket update paths to their subscribers."""
+
+from collections.abc import Iterator
+import re
+
+# Path regexes made of "/" separated segments, each being a literal, an
+# alternation of literals or a (named) wildcard, can be compiled to routes.
+_SEGMENT_RE = re.compile(
+    r"/(?:"
+    r"(?P<literal>[\w-]+)"
+    r"|\((?:\?:)?(?P<alternatives>[\w-]+(?:\|[\w-]+)+)\)"
+    r"|\(\?P<(?P<name>\w+)>(?P<named_wildcard>\[\^/\]\+|\\d\+)\)"
+    r"|(?P<wildcard>\[\^/\]\+|\\d\+)"
+    r")"
+)
+_ANY = "any"
+_DIGITS = "digits"
+_WILDCARDS = {"[^/]+": _ANY, r"\d+": _DIGITS}
+
+
+class _RouteNode[T]:
+    """Node of the routing trie, one level per path segment."""
+
+    __slots__ = ("exact", "literals", "open", "wildcards")
+
+    def __init__(self) -> None:
+        self.literals: dict[str, _RouteNode[T]] = {}
+        # (kind, group name or None, child) of the wildcard segments
+        self.wildcards: list[tuple[str, str | None, _RouteNode[T]]] = []
+        # Routes ending with `$` here
+        self.exact: list[tuple[int, T]] = []
+        # Routes without `$` whose last segment comes next, as (seq, target,
+        # kind, literals or wildcard, group name). Like the regex, that
+        # segment only has to start with what the route expects.
+        self.open: list[tuple[int, T, str, list[str] | str, str | None]] = []
+
+    def wildcard(self, kind: str, name: str | None) -> "_RouteNode[T]":
+        for other_kind, other_name, existing in self.wildcards:
+            if other_kind == kind and other_name == name:
+                return existing
+        child: _RouteNode[T] = _RouteNode()
+        self.wildcards.append((kind, name, child))
+        return child
+
+
+def _compile(
+    pattern: str,
+) -> list[tuple[str, list[str] | str, str | None]] | None:
+    """Split a path regex in segments, None if it isn't a simple route.
+
+    Segments are ("literal", [values], None) or (kind, wildcard, name).
+    """
+    if not pattern.startswith("^"):
+        return None
+    end = len(pattern)
+    if pattern.endswith("$"):
+        end -= 1
+    segments: list[tuple[str, list[str] | str, str | None]] = []
+    pos = 1
+    while pos < end:
+        m = _SEGMENT_RE.match(pattern, pos, end)
+        if m is None:
+            return None
+        if m["literal"] is not None:
+            segments.append(("literal", [m["literal"]], None))
+        elif m["alternatives"] is not None:
+            segments.append(("literal", m["alternatives"].split("|"), None))
+        else:
+            wildcard = m["named_wildcard"] or m["wildcard"]
+            segments.append((_WILDCARDS[wildcard], wildcard, m["name"]))
+        pos = m.end()
+    return segments or None
+
+
+def _match_start(kind: str, value: list[str] | str, segment: str) -> str | None:
+    """Match the start of a segment like the regex, None if it doesn't."""
+    if kind == "literal":
+        return next((v for v in value if segment.startswith(v)), None)
+    if kind == _ANY:
+        return segment or None
+    # \d matches the characters accepted by str.isdecimal
+    end = 0
+    while end < len(segment) and segment[end].isdecimal():
+        end += 1
+    return segment[:end] or None
+
+
+class PathRouter[T]:
+    r"""Find the targets whose path regex matches an update path.
+
+    Path regexes such as `^/(?P<node_type>[^/]+)/(?P<addr>\d+)/status` are
+    compiled into a trie of path segments with typed wildcards, so routing a
+    path only visits the routes it can match. Routes match like re.search:
+    without `$`, `^/connected` also matches "/connectedness" and the paths
+    below it. Other regexes are searched one by one. Matches come in the
+    order targets were added, with the named groups of the route.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty router."""
+        self._root: _RouteNode[T] = _RouteNode()
+        self._regexes: list[tuple[int, re.Pattern[str], T]] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Get the number of routes."""
+        return self._count
+
+    def add(self, path_regex: str | re.Pattern[str], target: T) -> None:
+        """Route the paths matching path_regex to target."""
+        pattern = (
+            path_regex.pattern
+            if isinstance(path_regex, re.Pattern)
+            else path_regex
+        )
+        seq = self._count
+        self._count += 1
+        segments = (
+            _compile(pattern)
+            if not isinstance(path_regex, re.Pattern)
+            or path_regex.flags == re.UNICODE
+            else None
+        )
+        if segments is None:
+            self._regexes.append((seq, re.compile(path_regex), target))
+            return
+        exact = pattern.endswith("$")
+        nodes = [self._root]
+        for kind, value, name in segments if exact else segments[:-1]:
+            if kind == "literal":
+                nodes = [
+                    node.literals.setdefault(literal, _RouteNode())
+                    for node in nodes
+                    for literal in value
+                ]
+            else:
+                nodes = [node.wildcard(kind, name) for node in nodes]
+        for node in nodes:
+            if exact:
+                node.exact.append((seq, target))
+            else:
+                node.open.append((seq, target, *segments[-1]))
+
+    def match(self, path: str) -> list[tuple[T, dict[str, str]]]:
+        """Get the targets routed for path with their named groups."""
+        matches: list[tuple[int, T, dict[str, str]]] = []
+        if path.startswith("/"):
+            segments = path[1:].split("/")
+            matches.extend(self._walk(self._root, segments, 0, {}))
+        for seq, regex, target in self._regexes:
+            m = regex.search(path)
+            if m:
+                matches.append((seq, target, m.groupdict()))
+        if len(matches) > 1:
+            matches.sort(key=lambda match: match[0])
+        return [(target, groups) for _, target, groups in matches]
+
+    def _walk(
+        self,
+        node: _RouteNode[T],
+        segments: list[str],
+        depth: int,
+        groups: dict[str, str],
+    ) -> Iterator[tuple[int, T, dict[str, str]]]:
+        if depth == len(segments):
+            for seq, target in node.exact:
+                yield seq, target, groups
+            return
+        segment = segments[depth]
+        for seq, target, kind, value, name in node.open:
+            matched = _match_start(kind, value, segment)
+            if matched is not None:
+                yield (
+                    seq,
+                    target,
+                    groups if name is None else {**groups, name: matched},
+                )
+        child = node.literals.get(segment)
+        if child is not None:
+            yield from self._walk(child, segments, depth + 1, groups)
+        if not segment:
+            return
+        for kind, name, child in node.wildcards:
+            if kind == _DIGITS and not segment.isdecimal():
+                continue
+            yield from self._walk(
+                child,
+                segments,
+                depth + 1,
+                groups if name is None else {**groups, name: segment},
+            )
@@ -0,0 +1,209 @@
+"""Local SQLite store of node samples."""
+
+from array import array
+from collections.abc import Iterable, Mapping
+import logging
+import os
+import sqlite3
+import time
+from typing import Any
+
+from smartbox.models import Node, Samples
+from smartbox.samples import ColumnarSamples
+from smartbox.session import AsyncSmartboxSession
+
+_DEFAULT_INITIAL_WINDOW = 24 * 3600
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    device_id TEXT NOT NULL,
+    node_type TEXT NOT NULL,
+    addr INTEGER NOT NULL,
+    t INTEGER NOT NULL,
+    counter REAL NOT NULL,
+    temp TEXT,
+    min REAL,
+    max REAL,
+    PRIMARY KEY (device_id, node_type, addr, t)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS high_water_marks (
+    device_id TEXT NOT NULL,
+    node_type TEXT NOT NULL,
+    addr INTEGER NOT NULL,
+    last_t INTEGER NOT NULL,
+    PRIMARY KEY (device_id, node_type, addr)
+) WITHOUT ROWID;
+"""
+
+
+class SampleStore:
+    """Incremental local store of node samples keyed by device and node.
+
+    The store keeps the last stored timestamp (high-water mark) of every
+    node, so `sync` only downloads samples newer than what is already stored
+    and range queries are answered locally.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] = ":memory:") -> None:
+        """Open (and create if needed) a sample store."""
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._conn.close()
+
+    def last_timestamp(
+        self, device_id: str, node_type: str, addr: int
+    ) -> int | None:
+        """Return the timestamp of the newest stored sample for a node."""
+        row = self._conn.execute(
+            "SELECT last_t FROM high_water_marks "
+            "WHERE device_id = ? AND node_type = ? AND addr = ?",
+            (device_id, node_type, addr),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def add_samples(
+        self,
+        device_id: str,
+        node_type: str,
+        addr: int,
+        samples: Iterable[Mapping[str, Any]],
+    ) -> int:
+        """Store raw samples of a node in one batch, return the number added."""
+        rows = [
+            (
+                device_id,
+                node_type,
+                addr,
+                int(sample["t"]),
+                float(sample["counter"]),
+                None if "temp" not in sample else str(sample["temp"]),
+                None if "min" not in sample else float(sample["min"]),
+                None if "max" not in sample else float(sample["max"]),
+            )
+            for sample in samples
+        ]
+        if not rows:
+            return 0
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute(
+                "INSERT INTO high_water_marks VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (device_id, node_type, addr) "
+                "DO UPDATE SET last_t = max(last_t, excluded.last_t)",
+                (device_id, node_type, addr, max(row[3] for row in rows)),
+            )
+        return added
+
+    async def sync(
+        self,
+        session: AsyncSmartboxSession,
+        device_id: str,
+        node: dict[str, Any],
+        end_time: int | None = None,
+        initial_window: int = _DEFAULT_INITIAL_WINDOW,
+    ) -> int:
+        """Fetch and store the samples newer than the node's high-water mark.
+
+        Nodes without stored samples are fetched from `initial_window`
+        seconds before `end_time`. Returns the number of new samples.
+        """
+        _node = Node.model_validate(node)
+        if end_time is None:
+            end_time = int(time.time())
+        last_t = self.last_timestamp(device_id, _node.type, _node.addr)
+        start_time = end_time - initial_window if last_t is None else last_t + 1
+        if start_time > end_time:
+            return 0
+        response = await session.get_node_samples(
+            device_id, node, start_time=start_time, end_time=end_time
+        )
+        if isinstance(response, Samples):
+            response = response.model_dump(mode="json")
+        added = self.add_samples(
+            device_id, _node.type, _node.addr, response["samples"]
+        )
+        _LOGGER.debug(
+            "Synced %s new samples for %s/%s/%s from %s to %s",
+            added,
+            device_id,
+            _node.type,
+            _node.addr,
+            start_time,
+            end_time,
+        )
+        return added
+
+    def _select(
+        self,
+        device_id: str,
+        node_type: str,
+        addr: int,
+        start: int | None,
+        end: int | None,
+    ) -> sqlite3.Cursor:
+        return self._conn.execute(
+            "SELECT t, counter, temp, min, max FROM samples "
+            "WHERE device_id = ? AND node_type = ? AND addr = ? "
+            "AND t >= ? AND t < ? ORDER BY t",
+            (
+                device_id,
+                node_type,
+                addr,
+                -(2**63) if start is None else start,
+                2**63 - 1 if end is None else end,
+            ),
+        )
+
+    def query(
+        self,
+        device_id: str,
+        node_type: str,
+        addr: int,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> dict[str, Any]:
+        """Return stored samples with start <= t < end in the API format."""
+        samples: list[dict[str, Any]] = []
+        for t, counter, temp, min_, max_ in self._select(
+            device_id, node_type, addr, start, end
+        ):
+            if temp is not None:
+                samples.append({"t": t, "counter": counter, "temp": temp})
+            else:
+                samples.append(
+                    {"t": t, "counter": counter, "min": min_, "max": max_}
+                )
+        return {"samples": samples}
+
+    def query_columnar(
+        self,
+        device_id: str,
+        node_type: str,
+        addr: int,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> ColumnarSamples:
+        """Return stored samples with start <= t < end as columns."""
+        rows = self._select(device_id, node_type, addr, start, end).fetchall()
+        if rows and rows[0][2] is None:
+            return ColumnarSamples(
+                t=array("q", (row[0] for row in rows)),
+                counter=array("d", (row[1] for row in rows)),
+                min=array("d", (row[3] for row in rows)),
+                max=array("d", (row[4] for row in rows)),
+            )
+        return ColumnarSamples(
+            t=array("q", (row[0] for row in rows)),
+            counter=array("d", (row[1] for row in rows)),
+            temp=array("d", (float(row[2]) for row in rows)),
+        )
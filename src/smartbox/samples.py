@@ -0,0 +1,251 @@
+"""Columnar containers for node samples."""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Mapping
+from itertools import pairwise
+import math
+from typing import Any, Self
+
+from smartbox.models import PmoSample, Sample, Samples
+
+
+def _column(typecode: str, values: Iterable[Any]) -> array:
+    """Build a typed column, parsing string values."""
+    if typecode == "q":
+        return array(typecode, (int(value) for value in values))
+    return array(typecode, (float(value) for value in values))
+
+
+class ResampledSamples:
+    """Samples aggregated into fixed-size time buckets.
+
+    `t` holds the start of every bucket and `count` the number of samples in
+    it. Temperature buckets carry `temp_mean`, `temp_min` and `temp_max`;
+    pmo buckets carry the lowest `min` and highest `max` power. `energy` is
+    the consumption accumulated from counter deltas ending in the bucket.
+    """
+
+    __slots__ = (
+        "count",
+        "energy",
+        "max",
+        "min",
+        "t",
+        "temp_max",
+        "temp_mean",
+        "temp_min",
+    )
+
+    def __init__(self, pmo: bool) -> None:
+        """Create empty resampled columns."""
+        self.t = array("q")
+        self.count = array("q")
+        self.energy = array("d")
+        self.temp_mean: array | None = None if pmo else array("d")
+        self.temp_min: array | None = None if pmo else array("d")
+        self.temp_max: array | None = None if pmo else array("d")
+        self.min: array | None = array("d") if pmo else None
+        self.max: array | None = array("d") if pmo else None
+
+    def __len__(self) -> int:
+        """Return the number of buckets."""
+        return len(self.t)
+
+    def _append(
+        self,
+        t: int,
+        count: int,
+        energy: float,
+        total: float,
+        low: float,
+        high: float,
+    ) -> None:
+        self.t.append(t)
+        self.count.append(count)
+        self.energy.append(energy)
+        if self.temp_mean is not None:
+            self.temp_mean.append(total / count if count else math.nan)
+            self.temp_min.append(low)  # type: ignore[union-attr]
+            self.temp_max.append(high)  # type: ignore[union-attr]
+        else:
+            self.min.append(low)  # type: ignore[union-attr]
+            self.max.append(high)  # type: ignore[union-attr]
+
+
+class ColumnarSamples:
+    """Array backed samples of a node.
+
+    Each field is stored in its own typed array instead of one pydantic
+    object per sample, with `temp`, `min` and `max` parsed to floats. Heater
+    and accumulator samples carry `temp`, pmo samples carry `min`/`max`.
+    Samples are expected to be sorted by `t`, as returned by the API.
+    """
+
+    __slots__ = ("counter", "max", "min", "t", "temp")
+
+    def __init__(
+        self,
+        t: array,
+        counter: array,
+        temp: array | None = None,
+        min: array | None = None,  # noqa: A002
+        max: array | None = None,  # noqa: A002
+    ) -> None:
+        """Create columnar samples from already typed columns."""
+        self.t = t
+        self.counter = counter
+        self.temp = temp
+        self.min = min
+        self.max = max
+
+    @classmethod
+    def from_response(cls, response: Mapping[str, Any]) -> Self:
+        """Build columnar samples from a raw samples response."""
+        samples: list[dict[str, Any]] = response["samples"]
+        if samples and "temp" not in samples[0]:
+            return cls(
+                t=_column("q", (s["t"] for s in samples)),
+                counter=_column("d", (s["counter"] for s in samples)),
+                min=_column("d", (s["min"] for s in samples)),
+                max=_column("d", (s["max"] for s in samples)),
+            )
+        return cls(
+            t=_column("q", (s["t"] for s in samples)),
+            counter=_column("d", (s["counter"] for s in samples)),
+            temp=_column("d", (s["temp"] for s in samples)),
+        )
+
+    @classmethod
+    def from_samples(cls, samples: Samples) -> Self:
+        """Build columnar samples from a Samples model."""
+        rows: list[PmoSample | Sample] = samples.samples
+        if rows and isinstance(rows[0], PmoSample):
+            return cls(
+                t=_column("q", (s.t for s in rows)),
+                counter=_column("d", (s.counter for s in rows)),
+                min=_column("d", (s.min for s in rows)),  # type: ignore[union-attr]
+                max=_column("d", (s.max for s in rows)),  # type: ignore[union-attr]
+            )
+        return cls(
+            t=_column("q", (s.t for s in rows)),
+            counter=_column("d", (s.counter for s in rows)),
+            temp=_column("d", (s.temp for s in rows)),  # type: ignore[union-attr]
+        )
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self.t)
+
+    def __repr__(self) -> str:
+        """Printable representation."""
+        return f"ColumnarSamples(len={len(self)}, pmo={self.is_pmo})"
+
+    @property
+    def is_pmo(self) -> bool:
+        """Whether these are power monitor samples (min/max instead of temp)."""
+        return self.temp is None
+
+    def between(self, start: int, end: int) -> Self:
+        """Return a copy of the samples with start <= t < end.
+
+        The range is found by bisection, only its rows are copied.
+        """
+        lo = bisect_left(self.t, start)
+        hi = bisect_left(self.t, end, lo)
+        return type(self)(
+            t=self.t[lo:hi],
+            counter=self.counter[lo:hi],
+            temp=None if self.temp is None else self.temp[lo:hi],
+            min=None if self.min is None else self.min[lo:hi],
+            max=None if self.max is None else self.max[lo:hi],
+        )
+
+    def energy_deltas(self) -> array:
+        """Energy consumed between consecutive samples.
+
+        The `counter` field is cumulative; a decreasing counter is treated as
+        a reset to zero, so the delta is the new counter value.
+        """
+        return array(
+            "d",
+            (
+                cur - prev if cur >= prev else cur
+                for prev, cur in pairwise(self.counter)
+            ),
+        )
+
+    def total_energy(self) -> float:
+        """Energy consumed over the whole range of samples."""
+        return sum(self.energy_deltas())
+
+    def resample(
+        self,
+        interval: int,
+        offset: int = 0,
+        fill_gaps: bool = False,
+    ) -> ResampledSamples:
+        """Aggregate samples into buckets of `interval` seconds in one pass.
+
+        Buckets start at multiples of `interval` shifted by `offset` seconds
+        (e.g. a timezone offset for daily buckets). Energy between two
+        samples is accounted to the bucket of the later sample, treating a
+        decreasing counter as a reset. Buckets without samples are skipped,
+        or emitted with a zero count and NaN temperatures if `fill_gaps`.
+        """
+        if interval <= 0:
+            msg = f"Resampling interval must be positive, got {interval}"
+            raise ValueError(msg)
+        pmo = self.is_pmo
+        result = ResampledSamples(pmo)
+        lows = self.min if pmo else self.temp
+        highs = self.max if pmo else self.temp
+        t_col = self.t
+        counter = self.counter
+        bucket = count = 0
+        energy = total = 0.0
+        low = high = math.nan
+        for i in range(len(t_col)):
+            t = t_col[i]
+            sample_bucket = t - (t - offset) % interval
+            if count == 0 or sample_bucket != bucket:
+                if count:
+                    result._append(bucket, count, energy, total, low, high)  # noqa: SLF001
+                    if fill_gaps:
+                        for gap in range(
+                            bucket + interval, sample_bucket, interval
+                        ):
+                            result._append(gap, 0, 0.0, 0.0, math.nan, math.nan)  # noqa: SLF001
+                bucket = sample_bucket
+                count = 0
+                energy = total = 0.0
+                low = lows[i]  # type: ignore[index]
+                high = highs[i]  # type: ignore[index]
+            if i:
+                cur, prev = counter[i], counter[i - 1]
+                energy += cur - prev if cur >= prev else cur
+            count += 1
+            if not pmo:
+                total += self.temp[i]  # type: ignore[index]
+            low = min(low, lows[i])  # type: ignore[index]
+            high = max(high, highs[i])  # type: ignore[index]
+        if count:
+            result._append(bucket, count, energy, total, low, high)  # noqa: SLF001
+        return result
+
+    def to_numpy(self) -> dict[str, Any]:
+        """Return the columns as numpy arrays sharing the same buffers.
+
+        numpy is not a dependency of smartbox and must be installed separately.
+        """
+        import numpy as np  # noqa: PLC0415
+
+        columns = {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if getattr(self, name) is not None
+        }
+        return {
+            name: np.frombuffer(column, dtype=column.typecode)
+            for name, column in columns.items()
+        }
@@ -1,16 +1,18 @@
 """Interaction with smartbox API."""
 
 import asyncio
+from collections.abc import Awaitable, Callable
 import datetime
 import json
 import logging
 import time
-from typing import Any
+from typing import Any, TypeVar
 
 import aiohttp
 from aiohttp import ClientSession
-from pydantic import ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
+from smartbox.connection import ConnectionProfile
 from smartbox.error import APIUnavailableError, InvalidAuthError, SmartboxError
 from smartbox.models import (
     AcmNodeStatus,
@@ -24,13 +26,17 @@ from smartbox.models import (
     HtrModNodeStatus,
     HtrNodeStatus,
     Node,
+    NodeProg,
     Nodes,
     NodeSetup,
-    NodeStatus,
     Samples,
     SmartboxNodeType,
     Token,
+    ValidationMode,
+    validate_node_setup,
+    validate_node_status,
 )
+from smartbox.records import NodeStatusRecord
 from smartbox.reseller import AvailableResellers, SmartboxReseller
 
 _DEFAULT_RETRY_ATTEMPTS = 5
@@ -41,6 +47,11 @@ _MIN_TOKEN_LIFETIME = (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Built once, validating straight from the response body.
+_HOME_LIST_ADAPTER: TypeAdapter[list[Home]] = TypeAdapter(list[Home])
+
+_ModelT = TypeVar("_ModelT", bound=BaseModel)
+
 
 class AsyncSession:
     """Base class for Session."""
@@ -57,15 +68,30 @@ class AsyncSession:
         basic_auth_credentials: str | None = None,
         x_serial_id: int | None = None,
         x_referer: str | None = None,
+        connection_profile: ConnectionProfile | None = None,
+        api_host: str | None = None,
+        validation_mode: ValidationMode | str | None = None,
+        compact_status: bool = False,
     ) -> None:
-        """Init the session."""
+        """Init the session.
+
+        Without websession, the session creates and reuses its own http
+        client configured by connection_profile (defaults apply if None).
+        api_host overrides the reseller API url, e.g. for a local server.
+        validation_mode takes precedence over raw_response, which stands
+        for ValidationMode.RAW when True and ValidationMode.FULL otherwise.
+        With compact_status, node statuses are returned as NodeStatusRecord
+        unless in raw mode.
+        """
         self._reseller = AvailableResellers(
             api_url=api_name,
             basic_auth=basic_auth_credentials,
             serial_id=x_serial_id,
             web_url=x_referer,
         ).reseller
-        self._api_host: str = f"https://{self.reseller.api_url}.helki.com"
+        self._api_host: str = (
+            api_host or f"https://{self.reseller.api_url}.helki.com"
+        )
         self._basic_auth_credentials: str | None = basic_auth_credentials
         self._retry_attempts: int = retry_attempts
         self._backoff_factor: float = backoff_factor
@@ -73,7 +99,19 @@ class AsyncSession:
         self._password: str = password
         self._access_token: str = ""
         self._client_session: ClientSession | None = websession
-        self.raw_response: bool = raw_response
+        self._connection_profile: ConnectionProfile = (
+            connection_profile or ConnectionProfile()
+        )
+        self._owned_client_session: ClientSession | None = None
+        self._owned_client_loop: asyncio.AbstractEventLoop | None = None
+        self.validation_mode: ValidationMode = (
+            ValidationMode(validation_mode)
+            if validation_mode is not None
+            else ValidationMode.RAW
+            if raw_response
+            else ValidationMode.FULL
+        )
+        self.compact_status: bool = compact_status
         self._headers: dict[str, str] = {
             "Authorization": f"Bearer {self._access_token}",
             "Content-Type": "application/json",
@@ -83,6 +121,17 @@ class AsyncSession:
         if self.reseller.web_url:
             self._headers.update({"x-referer": self.reseller.web_url})
 
+    @property
+    def raw_response(self) -> bool:
+        """Whether decoded payloads are returned instead of models."""
+        return self.validation_mode is ValidationMode.RAW
+
+    @raw_response.setter
+    def raw_response(self, raw_response: bool) -> None:
+        self.validation_mode = (
+            ValidationMode.RAW if raw_response else ValidationMode.FULL
+        )
+
     @property
     def reseller(self) -> SmartboxReseller:
         """Get the reseller."""
@@ -113,12 +162,36 @@ class AsyncSession:
         """Get auth expiracy."""
         return self._expires_at
 
+    @property
+    def connection_profile(self) -> ConnectionProfile:
+        """Get the connection profile of the owned http client."""
+        return self._connection_profile
+
     @property
     def client(self) -> ClientSession:
         """Return the underlying http client."""
-        if not self._client_session:
-            return ClientSession()
-        return self._client_session
+        if self._client_session:
+            return self._client_session
+        # The owned client is bound to the loop it was created in, and the
+        # sync Session runs every call in a new loop.
+        loop = asyncio.get_running_loop()
+        if (
+            self._owned_client_session is None
+            or self._owned_client_session.closed
+            or self._owned_client_loop is not loop
+        ):
+            self._owned_client_session = (
+                self._connection_profile.create_client_session()
+            )
+            self._owned_client_loop = loop
+        return self._owned_client_session
+
+    async def close(self) -> None:
+        """Close the http client created by this session, if any."""
+        if self._owned_client_session is not None:
+            await self._owned_client_session.close()
+            self._owned_client_session = None
+            self._owned_client_loop = None
 
     async def health_check(self) -> dict[str, Any]:
         """Check if the API is alived."""
@@ -215,14 +288,19 @@ class AsyncSession:
                 },
             )
 
-    async def _api_request(self, path: str) -> dict[str, Any]:
-        """Make a GET request."""
+    async def _api_get[T](
+        self,
+        path: str,
+        read: Callable[[aiohttp.ClientResponse], Awaitable[T]],
+    ) -> T:
+        """Make a GET request, return the response read by read."""
         await self.check_refresh_auth()
         api_url = f"{self._api_host}/api/v2/{path}"
         try:
             _LOGGER.debug("Getting %s.", api_url)
             response = await self.client.get(api_url, headers=self._headers)
-            _LOGGER.debug("Response %s.", (await response.json()))
+            data = await read(response)
+            _LOGGER.debug("Response %s.", data)
         except (
             aiohttp.ClientConnectionError,
             aiohttp.ClientConnectorError,
@@ -235,7 +313,19 @@ class AsyncSession:
                 e.status,
             )
             raise SmartboxError(e) from e
-        return await response.json()
+        return data
+
+    async def _api_request(self, path: str) -> Any:  # noqa: ANN401
+        """Make a GET request, return the decoded JSON body.
+
+        Depending on the endpoint the body is an object or a list, the
+        callers know which.
+        """
+        return await self._api_get(path, lambda response: response.json())
+
+    async def _api_request_bytes(self, path: str) -> bytes:
+        """Make a GET request, return the undecoded response body."""
+        return await self._api_get(path, lambda response: response.read())
 
     async def _api_post(
         self,
@@ -272,76 +362,115 @@ class AsyncSession:
 class AsyncSmartboxSession(AsyncSession):
     """Asynchronous Smartbox Session. This should be the default one."""
 
+    async def _get_model(self, path: str, model: type[_ModelT]) -> _ModelT:
+        """Get a response validated straight from its body."""
+        return model.model_validate_json(await self._api_request_bytes(path))
+
     async def get_devices(self) -> list[dict[str, Any]] | Devices:
         """Get all devices."""
-        response = await self._api_request("devs")
-        _LOGGER.debug("Get devices %s", response)
-        devices: Devices = Devices.model_validate(response)
-        if self.raw_response is False:
-            return devices
-        return [
-            device.model_dump(mode="json")
-            for device in (devices.devs + devices.invited_to)
-        ]
+        if self.validation_mode is ValidationMode.RAW:
+            response = await self._api_request("devs")
+            _LOGGER.debug("Get devices %s", response)
+            return response["devs"] + response["invited_to"]
+        return await self._get_model("devs", Devices)
 
     async def get_homes(self) -> list[dict[str, Any]] | list[Home]:
         """Get homes."""
-        response = await self._api_request("grouped_devs")
-        homes: list[Home] = Homes.model_validate(response).root
-        if self.raw_response is False:
-            return homes
-        return [home.model_dump(mode="json") for home in homes]
+        if self.validation_mode is ValidationMode.RAW:
+            return await self._api_request("grouped_devs")
+        return _HOME_LIST_ADAPTER.validate_json(
+            await self._api_request_bytes("grouped_devs")
+        )
 
     async def get_home_guests(
         self, home_id: str
     ) -> list[dict[str, Any]] | Guests:
         """Get all devices."""
-        response = await self._api_request(f"groups/{home_id}/guest_users")
-        guests: Guests = Guests.model_validate(response)
-        if self.raw_response is False:
-            return guests
-        return [guest.model_dump(mode="json") for guest in guests.guest_users]
+        path = f"groups/{home_id}/guest_users"
+        if self.validation_mode is ValidationMode.RAW:
+            return (await self._api_request(path))["guest_users"]
+        return await self._get_model(path, Guests)
 
     async def get_grouped_devices(self) -> list[dict[str, Any]] | Homes:
         """Get grouped devices."""
-        response = await self._api_request("grouped_devs")
-        homes: Homes = Homes.model_validate(response)
-        if self.raw_response is False:
-            return homes
-        return [home.model_dump(mode="json") for home in homes.root]
+        if self.validation_mode is ValidationMode.RAW:
+            return await self._api_request("grouped_devs")
+        return await self._get_model("grouped_devs", Homes)
+
+    async def _get_home_device_ids(
+        self, home: Home | dict[str, Any] | str
+    ) -> list[str]:
+        """Get the ids of the devices of a home, given the home or its id."""
+        if isinstance(home, str):
+            response = await self._api_request("grouped_devs")
+            homes = Homes.model_validate(response).root
+            home_model = next((h for h in homes if h.id == home), None)
+            if home_model is None:
+                msg = f"Home {home} not found"
+                raise SmartboxError(msg)
+        else:
+            home_model = Home.model_validate(home)
+        return [device.dev_id for device in home_model.devs or []]
+
+    async def _apply_to_home(
+        self,
+        home: Home | dict[str, Any] | str,
+        operation: Callable[[str], Awaitable[Any]],
+    ) -> dict[str, BaseException]:
+        """Apply an operation to all devices of a home concurrently.
+
+        Return the errors of the devices where the operation failed.
+        """
+        device_ids = await self._get_home_device_ids(home)
+        results = await asyncio.gather(
+            *(operation(device_id) for device_id in device_ids),
+            return_exceptions=True,
+        )
+        failures = {
+            device_id: result
+            for device_id, result in zip(device_ids, results, strict=True)
+            if isinstance(result, BaseException)
+        }
+        if failures:
+            _LOGGER.warning(
+                "Operation failed on %s of %s devices: %s",
+                len(failures),
+                len(device_ids),
+                failures,
+            )
+        return failures
 
     async def get_nodes(
         self,
         device_id: str,
     ) -> list[dict[str, Any]] | list[Node]:
         """Get nodes from devices."""
-        response = await self._api_request(f"devs/{device_id}/mgr/nodes")
-        _LOGGER.debug("Get nodes %s", response)
-        if self.raw_response is True:
+        path = f"devs/{device_id}/mgr/nodes"
+        if self.validation_mode is ValidationMode.RAW:
+            response = await self._api_request(path)
+            _LOGGER.debug("Get nodes %s", response)
             return response["nodes"]
-        return Nodes.model_validate(response).nodes
+        return (await self._get_model(path, Nodes)).nodes
 
     async def get_device_connected(
         self,
         device_id: str,
     ) -> dict[str, bool] | DeviceConnected:
         """Get device away status."""
-        response = await self._api_request(f"devs/{device_id}/connected")
-        status: DeviceConnected = DeviceConnected.model_validate(response)
-        if self.raw_response is False:
-            return status
-        return status.model_dump(mode="json")
+        path = f"devs/{device_id}/connected"
+        if self.validation_mode is ValidationMode.RAW:
+            return await self._api_request(path)
+        return await self._get_model(path, DeviceConnected)
 
     async def get_device_away_status(
         self,
         device_id: str,
     ) -> dict[str, bool] | DeviceAwayStatus:
         """Get device away status."""
-        response = await self._api_request(f"devs/{device_id}/mgr/away_status")
-        status: DeviceAwayStatus = DeviceAwayStatus.model_validate(response)
-        if self.raw_response is False:
-            return status
-        return status.model_dump(mode="json")
+        path = f"devs/{device_id}/mgr/away_status"
+        if self.validation_mode is ValidationMode.RAW:
+            return await self._api_request(path)
+        return await self._get_model(path, DeviceAwayStatus)
 
     async def set_device_away_status(
         self,
@@ -355,6 +484,22 @@ class AsyncSmartboxSession(AsyncSession):
             path=f"devs/{device_id}/mgr/away_status",
         )
 
+    async def set_home_away_status(
+        self,
+        home: Home | dict[str, Any] | str,
+        status_args: dict[str, Any],
+    ) -> dict[str, BaseException]:
+        """Set the away status of all devices of a home.
+
+        Return the errors of the devices that could not be updated.
+        """
+        return await self._apply_to_home(
+            home,
+            lambda device_id: self.set_device_away_status(
+                device_id, status_args
+            ),
+        )
+
     async def get_device_power_limit(
         self, device_id: str, node: dict[str, Any] | None = None
     ) -> int:
@@ -391,6 +536,22 @@ class AsyncSmartboxSession(AsyncSession):
             path=f"devs/{device_id}/{_node_type}/power_limit",
         )
 
+    async def set_home_power_limit(
+        self,
+        home: Home | dict[str, Any] | str,
+        power_limit: int,
+    ) -> dict[str, BaseException]:
+        """Set the power limit of all devices of a home.
+
+        Return the errors of the devices that could not be updated.
+        """
+        return await self._apply_to_home(
+            home,
+            lambda device_id: self.set_device_power_limit(
+                device_id, power_limit
+            ),
+        )
+
     async def get_node_samples(
         self,
         device_id: str,
@@ -409,13 +570,12 @@ class AsyncSmartboxSession(AsyncSession):
             datetime.datetime.fromtimestamp(end_time, tz=datetime.UTC),
         )
         _node: Node = Node.model_validate(node)
-        response = await self._api_request(
-            f"devs/{device_id}/{_node.type}/{_node.addr}/samples?start={start_time}&end={end_time}",
-        )
-        _LOGGER.debug("Get_Device_Samples_Node: %s", response)
-        if self.raw_response is True:
+        path = f"devs/{device_id}/{_node.type}/{_node.addr}/samples?start={start_time}&end={end_time}"
+        if self.validation_mode is ValidationMode.RAW:
+            response = await self._api_request(path)
+            _LOGGER.debug("Get_Device_Samples_Node: %s", response)
             return response
-        return Samples.model_validate(response)
+        return await self._get_model(path, Samples)
 
     async def get_node_status(
         self,
@@ -427,21 +587,25 @@ class AsyncSmartboxSession(AsyncSession):
         | HtrNodeStatus
         | HtrModNodeStatus
         | DefaultNodeStatus
+        | NodeStatusRecord
         | None
     ):
         """Get a node status."""
         _node: Node = Node.model_validate(node)
-        response = await self._api_request(
-            f"devs/{device_id}/{_node.type}/{_node.addr}/status",
-        )
-        _LOGGER.debug("(%s) Status config data %s", _node.type, response)
-        if self.raw_response is True:
+        path = f"devs/{device_id}/{_node.type}/{_node.addr}/status"
+        if self.validation_mode is ValidationMode.RAW:
+            response = await self._api_request(path)
+            _LOGGER.debug("(%s) Status config data %s", _node.type, response)
             return response
+        body = await self._api_request_bytes(path)
         try:
-            return NodeStatus.model_validate(response).root
+            status = validate_node_status(_node.type, body)
         except ValidationError:
-            _LOGGER.exception("Status config validation error %s", response)
+            _LOGGER.exception("Status config validation error %s", body)
             raise
+        if self.compact_status:
+            return NodeStatusRecord.from_dict(dict(status), _node.type)
+        return status
 
     async def set_node_status(
         self,
@@ -467,16 +631,16 @@ class AsyncSmartboxSession(AsyncSession):
     ) -> dict[str, Any] | NodeSetup:
         """Get a node setup."""
         _node: Node = Node.model_validate(node)
-        response = await self._api_request(
-            f"devs/{device_id}/{_node.type}/{_node.addr}/setup",
-        )
-        _LOGGER.debug("(%s) Setup config data %s", _node.type, response)
-        if self.raw_response is True:
+        path = f"devs/{device_id}/{_node.type}/{_node.addr}/setup"
+        if self.validation_mode is ValidationMode.RAW:
+            response = await self._api_request(path)
+            _LOGGER.debug("(%s) Setup config data %s", _node.type, response)
             return response
+        body = await self._api_request_bytes(path)
         try:
-            return NodeSetup.model_validate(response)
+            return validate_node_setup(_node.type, body)
         except ValidationError:
-            _LOGGER.exception("Setup config validation error %s", response)
+            _LOGGER.exception("Setup config validation error %s", body)
             raise
 
     async def set_node_setup(
@@ -502,6 +666,52 @@ class AsyncSmartboxSession(AsyncSession):
             path=f"devs/{device_id}/{_node.type}/{_node.addr}/setup",
         )
 
+    async def get_node_prog(
+        self,
+        device_id: str,
+        node: dict[str, Any],
+    ) -> dict[str, Any] | NodeProg:
+        """Get a node weekly programme."""
+        _node: Node = Node.model_validate(node)
+        path = f"devs/{device_id}/{_node.type}/{_node.addr}/prog"
+        if self.validation_mode is ValidationMode.RAW:
+            response = await self._api_request(path)
+            _LOGGER.debug("(%s) Prog data %s", _node.type, response)
+            return response
+        return await self._get_model(path, NodeProg)
+
+    async def set_node_prog(
+        self,
+        device_id: str,
+        node: dict[str, Any],
+        prog: dict[str, Any] | NodeProg,
+    ) -> bool:
+        """Set a node weekly programme.
+
+        The current programme is fetched first and nothing is posted if it
+        already matches, return whether the programme was written.
+        """
+        _node: Node = Node.model_validate(node)
+        new_prog = NodeProg.model_validate(prog)
+        current = await self.get_node_prog(device_id, node)
+        current_prog = (
+            current.prog
+            if isinstance(current, NodeProg)
+            else current.get("prog")
+        )
+        if current_prog == new_prog.prog:
+            _LOGGER.debug(
+                "(%s) Prog of node %s unchanged, skipping",
+                _node.type,
+                _node.addr,
+            )
+            return False
+        await self._api_post(
+            data=new_prog.model_dump(mode="json"),
+            path=f"devs/{device_id}/{_node.type}/{_node.addr}/prog",
+        )
+        return True
+
 
 class Session:
     """For retro compatibility, this class is a sync which called the async."""
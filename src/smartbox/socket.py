@@ -2,15 +2,19 @@
 
 import asyncio
 from collections.abc import Callable
+import inspect
 import logging
 import signal
-from typing import Any
+from typing import TYPE_CHECKING, Any
 import urllib
 
 import socketio
 
 from smartbox.session import AsyncSmartboxSession
 
+if TYPE_CHECKING:
+    from smartbox.recording import EventRecorder
+
 _API_V2_NAMESPACE = "/api/v2/socket_io"
 # We most commonly get disconnected when the session
 # expires, so we don't want to try many times
@@ -29,6 +33,8 @@ class SmartboxAPIV2Namespace(socketio.AsyncClientNamespace):
         namespace: str,
         dev_data_callback: Callable | None = None,
         node_update_callback: Callable | None = None,
+        recorder: "EventRecorder | None" = None,
+        device_id: str | None = None,
     ) -> None:
         """Init of a async namespace."""
         super().__init__(namespace)
@@ -36,9 +42,15 @@ class SmartboxAPIV2Namespace(socketio.AsyncClientNamespace):
         self._namespace = namespace
         self._dev_data_callback = dev_data_callback
         self._node_update_callback = node_update_callback
+        self._recorder = recorder
+        self._device_id = device_id
         self._namespace_connected = False
         self._received_message = False
         self._received_dev_data = False
+        # engineio runs each message handler in its own task: messages are
+        # dispatched one at a time, in order, so that the next ones wait for
+        # the backpressure of the callbacks
+        self._dispatch_lock = asyncio.Lock()
 
     async def on_connect(self) -> None:
         """Namespace connected."""
@@ -64,25 +76,36 @@ class SmartboxAPIV2Namespace(socketio.AsyncClientNamespace):
     async def on_dev_data(self, data: dict[str, Any]) -> None:
         """Received dev data."""
         _LOGGER.debug("Received dev_data: %s", data)
-        self._received_message = True
-        self._received_dev_data = True
-        if self._dev_data_callback is not None:
-            self._dev_data_callback(data)
+        async with self._dispatch_lock:
+            self._received_message = True
+            self._received_dev_data = True
+            if self._recorder is not None:
+                self._recorder.record("dev_data", data, self._device_id)
+            if self._dev_data_callback is not None:
+                result = self._dev_data_callback(data)
+                if inspect.isawaitable(result):
+                    # Backpressure of the callbacks
+                    await result
 
     async def on_update(self, data: dict[str, Any]) -> None:
         """Received update."""
         _LOGGER.debug("Received update: %s", data)
-        if not self._received_message:
-            # The connection is only usable once we've received a message from
-            # the server (not on the connect event!!!), so we wait to receive
-            # something before sending our first message
-            await self.emit("dev_data", namespace=self._namespace)
-            self._received_message = True
-        if not self._received_dev_data:
-            _LOGGER.debug("Dev data not received yet, ignoring update")
-            return
-        if self._node_update_callback is not None:
-            self._node_update_callback(data)
+        async with self._dispatch_lock:
+            if not self._received_message:
+                # The connection is only usable once we've received a message
+                # from the server (not on the connect event!!!), so we wait to
+                # receive something before sending our first message
+                await self.emit("dev_data", namespace=self._namespace)
+                self._received_message = True
+            if not self._received_dev_data:
+                _LOGGER.debug("Dev data not received yet, ignoring update")
+                return
+            if self._recorder is not None:
+                self._recorder.record("update", data, self._device_id)
+            if self._node_update_callback is not None:
+                result = self._node_update_callback(data)
+                if inspect.isawaitable(result):
+                    await result
 
 
 class SocketSession:
@@ -99,13 +122,19 @@ class SocketSession:
         ping_interval: int = 20,
         reconnect_attempts: int = _DEFAULT_RECONNECT_ATTEMPTS,
         backoff_factor: float = _DEFAULT_BACKOFF_FACTOR,
+        recorder: "EventRecorder | None" = None,
     ) -> None:
-        """Init socket session to smartbox."""
+        """Init socket session to smartbox.
+
+        With recorder, the dev data and updates dispatched are recorded. It
+        may be shared by sessions, closing it is left to its owner.
+        """
         self._session = session
         self._device_id = device_id
         self._ping_interval = ping_interval
         self._reconnect_attempts = reconnect_attempts
         self._backoff_factor = backoff_factor
+        self._ping_task: asyncio.Task[None] | None = None
 
         if verbose:
             self._sio = socketio.AsyncClient(
@@ -123,6 +152,8 @@ class SocketSession:
             _API_V2_NAMESPACE,
             dev_data_callback,
             node_update_callback,
+            recorder,
+            device_id,
         )
         self._sio.register_namespace(self._api_v2_ns)
 
@@ -161,9 +192,18 @@ class SocketSession:
             await self._sio.send("ping", namespace=_API_V2_NAMESPACE)
 
     async def run(self) -> None:
-        """Run the websocket."""
+        """Run the websocket.
+
+        The ping task runs as long as this does, so it can be run again
+        after failing.
+        """
         self._ping_task = self._sio.start_background_task(self._send_ping)
+        try:
+            await self._run()
+        finally:
+            self._ping_task.cancel()
 
+    async def _run(self) -> None:
         # Will loop indefinitely unless our signal handler is set and called
         self._loop_should_exit = False
 
@@ -224,7 +264,8 @@ class SocketSession:
         _LOGGER.debug("Disconnecting and cancelling tasks")
         self._loop_should_exit = True
         await self._sio.disconnect()
-        self._ping_task.cancel()
+        if self._ping_task is not None:
+            self._ping_task.cancel()
 
     @property
     def namespace(self) -> SmartboxAPIV2Namespace:
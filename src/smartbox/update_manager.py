@@ -1,37 +1,92 @@
 """Smartbox socket update manager."""
 
-from collections.abc import Callable, Iterable
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import functools
+import inspect
 import logging
 import re
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import jq
-
+from pydantic import BaseModel, ValidationError
+
+from smartbox.device_state import DeviceState
+from smartbox.dispatch import (
+    CALL_ORIGIN,
+    AsyncCallbackQueue,
+    CallbackQueueStats,
+    ExecutorCallback,
+    ExecutorLanes,
+    OverflowPolicy,
+    ThreadedCallback,
+)
+from smartbox.jq_native import (
+    JqEvaluationError,
+    compile_native,
+    field_path,
+    jq_type_name,
+)
+from smartbox.models import (
+    AcmNodeStatus,
+    DefaultNodeStatus,
+    HtrModNodeStatus,
+    HtrNodeStatus,
+    NodeSetup,
+)
+from smartbox.node_state import NodeStates
+from smartbox.routing import PathRouter
 from smartbox.session import AsyncSmartboxSession
 from smartbox.socket import SocketSession
 
+if TYPE_CHECKING:
+    from smartbox.recording import EventRecorder
+
 _LOGGER = logging.getLogger(__name__)
 
-_SIMPLE_JQ_RE = re.compile(r"^\.(\w+)$")
+# Id of the device whose message is being dispatched
+_DEVICE_ID: ContextVar[str | None] = ContextVar(
+    "smartbox_device_id", default=None
+)
+
+
+def dispatched_device_id() -> str | None:
+    """Get the id of the device whose message is being dispatched."""
+    return _DEVICE_ID.get()
 
 
 class OptimisedJQMatcher:
-    """jq matcher that doesn't bother with jq for simple one-level element queries."""
+    """jq matcher evaluating simple expressions natively.
+
+    Field paths, iterations, object projections, pipes and "?" are evaluated
+    in Python on the data itself, only other expressions go through jq. Unlike
+    jq outputs, native matches are not copies of the input data.
+    """
 
     def __init__(self, jq_expr: str) -> None:
         """Create an OptimisedJQMatcher for any jq expression."""
-        m = _SIMPLE_JQ_RE.match(jq_expr)
-        self._fast_path = False
-        if m:
-            self._fast_path = True
-            self._simple_elem = m.group(1)
-        else:
+        self._jq_expr = jq_expr
+        self._path = field_path(jq_expr)
+        self._evaluator = None if self._path else compile_native(jq_expr)
+        self._fast_path = self._path is not None or self._evaluator is not None
+        if not self._fast_path:
             self._compiled_jq = jq.compile(jq_expr)
 
     def match(self, input_data: dict[str, Any]) -> Iterable[Any]:
         """Return matches for the given dev data."""
-        if self._fast_path:
-            return [input_data.get(self._simple_elem)]
+        if self._path is not None:
+            value: Any = input_data
+            for name in self._path:
+                if isinstance(value, dict):
+                    value = value.get(name)
+                elif value is not None:
+                    msg = f'Cannot index {jq_type_name(value)} with "{name}"'
+                    raise JqEvaluationError(msg)
+            return [value]
+        if self._evaluator is not None:
+            return self._evaluator(input_data)
         return self._compiled_jq.input(input_data)
 
     def __repr__(self) -> str:
@@ -43,31 +98,162 @@ class OptimisedJQMatcher:
     def __str__(self) -> str:
         """Str representation."""
         if self._fast_path:
-            return f"OptimisedJQMatcher('.{self._simple_elem}', fast_path=True)"
+            return f"OptimisedJQMatcher('{self._jq_expr}', fast_path=True)"
         return str(self._compiled_jq)
 
 
+def _merge_bodies(current: object, update: object) -> object:
+    """Merge an update body into an earlier one of the same path."""
+    if not isinstance(current, dict) or not isinstance(update, dict):
+        return update
+    merged = dict(current)
+    for name, value in update.items():
+        merged[name] = _merge_bodies(merged.get(name), value)
+    return merged
+
+
+_MISSING = object()
+
+
+class ChangeTracker:
+    """Last delivered values of a subscription, to only deliver changes.
+
+    Objects are compared field by field, partial ones being merged into the
+    last value like update bodies. Changes map the changed fields to their
+    (old, new) values; for other values they are the (old, new) pair. Old
+    values are None when unknown. Values are kept per device.
+    """
+
+    def __init__(self) -> None:
+        """Create a tracker without any delivered value."""
+        self._values: dict[Hashable, object] = {}
+
+    def changes(
+        self, key: Hashable, value: object
+    ) -> dict[str, tuple[object, object]] | tuple[object, object] | None:
+        """Record the value of key, return its changes or None if unchanged."""
+        key = (_DEVICE_ID.get(), key)
+        last = self._values.get(key, _MISSING)
+        if isinstance(value, dict) and (
+            last is _MISSING or isinstance(last, dict)
+        ):
+            base: dict[str, Any] = last if isinstance(last, dict) else {}
+            changes: dict[str, tuple[object, object]] = {}
+            for name, new in value.items():
+                old = base.get(name)
+                merged = _merge_bodies(old, new)
+                if name not in base or merged != old:
+                    changes[name] = (old, merged)
+            if not changes:
+                return None
+            self._values[key] = {
+                **base,
+                **{name: new for name, (_, new) in changes.items()},
+            }
+            return changes
+        if last is not _MISSING and last == value:
+            return None
+        self._values[key] = value
+        return None if last is _MISSING else last, value
+
+
 class DevDataSubscription:
     """Subscription for dev data callbacks."""
 
     def __init__(
         self,
         jq_expr: str,
-        callback: Callable[[dict[str, Any]], None],
+        callback: Callable[..., None],
+        changes_only: bool = False,
+        origin: Hashable | None = None,
     ) -> None:
-        """Create a dev data subscription for the given jq expression."""
+        """Create a dev data subscription for the given jq expression.
+
+        With changes_only, matches equal to the last delivered one at the
+        same index (e.g. the same node) are skipped and the callback gets
+        their changes as changes kwarg. With origin, the calls have that
+        origin instead of the index of their match, see CALL_ORIGIN.
+        """
         self._jq_matcher = OptimisedJQMatcher(jq_expr)
         self._callback = callback
+        self._changes = ChangeTracker() if changes_only else None
+        self._origin = origin
 
     def match(self, input_data: dict[str, Any]) -> None:
         """Return matches for this subscription for the given dev data."""
         _LOGGER.debug("Matching jq %s", self._jq_matcher)
+        # The matches (e.g. nodes) are told apart by their index
+        device_id = _DEVICE_ID.get()
+        token = CALL_ORIGIN.set((device_id, self._origin or 0))
         try:
-            for match in self._jq_matcher.match(input_data):
-                if match is not None:
+            for index, match in enumerate(self._jq_matcher.match(input_data)):
+                if match is None:
+                    continue
+                if self._origin is None:
+                    CALL_ORIGIN.set((device_id, index))
+                if self._changes is None:
                     self._callback(match)
+                    continue
+                changes = self._changes.changes(index, match)
+                if changes is not None:
+                    self._callback(match, changes=changes)
         except ValueError:
             _LOGGER.exception("Error evaluating jq on dev data %s", input_data)
+        finally:
+            CALL_ORIGIN.reset(token)
+
+
+def iter_dev_data_nodes(input_data: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Iterate over the nodes of dev data.
+
+    Like `(.nodes[] | ...)?` in jq, iteration stops at the first node which
+    isn't an object.
+    """
+    nodes = input_data.get("nodes") if isinstance(input_data, dict) else None
+    if isinstance(nodes, dict):
+        nodes = list(nodes.values())
+    if not isinstance(nodes, list):
+        return
+    for node in nodes:
+        if not isinstance(node, dict):
+            return
+        yield node
+
+
+class NodeSectionSubscription:
+    """Subscription for a section (status, setup...) of the dev data nodes."""
+
+    def __init__(
+        self,
+        section: str,
+        callback: Callable[[str, int, Any], None],
+    ) -> None:
+        """Create a subscription for the given section of every node."""
+        self._section = section
+        self._callback = callback
+
+    @property
+    def section(self) -> str:
+        """Get the node section of this subscription."""
+        return self._section
+
+    def match(self, input_data: dict[str, Any]) -> None:
+        """Call back with the section of every node of the given dev data."""
+        for node in iter_dev_data_nodes(input_data):
+            self.notify(node)
+
+    def notify(self, node: dict[str, Any]) -> None:
+        """Call back with the section of a dev data node."""
+        node_type = node.get("type")
+        if not isinstance(node_type, str):
+            _LOGGER.debug("Ignoring node without type %s", node)
+            return
+        try:
+            addr = int(node["addr"])
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.debug("Ignoring node without valid addr %s", node)
+            return
+        self._callback(node_type, addr, node.get(self._section))
 
 
 class UpdateSubscription:
@@ -77,94 +263,411 @@ class UpdateSubscription:
         self,
         path_regex: str,
         jq_expr: str,
-        callback: Callable[[dict[str, Any]], None],
+        callback: Callable[..., None],
+        changes_only: bool = False,
+        origin: Hashable | None = None,
     ) -> None:
-        """Create an update subscription for the given path regex and body jq expression."""
+        """Create an update subscription for the given path regex and body jq expression.
+
+        With changes_only, matches equal to the last delivered one for the
+        same path are skipped and the callback gets their changes as
+        changes kwarg. With origin, the calls have that origin instead of
+        the path of their update, see CALL_ORIGIN.
+        """
         self._path_regex = re.compile(path_regex)
         self._jq_matcher = OptimisedJQMatcher(jq_expr)
         self._callback = callback
+        self._changes = ChangeTracker() if changes_only else None
+        self._origin = origin
+
+    @property
+    def path_regex(self) -> re.Pattern[str]:
+        """Get the regex of the update paths of this subscription."""
+        return self._path_regex
 
     def match(self, input_data: dict[str, Any]) -> bool:
         """Return matches for this subscription for the given update."""
         path_match = self._path_regex.search(input_data["path"])
         if not path_match:
             return False
-        path_match_kwargs = path_match.groupdict()
+        return self.notify(input_data, path_match.groupdict())
+
+    def notify(
+        self, input_data: dict[str, Any], path_match_kwargs: dict[str, str]
+    ) -> bool:
+        """Call back with the matches of an update whose path matched."""
         matched = False
         _LOGGER.debug("Matching jq %s", self._jq_matcher)
+        token = (
+            CALL_ORIGIN.set((_DEVICE_ID.get(), self._origin))
+            if self._origin is not None
+            else None
+        )
         try:
-            for data_match in self._jq_matcher.match(input_data):
-                if data_match is not None:
-                    matched = True
+            for index, data_match in enumerate(
+                self._jq_matcher.match(input_data)
+            ):
+                if data_match is None:
+                    continue
+                matched = True
+                if self._changes is None:
                     self._callback(data_match, **path_match_kwargs)
+                    continue
+                changes = self._changes.changes(
+                    (input_data["path"], index), data_match
+                )
+                if changes is not None:
+                    self._callback(
+                        data_match, changes=changes, **path_match_kwargs
+                    )
         except ValueError:
             _LOGGER.exception("Error evaluating jq on update %s", input_data)
+        finally:
+            if token is not None:
+                CALL_ORIGIN.reset(token)
         return matched
 
 
-class UpdateManager:
-    """Manages subscription callbacks to receive updates from a Smartbox socket."""
+class NodeSubscription:
+    """Subscription for a section of a single node, possibly some fields."""
+
+    def __init__(
+        self,
+        node_type: str,
+        addr: int,
+        section: str,
+        callback: Callable[..., None],
+        fields: Iterable[str] | None = None,
+        changes_only: bool = False,
+    ) -> None:
+        """Create a subscription for the section of the given node.
+
+        With fields, the callback only gets these fields and isn't called
+        for data holding none of them. With changes_only, it isn't called
+        when none of them changed and gets the changes as changes kwarg.
+        """
+        self._node_type = node_type
+        self._addr = addr
+        self._section = section
+        self._callback = callback
+        self._fields = tuple(fields) if fields is not None else None
+        self._changes = ChangeTracker() if changes_only else None
+
+    @property
+    def node_key(self) -> tuple[str, int]:
+        """Get the node type and address of this subscription."""
+        return self._node_type, self._addr
+
+    @property
+    def section(self) -> str:
+        """Get the node section of this subscription."""
+        return self._section
+
+    @property
+    def path_regex(self) -> str:
+        """Get the regex of the update paths of this subscription."""
+        return f"^/{re.escape(self._node_type)}/{self._addr}/{self._section}$"
+
+    def notify(
+        self, input_data: dict[str, Any], _path_match_kwargs: dict[str, str]
+    ) -> bool:
+        """Call back with the body of an update of the node.
+
+        The node is known from the subscription, so the named groups of the
+        update path aren't needed.
+        """
+        return self.notify_section(input_data.get("body"))
+
+    def notify_section(self, data: object) -> bool:
+        """Call back with the section data of the node, if relevant."""
+        if not isinstance(data, dict):
+            return False
+        if self._fields is not None:
+            data = {name: data[name] for name in self._fields if name in data}
+            if not data:
+                return False
+        if self._changes is None:
+            self._callback(self._node_type, self._addr, data)
+            return True
+        changes = self._changes.changes(None, data)
+        if changes is None:
+            return False
+        self._callback(self._node_type, self._addr, data, changes=changes)
+        return True
+
+
+@dataclass(slots=True)
+class _Device:
+    """Socket session and state of a device of a manager."""
+
+    device_id: str
+    socket_session: SocketSession
+    state: DeviceState = field(default_factory=DeviceState)
+    node_states: NodeStates = field(default_factory=NodeStates)
+
+
+class _ModelCopyCallback:
+    """Callable passing a copy of its last argument, a model, to a callback."""
+
+    def __init__(self, callback: Callable[..., Any]) -> None:
+        self._callback = callback
+
+    def __call__(self, *args: object) -> object:
+        *origin, model = args
+        if isinstance(model, BaseModel):
+            model = model.model_copy(deep=True)
+        return self._callback(*origin, model)
+
+
+async def _wait_for_space(queues: list[AsyncCallbackQueue]) -> None:
+    for queue in queues:
+        await queue.wait_for_space()
+
+
+class BaseUpdateManager:
+    """Subscriptions and dispatch of the messages of Smartbox sockets.
+
+    The device sockets are added by subclasses. Messages are dispatched with
+    the id of their device set, which keeps the states and the change
+    tracking of the devices apart.
+    """
 
     BODY_PATH = ".body"
 
     def __init__(
+        self,
+        callback_queue_size: int = 100,
+        overflow_policy: OverflowPolicy | str = OverflowPolicy.BLOCK,
+        executor_workers: int = 4,
+        coalesce_interval: float | None = None,
+        recorder: "EventRecorder | None" = None,
+    ) -> None:
+        """Create a manager without devices, see UpdateManager."""
+        self._devices: dict[str, _Device] = {}
+        self._default_device_id: str | None = None
+        self._dev_data_subscriptions: list[DevDataSubscription] = []
+        self._node_section_subscriptions: list[NodeSectionSubscription] = []
+        self._update_subscriptions: list[UpdateSubscription] = []
+        self._update_router: PathRouter[
+            UpdateSubscription | NodeSubscription
+        ] = PathRouter()
+        self._node_subscriptions: dict[
+            tuple[str, int], list[NodeSubscription]
+        ] = {}
+        self._callback_queue_size = callback_queue_size
+        self._overflow_policy = OverflowPolicy(overflow_policy)
+        self._callback_queues: list[AsyncCallbackQueue] = []
+        self._executor_workers = executor_workers
+        self._executor_lanes: ExecutorLanes | None = None
+        self._coalesce_interval = coalesce_interval
+        self._pending_updates: dict[tuple[str, str], dict[str, Any]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._coalesced_updates = 0
+        self._recorder = recorder
+        self._node_status_model_callbacks: list[
+            Callable[
+                [
+                    str,
+                    int,
+                    AcmNodeStatus
+                    | HtrNodeStatus
+                    | HtrModNodeStatus
+                    | DefaultNodeStatus,
+                ],
+                None,
+            ]
+        ] = []
+        self._node_setup_model_callbacks: list[
+            Callable[[str, int, NodeSetup], None]
+        ] = []
+
+    def _add_device(
         self,
         session: AsyncSmartboxSession,
         device_id: str,
-        **kwargs: dict[str, object],
-    ) -> None:
-        """Create an UpdateManager for a smartbox socket."""
-        self._socket_session = SocketSession(
+        socket_kwargs: dict[str, Any],
+    ) -> _Device:
+        """Create the socket session of a device."""
+        socket_session = SocketSession(
             session,
             device_id,
-            self._dev_data_cb,
-            self._update_cb,
-            **kwargs,  # type: ignore[arg-type]
+            functools.partial(self._dev_data_cb, device_id=device_id),
+            functools.partial(self._update_cb, device_id=device_id),
+            recorder=self._recorder,
+            **socket_kwargs,
         )
-        self._dev_data_subscriptions: list[DevDataSubscription] = []
-        self._update_subscriptions: list[UpdateSubscription] = []
+        device = _Device(device_id, socket_session)
+        self._devices[device_id] = device
+        return device
 
     @property
-    def socket_session(self) -> SocketSession:
-        """Get the underlying socket session."""
-        return self._socket_session
+    def device_ids(self) -> list[str]:
+        """Get the ids of the devices."""
+        return list(self._devices)
 
-    async def run(self) -> None:
-        """Run the socket session asynchronously, waiting for updates."""
-        await self._socket_session.run()
+    @property
+    def callback_queue_stats(self) -> list[CallbackQueueStats]:
+        """Get the counters of the queues of the async callbacks."""
+        return [queue.stats for queue in self._callback_queues]
 
-    async def cancel(self) -> None:
-        """Disconnecting and cancelling tasks."""
-        await self._socket_session.cancel()
+    @property
+    def coalesced_updates(self) -> int:
+        """Get the number of updates merged into an earlier one."""
+        return self._coalesced_updates
+
+    def _close_dispatch(self) -> None:
+        """Drop the held updates, stop the callback workers and the recorder."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending_updates.clear()
+        for queue in self._callback_queues:
+            queue.close()
+        if self._executor_lanes is not None:
+            self._executor_lanes.shutdown()
+        if self._recorder is not None:
+            self._recorder.close()
+
+    async def join_callbacks(self) -> None:
+        """Wait until the queued async and threaded callbacks were called."""
+        for queue in self._callback_queues:
+            await queue.join()
+        if self._executor_lanes is not None:
+            await self._executor_lanes.join()
+
+    def _dispatcher(
+        self, callback: Callable[..., Any] | ThreadedCallback
+    ) -> Callable[..., Any]:
+        """Get the callable dispatching to callback.
+
+        Async callbacks are queued, threaded ones submitted to the executor.
+        """
+        if isinstance(callback, ThreadedCallback):
+            if self._executor_lanes is None:
+                self._executor_lanes = ExecutorLanes(self._executor_workers)
+            return ExecutorCallback(callback.callback, self._executor_lanes)
+        if not inspect.iscoroutinefunction(callback):
+            return callback
+        queue = AsyncCallbackQueue(
+            callback, self._callback_queue_size, self._overflow_policy
+        )
+        self._callback_queues.append(queue)
+        return queue
+
+    def _backpressure(self) -> Awaitable[None] | None:
+        """Get an awaitable on the full blocking queues, if any."""
+        full = [
+            queue
+            for queue in self._callback_queues
+            if queue.policy is OverflowPolicy.BLOCK and queue.full
+        ]
+        if not full:
+            return None
+        return _wait_for_space(full)
+
+    def subscribe_to_dev_data(
+        self, jq_expr: str, callback: Callable, changes_only: bool = False
+    ) -> None:
+        """Subscribe to receive device data.
+
+        With changes_only, see DevDataSubscription.
+        """
+        self._add_dev_data_subscription(
+            jq_expr, self._dispatcher(callback), changes_only
+        )
 
-    def subscribe_to_dev_data(self, jq_expr: str, callback: Callable) -> None:
-        """Subscribe to receive device data."""
-        sub = DevDataSubscription(jq_expr, callback)
+    def _add_dev_data_subscription(
+        self,
+        jq_expr: str,
+        callback: Callable,
+        changes_only: bool = False,
+        origin: Hashable | None = None,
+    ) -> None:
+        sub = DevDataSubscription(jq_expr, callback, changes_only, origin)
         self._dev_data_subscriptions.append(sub)
 
+    def _subscribe_to_node_section(
+        self, section: str, callback: Callable[[str, int, Any], None]
+    ) -> None:
+        """Subscribe to a section of the nodes of dev data."""
+        self._node_section_subscriptions.append(
+            NodeSectionSubscription(section, callback)
+        )
+
+    def subscribe_to_node(
+        self,
+        node_type: str,
+        addr: int,
+        section: str,
+        callback: Callable[..., None],
+        fields: Iterable[str] | None = None,
+        changes_only: bool = False,
+    ) -> None:
+        """Subscribe to a section (status, setup, version) of one node.
+
+        Only the dev data and updates of this node wake the callback. With
+        fields, it only gets these fields and isn't called for messages
+        holding none of them, whether they changed or not. With changes_only,
+        it is only called when they changed, with the changes as changes
+        kwarg.
+        """
+        sub = NodeSubscription(
+            node_type,
+            addr,
+            section,
+            self._dispatcher(callback),
+            fields,
+            changes_only,
+        )
+        self._node_subscriptions.setdefault(sub.node_key, []).append(sub)
+        self._update_router.add(sub.path_regex, sub)
+
     def subscribe_to_updates(
         self,
         path_regex: str,
         jq_expr: str,
         callback: Callable[..., None],
+        changes_only: bool = False,
     ) -> None:
         """Subscribe to receive device and node data updates.
 
-        Named groups in path_regex are passed as kwargs to callback.
+        Named groups in path_regex are passed as kwargs to callback. With
+        changes_only, see UpdateSubscription.
         """
-        sub = UpdateSubscription(path_regex, jq_expr, callback)
+        self._add_update_subscription(
+            path_regex, jq_expr, self._dispatcher(callback), changes_only
+        )
+
+    def _add_update_subscription(
+        self,
+        path_regex: str,
+        jq_expr: str,
+        callback: Callable[..., None],
+        changes_only: bool = False,
+        origin: Hashable | None = None,
+    ) -> None:
+        sub = UpdateSubscription(
+            path_regex, jq_expr, callback, changes_only, origin
+        )
         self._update_subscriptions.append(sub)
+        self._update_router.add(sub.path_regex, sub)
 
     def subscribe_to_device_away_status(
         self,
         callback: Callable[[dict[str, Any]], None],
     ) -> None:
         """Subscribe to device away status updates."""
-        self.subscribe_to_dev_data(".away_status", callback)
-        self.subscribe_to_updates(
+        callback = self._dispatcher(callback)
+        # The dev data and the updates share an origin, so their calls keep
+        # their order in the callback queues and executor lanes
+        self._add_dev_data_subscription(
+            ".away_status", callback, origin="/mgr/away_status"
+        )
+        self._add_update_subscription(
             r"^/mgr/away_status",
             self.BODY_PATH,
             callback,
+            origin="/mgr/away_status",
         )
 
     def subscribe_to_device_connected(
@@ -172,14 +675,17 @@ class UpdateManager:
         callback: Callable[[bool], None],
     ) -> None:
         """Subscribe to device power limit updates."""
-        self.subscribe_to_dev_data(
+        callback = self._dispatcher(callback)
+        self._add_dev_data_subscription(
             ".connected",
             lambda p: callback(bool(p)),
+            origin="/connected",
         )
-        self.subscribe_to_updates(
+        self._add_update_subscription(
             r"^/connected",
             f"{self.BODY_PATH}.connected",
             lambda p: callback(bool(p)),
+            origin="/connected",
         )
 
     def subscribe_to_device_power_limit(
@@ -187,14 +693,17 @@ class UpdateManager:
         callback: Callable[[int], None],
     ) -> None:
         """Subscribe to device power limit updates."""
-        self.subscribe_to_dev_data(
+        callback = self._dispatcher(callback)
+        self._add_dev_data_subscription(
             ".htr_system.setup.power_limit",
             lambda p: callback(int(p)),
+            origin="/htr_system/power_limit",
         )
-        self.subscribe_to_updates(
+        self._add_update_subscription(
             r"^/htr_system/(setup|power_limit)",
             f"{self.BODY_PATH}.power_limit",
             lambda p: callback(int(p)),
+            origin="/htr_system/power_limit",
         )
 
     def subscribe_to_node_status(
@@ -202,41 +711,29 @@ class UpdateManager:
         callback: Callable[[str, int, dict[str, Any]], None],
     ) -> None:
         """Subscribe to node status updates."""
-
-        def dev_data_wrapper(data: dict[str, Any]) -> None:
-            (callback(data["type"], int(data["addr"]), data["status"]),)  # type: ignore[func-returns-value]
-
-        self.subscribe_to_dev_data(
-            "(.nodes[] | {addr, type, status})?",
-            dev_data_wrapper,
-        )
-
-        def update_wrapper(
-            data: dict[str, Any],
-            node_type: str,
-            addr: str,
-        ) -> None:
-            (callback(node_type, int(addr), data),)  # type: ignore[func-returns-value]
-
-        self.subscribe_to_updates(
-            r"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/status",
-            self.BODY_PATH,
-            update_wrapper,
-        )
+        self._subscribe_to_node_updates("status", self._dispatcher(callback))
 
     def subscribe_to_node_setup(
         self,
         callback: Callable[[str, int, dict[str, Any]], None],
     ) -> None:
         """Subscribe to node setup updates."""
+        self._subscribe_to_node_updates("setup", self._dispatcher(callback))
 
-        def dev_data_wrapper(data: dict[str, Any]) -> None:
-            (callback(data["type"], int(data["addr"]), data["setup"]),)  # type: ignore[func-returns-value]
+    def subscribe_to_node_version(
+        self,
+        callback: Callable[[str, int, dict[str, Any]], None],
+    ) -> None:
+        """Subscribe to node version updates."""
+        self._subscribe_to_node_updates("version", self._dispatcher(callback))
 
-        self.subscribe_to_dev_data(
-            "(.nodes[] | {addr, type, setup})?",
-            dev_data_wrapper,
-        )
+    def _subscribe_to_node_updates(
+        self,
+        section: str,
+        callback: Callable[[str, int, dict[str, Any]], None],
+    ) -> None:
+        """Subscribe to a section of the nodes in dev data and updates."""
+        self._subscribe_to_node_section(section, callback)
 
         def update_wrapper(
             data: dict[str, Any],
@@ -245,50 +742,273 @@ class UpdateManager:
         ) -> None:
             (callback(node_type, int(addr), data),)  # type: ignore[func-returns-value]
 
-        self.subscribe_to_updates(
-            r"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/setup",
+        self._add_update_subscription(
+            rf"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/{section}",
             self.BODY_PATH,
             update_wrapper,
         )
 
-    def subscribe_to_node_version(
+    def subscribe_to_node_status_model(
         self,
-        callback: Callable[[str, int, dict[str, Any]], None],
+        callback: Callable[
+            [
+                str,
+                int,
+                AcmNodeStatus
+                | HtrNodeStatus
+                | HtrModNodeStatus
+                | DefaultNodeStatus,
+            ],
+            None,
+        ],
     ) -> None:
-        """Subscribe to node version updates."""
-
-        def dev_data_wrapper(data: dict[str, Any]) -> None:
-            (callback(data["type"], int(data["addr"]), data["version"]),)  # type: ignore[func-returns-value]
+        """Subscribe to node status updates as typed models.
 
-        self.subscribe_to_dev_data(
-            "(.nodes[] | {addr, type, version})?",
-            dev_data_wrapper,
+        Partial update bodies are merged into the status kept in node_states,
+        validating the changed fields only. The model is updated in place, so
+        callbacks receive the same object for a node between updates, except
+        threaded ones which get a copy of it.
+        """
+        if not self._node_status_model_callbacks:
+            self._subscribe_to_node_updates(
+                "status", self._node_status_model_cb
+            )
+        self._node_status_model_callbacks.append(
+            self._model_dispatcher(callback)
         )
 
-        def update_wrapper(
-            data: dict[str, Any],
-            node_type: str,
-            addr: str,
-        ) -> None:
-            (callback(node_type, int(addr), data),)  # type: ignore[func-returns-value]
+    def subscribe_to_node_setup_model(
+        self,
+        callback: Callable[[str, int, NodeSetup], None],
+    ) -> None:
+        """Subscribe to node setup updates as typed models.
 
-        self.subscribe_to_updates(
-            r"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/version",
-            self.BODY_PATH,
-            update_wrapper,
+        See subscribe_to_node_status_model.
+        """
+        if not self._node_setup_model_callbacks:
+            self._subscribe_to_node_updates("setup", self._node_setup_model_cb)
+        self._node_setup_model_callbacks.append(
+            self._model_dispatcher(callback)
         )
 
-    def _dev_data_cb(self, data: dict[str, Any]) -> None:
-        for sub in self._dev_data_subscriptions:
-            sub.match(data)
+    def _model_dispatcher(
+        self, callback: Callable[..., Any] | ThreadedCallback
+    ) -> Callable[..., Any]:
+        """Get the callable dispatching models to callback.
 
-    def _update_cb(self, data: dict[str, Any]) -> None:
-        matched = False
-        for sub in self._update_subscriptions:
-            if "path" not in data:
-                _LOGGER.error("Path not found in update data: %s", data)
-                continue
-            if sub.match(data):
-                matched = True
+        Threaded callbacks get a copy of the models, which keep being
+        updated in the event loop.
+        """
+        dispatcher = self._dispatcher(callback)
+        if isinstance(callback, ThreadedCallback):
+            return _ModelCopyCallback(dispatcher)
+        return dispatcher
+
+    def _current_node_states(self) -> NodeStates:
+        """Get the node states of the device being dispatched."""
+        return self._devices[_DEVICE_ID.get()].node_states  # type: ignore[index]
+
+    def _node_status_model_cb(
+        self, node_type: str, addr: int, data: dict[str, Any]
+    ) -> None:
+        try:
+            status = self._current_node_states().apply_status(
+                node_type, addr, data
+            )
+        except ValidationError:
+            _LOGGER.exception("(%s) Invalid status update %s", node_type, data)
+            return
+        for callback in self._node_status_model_callbacks:
+            callback(node_type, addr, status)
+
+    def _node_setup_model_cb(
+        self, node_type: str, addr: int, data: dict[str, Any]
+    ) -> None:
+        try:
+            setup = self._current_node_states().apply_setup(
+                node_type, addr, data
+            )
+        except ValidationError:
+            _LOGGER.exception("(%s) Invalid setup update %s", node_type, data)
+            return
+        for callback in self._node_setup_model_callbacks:
+            callback(node_type, addr, setup)
+
+    def _device(self, device_id: str | None) -> _Device:
+        return self._devices[device_id or self._default_device_id]  # type: ignore[index]
+
+    def _dev_data_cb(
+        self, data: dict[str, Any], device_id: str | None = None
+    ) -> Awaitable[None] | None:
+        device = self._device(device_id)
+        if self._pending_updates:
+            # Keep the order of the updates and the dev data
+            self.flush_updates()
+        device.state.seed(data)
+        token = _DEVICE_ID.set(device.device_id)
+        origin_token = CALL_ORIGIN.set((device.device_id, None))
+        try:
+            for sub in self._dev_data_subscriptions:
+                sub.match(data)
+            # Node sections are all fed from a single walk of the nodes
+            if self._node_section_subscriptions or self._node_subscriptions:
+                for node in iter_dev_data_nodes(data):
+                    for node_sub in self._node_section_subscriptions:
+                        node_sub.notify(node)
+                    if self._node_subscriptions:
+                        self._notify_node_subscriptions(node)
+        finally:
+            CALL_ORIGIN.reset(origin_token)
+            _DEVICE_ID.reset(token)
+        return self._backpressure() if self._callback_queues else None
+
+    def feed(
+        self, event: str, data: dict[str, Any], device_id: str | None = None
+    ) -> Awaitable[None] | None:
+        """Dispatch a socket message (dev_data or update) as if received.
+
+        Messages go to the default device without device_id. Return an
+        awaitable to wait for when blocking callback queues are full.
+        """
+        if event == "dev_data":
+            return self._dev_data_cb(data, device_id)
+        if event == "update":
+            return self._update_cb(data, device_id)
+        msg = f"Unknown socket event {event}"
+        raise ValueError(msg)
+
+    def _notify_node_subscriptions(self, node: dict[str, Any]) -> None:
+        node_type = node.get("type")
+        if not isinstance(node_type, str):
+            return
+        try:
+            key = (node_type, int(node["addr"]))
+        except (KeyError, TypeError, ValueError):
+            return
+        for sub in self._node_subscriptions.get(key, ()):
+            sub.notify_section(node.get(sub.section))
+
+    def _update_cb(
+        self, data: dict[str, Any], device_id: str | None = None
+    ) -> Awaitable[None] | None:
+        if "path" not in data:
+            _LOGGER.error("Path not found in update data: %s", data)
+            return None
+        device = self._device(device_id)
+        device.state.apply_update(data["path"], data.get("body"))
+        if self._coalesce_interval is None:
+            self._dispatch_update(device.device_id, data)
+        else:
+            self._coalesce_update(device.device_id, data)
+        return self._backpressure() if self._callback_queues else None
+
+    def _coalesce_update(self, device_id: str, data: dict[str, Any]) -> None:
+        key = (device_id, data["path"])
+        pending = self._pending_updates.get(key)
+        if pending is None:
+            self._pending_updates[key] = data
+        else:
+            self._pending_updates[key] = {
+                **data,
+                "body": _merge_bodies(pending.get("body"), data.get("body")),
+            }
+            self._coalesced_updates += 1
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self._coalesce_interval,  # type: ignore[arg-type]
+                self.flush_updates,
+            )
+
+    def flush_updates(self) -> None:
+        """Dispatch the updates held for coalescing now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending_updates = self._pending_updates, {}
+        for (device_id, _), data in pending.items():
+            # Flushed from a timer too: a failing callback mustn't lose the
+            # other held updates
+            try:
+                self._dispatch_update(device_id, data)
+            except Exception:
+                _LOGGER.exception("Error dispatching update %s", data)
+
+    def _dispatch_update(self, device_id: str, data: dict[str, Any]) -> None:
+        token = _DEVICE_ID.set(device_id)
+        origin_token = CALL_ORIGIN.set((device_id, data["path"]))
+        try:
+            matched = False
+            for sub, path_match_kwargs in self._update_router.match(
+                data["path"]
+            ):
+                if sub.notify(data, path_match_kwargs):
+                    matched = True
+        finally:
+            CALL_ORIGIN.reset(origin_token)
+            _DEVICE_ID.reset(token)
         if not matched:
             _LOGGER.debug("No matches for update %s", data)
+
+
+class UpdateManager(BaseUpdateManager):
+    """Manages subscription callbacks to receive updates from a Smartbox socket."""
+
+    def __init__(
+        self,
+        session: AsyncSmartboxSession,
+        device_id: str,
+        callback_queue_size: int = 100,
+        overflow_policy: OverflowPolicy | str = OverflowPolicy.BLOCK,
+        executor_workers: int = 4,
+        coalesce_interval: float | None = None,
+        recorder: "EventRecorder | None" = None,
+        **kwargs: dict[str, object],
+    ) -> None:
+        """Create an UpdateManager for a smartbox socket.
+
+        Async callbacks are awaited in order by a worker task per
+        subscription, through a queue of callback_queue_size calls handled
+        according to overflow_policy when full. Callbacks marked with
+        threaded() are called by executor_workers threads.
+
+        With coalesce_interval (in seconds), the updates of a path received
+        within that time are merged and dispatched once, at the end of it.
+
+        With recorder, the dispatched messages are recorded, the recorder
+        being closed on cancel.
+        """
+        super().__init__(
+            callback_queue_size,
+            overflow_policy,
+            executor_workers,
+            coalesce_interval,
+            recorder,
+        )
+        self._default_device_id = device_id
+        self._socket_session = self._add_device(
+            session, device_id, kwargs
+        ).socket_session
+
+    @property
+    def device_state(self) -> DeviceState:
+        """Get the state of the device, as of the last received message."""
+        return self._devices[self._default_device_id].state  # type: ignore[index]
+
+    @property
+    def node_states(self) -> NodeStates:
+        """Get the typed node states fed by the model subscriptions."""
+        return self._devices[self._default_device_id].node_states  # type: ignore[index]
+
+    @property
+    def socket_session(self) -> SocketSession:
+        """Get the underlying socket session."""
+        return self._socket_session
+
+    async def run(self) -> None:
+        """Run the socket session asynchronously, waiting for updates."""
+        await self._socket_session.run()
+
+    async def cancel(self) -> None:
+        """Disconnecting and cancelling tasks."""
+        await self._socket_session.cancel()
+        self._close_dispatch()
@@ -0,0 +1,106 @@
+"""Benchmark of connection profiles against a local HTTP server.
+
+Run with `python -m tests.benchmarks.bench_connection_profiles`. A local
+aiohttp server returns a month of hourly samples (gzip encoded when the
+client accepts it) and every profile fetches it REQUESTS times with
+CONCURRENCY requests in flight. The "fresh client" row reproduces a
+session without a shared http client, opening a connection per request.
+"""
+
+import asyncio
+import gzip
+import json
+import time
+
+import aiohttp
+from aiohttp import web
+
+from smartbox.connection import (
+    CLI_CONNECTION_PROFILE,
+    SERVICE_CONNECTION_PROFILE,
+    ConnectionProfile,
+)
+
+REQUESTS = 2000
+CONCURRENCY = 20
+_SAMPLES = json.dumps(
+    {
+        "samples": [
+            {"t": 1735682400 + i * 3600, "temp": "19.5", "counter": 247426 + i}
+            for i in range(24 * 30)
+        ]
+    }
+).encode()
+_GZIP_SAMPLES = gzip.compress(_SAMPLES)
+_transferred = {"bytes": 0}
+
+
+async def _samples_handler(request: web.Request) -> web.Response:
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        _transferred["bytes"] += len(_GZIP_SAMPLES)
+        return web.Response(
+            body=_GZIP_SAMPLES,
+            headers={
+                "Content-Encoding": "gzip",
+                "Content-Type": "application/json",
+            },
+        )
+    _transferred["bytes"] += len(_SAMPLES)
+    return web.Response(body=_SAMPLES, content_type="application/json")
+
+
+async def _run(
+    url: str, profile: ConnectionProfile | None
+) -> tuple[float, int]:
+    _transferred["bytes"] = 0
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    shared = None if profile is None else profile.create_client_session()
+
+    async def fetch() -> None:
+        async with semaphore:
+            if shared is None:
+                async with aiohttp.ClientSession() as client:
+                    await (await client.get(url)).json()
+            else:
+                await (await shared.get(url)).json()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    if shared is not None:
+        await shared.close()
+    return elapsed, _transferred["bytes"]
+
+
+async def main() -> None:
+    """Run the benchmark and print one row per profile."""
+    app = web.Application()
+    app.router.add_get("/samples", _samples_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/samples"
+
+    profiles: dict[str, ConnectionProfile | None] = {
+        "fresh client per request": None,
+        "default": ConnectionProfile(),
+        "default, no compression": ConnectionProfile(
+            accept_encoding="identity"
+        ),
+        "cli": CLI_CONNECTION_PROFILE,
+        "service": SERVICE_CONNECTION_PROFILE,
+    }
+    print(f"{REQUESTS} requests, {CONCURRENCY} concurrent")  # noqa: T201
+    for name, profile in profiles.items():
+        elapsed, transferred = await _run(url, profile)
+        print(  # noqa: T201
+            f"{name:<26} {REQUESTS / elapsed:>8.0f} req/s "
+            f"{transferred / REQUESTS / 1024:>7.1f} KiB/request"
+        )
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
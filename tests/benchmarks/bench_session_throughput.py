@@ -0,0 +1,64 @@
+"""Benchmark of AsyncSmartboxSession against the fake smartbox server.
+
+Run with `python -m tests.benchmarks.bench_session_throughput`. Every node
+status of the fake fleet is fetched concurrently, with a configurable
+latency and error rate injected by the server.
+"""
+
+import argparse
+import asyncio
+import time
+
+from smartbox.connection import SERVICE_CONNECTION_PROFILE
+from smartbox.fake_server import FakeSmartboxServer
+from smartbox.reseller import AvailableResellers
+from smartbox.session import AsyncSmartboxSession
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Fetch every node status of the fleet and print the throughput."""
+    server = FakeSmartboxServer(
+        devices=args.devices,
+        nodes_per_device=args.nodes,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        seed=0,
+    )
+    await server.start()
+    session = AsyncSmartboxSession(
+        username="user",
+        password="password",
+        api_name=next(iter(AvailableResellers.resellers)),
+        api_host=server.api_host,
+        connection_profile=SERVICE_CONNECTION_PROFILE,
+    )
+    devices = await session.get_devices()
+    nodes = {
+        device["dev_id"]: await session.get_nodes(device["dev_id"])
+        for device in devices
+    }
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            session.get_node_status(dev_id, node)
+            for dev_id, dev_nodes in nodes.items()
+            for node in dev_nodes
+        )
+    )
+    elapsed = time.perf_counter() - start
+    print(  # noqa: T201
+        f"{len(results)} node statuses in {elapsed:.2f}s "
+        f"({len(results) / elapsed:.0f} req/s), "
+        f"{server.stats['injected_errors']} injected errors"
+    )
+    await session.close()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--nodes", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    asyncio.run(main(parser.parse_args()))
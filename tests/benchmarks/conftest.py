@@ -0,0 +1,107 @@
+"""Micro-benchmark helpers.
+
+Benchmarks only run when SMARTBOX_BENCHMARK is set, e.g.
+`SMARTBOX_BENCHMARK=1 python -m pytest tests/benchmarks -p no:randomly`.
+Timings are divided by the time of a fixed pure python workload so the
+baselines stored in baselines.json are comparable between machines. A
+benchmark is measured again when it looks slower than its baseline and fails
+when its best measurement is still more than SMARTBOX_BENCHMARK_THRESHOLD
+(default 1.0, i.e. twice as slow) slower; set SMARTBOX_BENCHMARK_UPDATE=1 to
+record new baselines instead.
+"""
+
+from collections.abc import Callable
+import json
+import os
+import pathlib
+import timeit
+from typing import Any
+
+import pytest
+
+BASELINES_PATH = pathlib.Path(__file__).parent / "baselines.json"
+_ENABLED = bool(os.environ.get("SMARTBOX_BENCHMARK"))
+_UPDATE = bool(os.environ.get("SMARTBOX_BENCHMARK_UPDATE"))
+_THRESHOLD = float(os.environ.get("SMARTBOX_BENCHMARK_THRESHOLD", "1.0"))
+_REPEAT = 5
+_ATTEMPTS = 3
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    if _ENABLED:
+        return
+    skip = pytest.mark.skip(reason="set SMARTBOX_BENCHMARK=1 to run")
+    for item in items:
+        if "benchmarks" in item.path.parts:
+            item.add_marker(skip)
+
+
+def _best_time(func: Callable[[], Any], number: int) -> float:
+    """Best time per call of func over a few repeats."""
+    return min(timeit.repeat(func, number=number, repeat=_REPEAT)) / number
+
+
+def _calibration_workload() -> int:
+    return sum(i * i for i in range(1000))
+
+
+class Benchmark:
+    """Measure callables and compare them to the stored baselines."""
+
+    def __init__(self) -> None:
+        """Load the baselines."""
+        self.baselines: dict[str, float] = (
+            json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+            if BASELINES_PATH.exists()
+            else {}
+        )
+        self.results: dict[str, float] = {}
+
+    def __call__(
+        self, name: str, func: Callable[[], Any], number: int = 1000
+    ) -> float:
+        """Time func, check it against its baseline, return the ratio."""
+        baseline = self.baselines.get(name)
+        limit = (
+            float("inf")
+            if _UPDATE or baseline is None
+            else baseline * (1 + _THRESHOLD)
+        )
+        relative = float("inf")
+        # Keep the best of a few attempts, noise only ever slows things down
+        for _ in range(_ATTEMPTS):
+            relative = min(relative, self._measure(func, number))
+            if relative <= limit:
+                break
+        self.results[name] = relative
+        if baseline is None or _UPDATE:
+            return relative
+        assert relative <= baseline * (1 + _THRESHOLD), (
+            f"{name} regressed: {relative:.3f} vs baseline {baseline:.3f} "
+            f"(threshold {_THRESHOLD:.0%})"
+        )
+        return relative
+
+    @staticmethod
+    def _measure(func: Callable[[], Any], number: int) -> float:
+        # Calibrate next to every measurement to follow CPU frequency changes
+        calibration = _best_time(_calibration_workload, 200)
+        return _best_time(func, number) / calibration
+
+    def save(self) -> None:
+        """Write the measured results as new baselines."""
+        self.baselines.update(
+            {name: round(value, 4) for name, value in self.results.items()}
+        )
+        BASELINES_PATH.write_text(
+            json.dumps(self.baselines, indent=4, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+
+
+@pytest.fixture(scope="session")
+def benchmark():
+    bench = Benchmark()
+    yield bench
+    if _UPDATE:
+        bench.save()
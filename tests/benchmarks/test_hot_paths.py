@@ -0,0 +1,296 @@
+import asyncio
+import datetime
+import json
+from unittest.mock import MagicMock
+
+import jq
+import pytest
+
+from smartbox.models import (
+    Node,
+    NodeSetup,
+    NodeStatus,
+    Samples,
+    ValidationMode,
+    validate_node_setup,
+    validate_node_status,
+)
+from smartbox.node_state import NodeStates
+from smartbox.session import AsyncSmartboxSession
+from smartbox.update_manager import OptimisedJQMatcher, UpdateManager
+from tests.common import load_fixture
+
+SUBSCRIPTIONS = 100
+
+
+def _fixture(path):
+    return json.loads(load_fixture(path))
+
+
+@pytest.fixture(scope="module")
+def dev_data():
+    nodes = []
+    for device in ("device1", "device2"):
+        for node in _fixture(f"devs/{device}/mgr/nodes.json")["nodes"]:
+            if node["type"] == "pmo":
+                continue
+            base = f"devs/{device}/{node['type']}/{node['addr']}"
+            nodes.append(
+                {
+                    **node,
+                    "status": _fixture(f"{base}/status.json"),
+                    "setup": _fixture(f"{base}/setup.json"),
+                }
+            )
+    return {
+        "away_status": _fixture("devs/device1/mgr/away_status.json"),
+        "connected": True,
+        "htr_system": {"setup": {"power_limit": 0}},
+        "nodes": nodes,
+    }
+
+
+@pytest.fixture
+def manager():
+    return UpdateManager(MagicMock(spec=AsyncSmartboxSession), "device1")
+
+
+def test_benchmark_node_validation(benchmark):
+    node = _fixture("devs/device1/mgr/nodes.json")["nodes"][0]
+    benchmark("node_validation", lambda: Node.model_validate(node))
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["device1/htr/0", "device1/acm/1", "device2/htr_mod/0"],
+)
+def test_benchmark_node_status_validation(benchmark, path):
+    status = _fixture(f"devs/{path}/status.json")
+    benchmark(
+        f"node_status_validation[{path}]",
+        lambda: NodeStatus.model_validate(status),
+    )
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["device1/htr/0", "device1/acm/1", "device2/htr_mod/0"],
+)
+def test_benchmark_node_status_dispatch(benchmark, path):
+    status = _fixture(f"devs/{path}/status.json")
+    node_type = path.split("/")[1]
+    benchmark(
+        f"node_status_dispatch[{path}]",
+        lambda: validate_node_status(node_type, status),
+    )
+
+
+@pytest.mark.parametrize("path", ["device1/htr/0", "device1/pmo/3"])
+def test_benchmark_node_setup_dispatch(benchmark, path):
+    setup = _fixture(f"devs/{path}/setup.json")
+    node_type = path.split("/")[1]
+    benchmark(
+        f"node_setup_dispatch[{path}]",
+        lambda: validate_node_setup(node_type, setup),
+    )
+
+
+@pytest.mark.parametrize("path", ["device1/htr/0", "device1/pmo/3"])
+def test_benchmark_node_setup_validation(benchmark, path):
+    setup = _fixture(f"devs/{path}/setup.json")
+    benchmark(
+        f"node_setup_validation[{path}]",
+        lambda: NodeSetup.model_validate(setup),
+    )
+
+
+def test_benchmark_samples_validation(benchmark):
+    samples = _fixture("devs/device1/htr/0/samples.json")
+    benchmark(
+        "samples_validation",
+        lambda: Samples.model_validate(samples),
+        number=100,
+    )
+
+
+def test_benchmark_samples_validation_json(benchmark):
+    body = load_fixture("devs/device1/htr/0/samples.json").encode()
+    benchmark(
+        "samples_validation_json",
+        lambda: Samples.model_validate_json(body),
+        number=100,
+    )
+
+
+@pytest.mark.parametrize("path", ["device1/htr/0", "device2/htr_mod/0"])
+def test_benchmark_node_status_dispatch_json(benchmark, path):
+    body = load_fixture(f"devs/{path}/status.json").encode()
+    node_type = path.split("/")[1]
+    benchmark(
+        f"node_status_dispatch_json[{path}]",
+        lambda: validate_node_status(node_type, body),
+    )
+
+
+def test_benchmark_node_status_delta(benchmark):
+    status = _fixture("devs/device1/htr/0/status.json")
+    states = NodeStates()
+    states.apply_status("htr", 0, status)
+    deltas = [
+        {"mtemp": "19.5", "power": "0"},
+        {"mtemp": "19.6", "power": "750"},
+    ]
+    benchmark(
+        "node_status_delta",
+        lambda: [states.apply_status("htr", 0, delta) for delta in deltas],
+    )
+    # What applying the same updates costs when revalidating whole statuses
+    benchmark(
+        "node_status_delta_revalidate",
+        lambda: [
+            validate_node_status("htr", {**status, **delta}) for delta in deltas
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "jq_expr",
+    [
+        ".connected",
+        ".htr_system.setup.power_limit",
+        "(.nodes[] | {addr, type, status})?",
+    ],
+)
+def test_benchmark_jq_matcher(benchmark, dev_data, jq_expr):
+    matcher = OptimisedJQMatcher(jq_expr)
+    benchmark(
+        f"jq_matcher[{jq_expr}]",
+        lambda: list(matcher.match(dev_data)),
+    )
+    # The same expression through the jq binding, as before native paths
+    compiled = jq.compile(jq_expr)
+    benchmark(
+        f"jq_binding[{jq_expr}]",
+        lambda: list(compiled.input(dev_data)),
+    )
+
+
+def test_benchmark_dev_data_dispatch(benchmark, manager, dev_data):
+    callback = MagicMock()
+    for _ in range(SUBSCRIPTIONS // 4):
+        manager.subscribe_to_node_status(callback)
+        manager.subscribe_to_node_setup(callback)
+        manager.subscribe_to_device_connected(callback)
+        manager.subscribe_to_device_away_status(callback)
+    benchmark(
+        "dev_data_dispatch", lambda: manager._dev_data_cb(dev_data), number=20
+    )
+
+
+def test_benchmark_update_dispatch(benchmark, manager):
+    callback = MagicMock()
+    for _ in range(SUBSCRIPTIONS // 4):
+        manager.subscribe_to_node_status(callback)
+        manager.subscribe_to_node_setup(callback)
+        manager.subscribe_to_device_connected(callback)
+        manager.subscribe_to_device_away_status(callback)
+    update = {
+        "path": "/htr/0/status",
+        "body": _fixture("devs/device1/htr/0/status.json"),
+    }
+    benchmark("update_dispatch", lambda: manager._update_cb(update), number=200)
+
+
+def test_benchmark_update_routing(benchmark, manager):
+    # Many subscriptions, few of them interested in the update
+    callback = MagicMock()
+    for addr in range(SUBSCRIPTIONS):
+        manager.subscribe_to_updates(
+            rf"^/htr/{addr}/(status|setup)", ".body", callback
+        )
+    update = {"path": "/htr/7/status", "body": {"mtemp": "19.5"}}
+    benchmark("update_routing", lambda: manager._update_cb(update), number=200)
+
+
+def test_benchmark_api_request(benchmark, reseller):
+    body = _fixture("devs/device1/htr/0/status.json")
+    response = MagicMock()
+
+    async def json_body():
+        return body
+
+    response.json = json_body
+
+    async def get(*args, **kwargs):
+        return response
+
+    websession = MagicMock()
+    websession.get = get
+    session = AsyncSmartboxSession(
+        api_name="test_api",
+        username="test_user",
+        password="test_password",
+        websession=websession,
+    )
+    session._access_token = "token"
+    session._expires_at = datetime.datetime.now(
+        datetime.UTC
+    ) + datetime.timedelta(hours=1)
+
+    async def requests():
+        for _ in range(100):
+            await session._api_request("devs/device1/htr/0/status")
+
+    loop = asyncio.new_event_loop()
+    try:
+        benchmark(
+            "api_request_x100",
+            lambda: loop.run_until_complete(requests()),
+            number=10,
+        )
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize("mode", list(ValidationMode))
+@pytest.mark.parametrize("getter", ["status", "setup", "samples"])
+def test_benchmark_validation_mode(benchmark, reseller, mode, getter):
+    session = AsyncSmartboxSession(
+        api_name="test_api",
+        username="test_user",
+        password="test_password",
+        validation_mode=mode,
+    )
+    node = _fixture("devs/device1/mgr/nodes.json")["nodes"][0]
+    # Responses are served from memory, only decoding and validation count
+    bodies = {}
+
+    async def api_request(path):
+        return json.loads(bodies[path])
+
+    async def api_request_bytes(path):
+        return bodies[path]
+
+    session._api_request = api_request
+    session._api_request_bytes = api_request_bytes
+    get = getattr(session, f"get_node_{getter}")
+    path = f"devs/device1/{node['type']}/{node['addr']}/{getter}"
+    bodies[path] = load_fixture(f"{path}.json").encode()
+    kwargs = {}
+    if getter == "samples":
+        kwargs = {"start_time": 0, "end_time": 1}
+        bodies[f"{path}?start=0&end=1"] = bodies[path]
+
+    async def requests():
+        for _ in range(100):
+            await get("device1", node, **kwargs)
+
+    loop = asyncio.new_event_loop()
+    try:
+        benchmark(
+            f"validation_mode[{getter}-{mode}]",
+            lambda: loop.run_until_complete(requests()),
+            number=10,
+        )
+    finally:
+        loop.close()
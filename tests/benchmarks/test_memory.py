@@ -0,0 +1,47 @@
+import json
+import tracemalloc
+
+from smartbox.models import validate_node_status
+from smartbox.records import NodeStatusRecord
+from tests.common import load_fixture
+
+FLEET_SIZE = 10_000
+
+
+def _bodies():
+    """JSON status bodies of a fleet, with distinct measured values."""
+    status = json.loads(load_fixture("devs/device1/htr/0/status.json"))
+    return [
+        json.dumps(
+            {**status, "mtemp": f"{15 + i % 100 / 10}", "power": str(i % 1500)}
+        )
+        for i in range(FLEET_SIZE)
+    ]
+
+
+def _retained(build):
+    """Bytes still allocated by the objects build returns."""
+    bodies = _bodies()
+    tracemalloc.start()
+    try:
+        objects = build(bodies)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(objects) == FLEET_SIZE
+    return size
+
+
+def test_memory_node_status_fleet():
+    models = _retained(
+        lambda bodies: [validate_node_status("htr", body) for body in bodies]
+    )
+    records = _retained(
+        lambda bodies: [
+            NodeStatusRecord.from_json(body, "htr") for body in bodies
+        ]
+    )
+    assert records < models / 2, (
+        f"{FLEET_SIZE} node statuses: models {models / 2**20:.1f} MiB, "
+        f"records {records / 2**20:.1f} MiB"
+    )
@@ -14,4 +14,11 @@ def load_fixture(filename):
 
 async def fake_get_request(*args, **kwargs):
     """Return fake data."""
-    return json.loads(load_fixture(f"{args[1]}.json"))
+    path = args[1].partition("?")[0]
+    return json.loads(load_fixture(f"{path}.json"))
+
+
+async def fake_get_request_bytes(*args, **kwargs):
+    """Return the fake response body."""
+    path = args[1].partition("?")[0]
+    return get_fixture_path(f"{path}.json").read_bytes()
@@ -6,7 +6,7 @@ import pytest
 from smartbox.reseller import SmartboxReseller
 from smartbox.session import AsyncSession, AsyncSmartboxSession, Session
 from smartbox.update_manager import UpdateManager
-from tests.common import fake_get_request
+from tests.common import fake_get_request, fake_get_request_bytes
 
 
 @pytest.fixture
@@ -37,6 +37,11 @@ def async_smartbox_session(mocker, reseller):
             autospec=True,
             side_effect=fake_get_request,
         ),
+        patch(
+            "smartbox.session.AsyncSmartboxSession._api_request_bytes",
+            autospec=True,
+            side_effect=fake_get_request_bytes,
+        ),
         patch(
             "smartbox.update_manager.SocketSession",
             autospec=True,
@@ -0,0 +1,50 @@
+import pytest
+
+from smartbox.connection import (
+    CLI_CONNECTION_PROFILE,
+    SERVICE_CONNECTION_PROFILE,
+    ConnectionProfile,
+)
+from smartbox.session import AsyncSession
+
+
+@pytest.mark.asyncio
+async def test_connection_profile_connector():
+    connector = SERVICE_CONNECTION_PROFILE.create_connector()
+    assert connector.limit == 100
+    assert connector.limit_per_host == 20
+    assert connector._keepalive_timeout == 60.0
+    await connector.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_profile_client_session():
+    client = CLI_CONNECTION_PROFILE.create_client_session()
+    assert client.headers["Accept-Encoding"] == "gzip, deflate"
+    assert client.timeout.total == 60.0
+    assert client.connector.limit == 10
+    await client.close()
+
+
+def test_connection_profile_frozen():
+    profile = ConnectionProfile()
+    with pytest.raises(ValueError, match="frozen"):
+        profile.limit = 1
+
+
+@pytest.mark.asyncio
+async def test_session_owned_client(reseller):
+    session = AsyncSession(
+        api_name="test_api",
+        username="test_user",
+        password="test_password",
+        connection_profile=CLI_CONNECTION_PROFILE,
+    )
+    assert session.connection_profile is CLI_CONNECTION_PROFILE
+    client = session.client
+    assert session.client is client
+    assert client.connector.limit_per_host == 4
+    await session.close()
+    assert client.closed
+    assert session.client is not client
+    await session.close()
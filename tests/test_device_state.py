@@ -0,0 +1,111 @@
+import json
+
+from smartbox.device_state import DeviceState
+from tests.common import load_fixture
+
+DEV_DATA = {
+    "away_status": {"away": False, "enabled": True},
+    "connected": True,
+    "htr_system": {"setup": {"power_limit": "1000"}},
+    "nodes": [
+        {
+            "type": "htr",
+            "addr": 1,
+            "name": "Living room",
+            "status": json.loads(
+                load_fixture("devs/device1/htr/0/status.json")
+            ),
+            "setup": {"units": "C", "factory_options": {"ac_time": True}},
+            "version": {"fw_version": "1.0"},
+        },
+        {"type": "acm", "addr": "2", "status": {"mtemp": "20.0"}},
+        {"type": "pmo"},
+        "invalid",
+    ],
+}
+
+
+def test_device_state_seed():
+    state = DeviceState()
+    assert state.node_status("htr", 1) is None
+    assert state.connected is None
+    assert state.power_limit is None
+
+    state.seed(DEV_DATA)
+    assert list(state.node_keys()) == [("htr", 1), ("acm", 2)]
+    assert state.node_status("htr", 1) == DEV_DATA["nodes"][0]["status"]
+    assert state.node_setup("htr", 1)["factory_options"] == {"ac_time": True}
+    assert state.node_version("htr", 1) == {"fw_version": "1.0"}
+    assert state.node_status("acm", 2) == {"mtemp": "20.0"}
+    assert state.node_setup("acm", 2) is None
+    assert state.node("acm", 2)["addr"] == "2"
+    assert state.away_status == {"away": False, "enabled": True}
+    assert state.connected is True
+    assert state.power_limit == 1000
+    assert state.revision("htr", 1) == 1
+    assert state.revision("pmo", 3) == 0
+
+    # The state shares the dev data, updates replace what they change
+    status = state.node_status("htr", 1)
+    assert status is DEV_DATA["nodes"][0]["status"]
+    state.apply_update("/htr/1/status", {"mtemp": "99"})
+    assert DEV_DATA["nodes"][0]["status"]["mtemp"] != "99"
+    assert status["mtemp"] != "99"
+    assert state.node_status("htr", 1)["mtemp"] == "99"
+    assert state.node_setup("htr", 1) is DEV_DATA["nodes"][0]["setup"]
+    state.apply_update("/htr_system/power_limit", {"power_limit": 500})
+    assert DEV_DATA["htr_system"] == {"setup": {"power_limit": "1000"}}
+
+
+def test_device_state_apply_update():
+    state = DeviceState()
+    state.seed(DEV_DATA)
+    state.apply_update("/htr/1/status", {"mtemp": "21.5", "active": True})
+    state.apply_update("/htr/1/setup", {"factory_options": {"lock": True}})
+    state.apply_update("/acm/2/version", {"fw_version": "2.0"})
+    state.apply_update("/pmo/3/status", {"power": "100"})
+    state.apply_update("/mgr/away_status", {"away": True})
+    state.apply_update("/connected", {"connected": False})
+    state.apply_update("/htr_system/power_limit", {"power_limit": 500})
+
+    status = state.node_status("htr", 1)
+    assert status["mtemp"] == "21.5"
+    assert status["active"] is True
+    assert status["stemp"] == DEV_DATA["nodes"][0]["status"]["stemp"]
+    assert state.node_setup("htr", 1) == {
+        "units": "C",
+        "factory_options": {"ac_time": True, "lock": True},
+    }
+    assert state.node_version("acm", 2) == {"fw_version": "2.0"}
+    assert state.node("pmo", 3) == {
+        "type": "pmo",
+        "addr": 3,
+        "status": {"power": "100"},
+    }
+    assert state.revision("htr", 1) == 3
+    assert state.revision("pmo", 3) == 1
+    assert state.away_status == {"away": True, "enabled": True}
+    assert state.connected is False
+    assert state.power_limit == 500
+
+    state.apply_update("/htr_system/setup", {"power_limit": 600})
+    assert state.power_limit == 600
+
+    # A new dev data replaces the state, revisions keep increasing
+    state.seed({"nodes": [{"type": "htr", "addr": 1, "status": {}}]})
+    assert state.node_status("htr", 1) == {}
+    assert state.node_status("pmo", 3) is None
+    assert state.revision("htr", 1) == 4
+    assert state.away_status is None
+
+    state.clear()
+    assert state.node("htr", 1) is None
+
+
+def test_device_state_non_decimal_addr():
+    state = DeviceState()
+    # "²" is a digit for str.isdigit, but not for int()
+    state.apply_update("/htr/1²/status", {"mtemp": "20.0"})
+    assert list(state.node_keys()) == []
+    state.apply_update("/htr/\u0661/status", {"mtemp": "20.0"})
+    assert state.node_status("htr", 1) == {"mtemp": "20.0"}
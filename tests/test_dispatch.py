@@ -0,0 +1,249 @@
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from smartbox.dispatch import (
+    CALL_ORIGIN,
+    AsyncCallbackQueue,
+    ExecutorCallback,
+    ExecutorLanes,
+    OverflowPolicy,
+    threaded,
+)
+from smartbox.socket import SmartboxAPIV2Namespace
+
+
+async def test_async_callback_queue():
+    callback = AsyncMock()
+    queue = AsyncCallbackQueue(callback, maxsize=10)
+    queue("htr", 1, {"mtemp": "1"})
+    queue("htr", 2, {"mtemp": "2"})
+    assert queue.stats.depth == 2
+    callback.assert_not_awaited()
+    await queue.join()
+    assert callback.await_args_list == [
+        (("htr", 1, {"mtemp": "1"}),),
+        (("htr", 2, {"mtemp": "2"}),),
+    ]
+    assert queue.stats.depth == 0
+    assert queue.stats.max_depth == 2
+    assert queue.stats.delivered == 2
+    queue.close()
+
+
+async def test_async_callback_queue_errors():
+    callback = AsyncMock(side_effect=[ValueError("boom"), None])
+    queue = AsyncCallbackQueue(callback)
+    queue(1)
+    queue(2)
+    await queue.join()
+    assert callback.await_count == 2
+    assert queue.stats.errors == 1
+    assert queue.stats.delivered == 1
+    queue.close()
+
+
+async def test_async_callback_queue_drop_oldest():
+    callback = AsyncMock()
+    queue = AsyncCallbackQueue(callback, 2, OverflowPolicy.DROP_OLDEST)
+    for i in range(5):
+        queue(i)
+    assert queue.stats.depth == 2
+    assert queue.stats.dropped == 3
+    await queue.join()
+    assert callback.await_args_list == [((3,),), ((4,),)]
+    queue.close()
+
+
+async def test_async_callback_queue_coalesce():
+    callback = AsyncMock()
+    queue = AsyncCallbackQueue(callback, 2, "coalesce")
+    queue("htr", 1, {"mtemp": "1"})
+    queue("htr", 2, {"mtemp": "2"})
+    queue("htr", 1, {"mtemp": "3"})
+    token = CALL_ORIGIN.set(("device_id", "/htr/1/status"))
+    queue({"mtemp": "4"}, node_type="htr", addr="1")
+    queue({"mtemp": "5"}, node_type="htr", addr="1", changes={})
+    CALL_ORIGIN.reset(token)
+    assert queue.stats.coalesced == 2
+    # Full without an event of the same origin, the oldest is dropped
+    assert queue.stats.dropped == 1
+    await queue.join()
+    assert callback.await_args_list == [
+        (("htr", 2, {"mtemp": "2"}),),
+        (({"mtemp": "5"},), {"node_type": "htr", "addr": "1", "changes": {}}),
+    ]
+    queue.close()
+
+
+async def test_async_callback_queue_block():
+    release = asyncio.Event()
+
+    async def callback(value):
+        await release.wait()
+
+    queue = AsyncCallbackQueue(callback, 2)
+    for i in range(3):
+        queue(i)
+    assert queue.full
+    assert queue.stats.depth == 2
+    assert queue.stats.waiting == 1
+    assert queue.stats.dropped == 0
+    wait = asyncio.ensure_future(queue.wait_for_space())
+    await asyncio.sleep(0)
+    assert not wait.done()
+    release.set()
+    await asyncio.wait_for(wait, 1)
+    await queue.join()
+    assert queue.stats.delivered == 3
+    assert queue.stats.max_depth == 2
+    assert queue.stats.waiting == 0
+    queue.close()
+
+
+async def test_async_callback_queue_coalesce_call_origin():
+    callback = AsyncMock()
+    queue = AsyncCallbackQueue(callback, 10, "coalesce")
+    for device_id, path in (
+        ("device_1", "/htr/1/status"),
+        ("device_1", "/htr/2/status"),
+        ("device_2", "/htr/1/status"),
+        ("device_1", "/htr/1/status"),
+    ):
+        token = CALL_ORIGIN.set((device_id, path))
+        queue({"path": path})
+        CALL_ORIGIN.reset(token)
+    # Node calls of different devices aren't coalesced either
+    token = CALL_ORIGIN.set(("device_2", None))
+    queue("htr", 1, {"mtemp": "1"})
+    CALL_ORIGIN.reset(token)
+    queue("htr", 1, {"mtemp": "2"})
+    # Without origin, calls are never coalesced
+    queue({"path": None})
+    queue({"path": None})
+    assert queue.stats.coalesced == 1
+    await queue.join()
+    assert callback.await_count == 7
+    queue.close()
+
+
+def test_async_callback_queue_invalid_size():
+    with pytest.raises(ValueError, match="Invalid callback queue size 0"):
+        AsyncCallbackQueue(AsyncMock(), 0)
+
+
+async def test_namespace_awaits_callbacks(mocker):
+    waited = []
+
+    async def backpressure():
+        waited.append(True)
+
+    namespace = SmartboxAPIV2Namespace(
+        mocker.MagicMock(),
+        "/ns",
+        lambda data: backpressure(),
+        lambda data: backpressure(),
+    )
+    await namespace.on_dev_data({})
+    await namespace.on_update({"path": "/htr/1/status"})
+    assert waited == [True, True]
+
+
+async def test_namespace_dispatches_messages_in_order(mocker):
+    # engineio calls the handlers in separate tasks
+    release = asyncio.Event()
+    dispatched = []
+
+    def update_callback(data):
+        dispatched.append(data["path"])
+        return release.wait() if len(dispatched) == 1 else None
+
+    namespace = SmartboxAPIV2Namespace(
+        mocker.MagicMock(), "/ns", lambda _data: None, update_callback
+    )
+    await namespace.on_dev_data({})
+    tasks = [
+        asyncio.ensure_future(namespace.on_update({"path": f"/htr/{i}/status"}))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    # The next updates wait for the backpressure of the first one
+    assert dispatched == ["/htr/0/status"]
+    release.set()
+    await asyncio.wait_for(asyncio.gather(*tasks), 1)
+    assert dispatched == [f"/htr/{i}/status" for i in range(3)]
+
+
+async def test_executor_lanes_keep_order_per_node():
+    calls = []
+    lock = threading.Lock()
+
+    def callback(node_type, addr, data):
+        time.sleep(0.001 * (addr % 2))
+        with lock:
+            calls.append((addr, data, threading.current_thread().name))
+
+    lanes = ExecutorLanes(2)
+    dispatch = ExecutorCallback(callback, lanes)
+    for i in range(10):
+        for addr in range(4):
+            dispatch("htr", addr, i)
+    await lanes.join()
+    lanes.shutdown()
+    assert len(calls) == 40
+    for addr in range(4):
+        node_calls = [call for call in calls if call[0] == addr]
+        assert [call[1] for call in node_calls] == list(range(10))
+        # A node always goes to the same lane
+        assert len({call[2] for call in node_calls}) == 1
+    assert all(name.startswith("smartbox-callback-") for *_, name in calls)
+
+
+async def test_executor_lanes_unhashable_kwargs():
+    threads = {}
+    lock = threading.Lock()
+
+    def callback(data, changes):
+        time.sleep(0.001)
+        with lock:
+            threads.setdefault(data, set()).add(threading.current_thread())
+
+    lanes = ExecutorLanes(4)
+    dispatch = ExecutorCallback(callback, lanes)
+    for _ in range(3):
+        for addr in range(20):
+            path = f"/htr/{addr}/status"
+            token = CALL_ORIGIN.set(("device_id", path))
+            dispatch(path, changes={"mtemp": (None, "1")})
+            CALL_ORIGIN.reset(token)
+    await lanes.join()
+    lanes.shutdown()
+    # Unhashable kwargs don't send all the calls to the same lane
+    assert all(len(lane) == 1 for lane in threads.values())
+    assert len(set().union(*threads.values())) > 1
+
+
+async def test_executor_lanes_errors(caplog):
+    callback = MagicMock(side_effect=[ValueError("boom"), None])
+    lanes = ExecutorLanes(1)
+    dispatch = ExecutorCallback(callback, lanes)
+    dispatch(1)
+    dispatch(2)
+    await lanes.join()
+    lanes.shutdown()
+    assert callback.call_count == 2
+    assert "Error in callback" in caplog.text
+
+
+def test_executor_lanes_invalid_workers():
+    with pytest.raises(ValueError, match="Invalid number of executor workers"):
+        ExecutorLanes(0)
+
+
+def test_threaded_callback():
+    callback = MagicMock(return_value=1)
+    assert threaded(callback)("htr", 1, {}) == 1
+    callback.assert_called_once_with("htr", 1, {})
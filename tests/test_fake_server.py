@@ -0,0 +1,107 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from smartbox.fake_server import FakeSmartboxServer
+from smartbox.models import HtrModNodeStatus, Samples
+from smartbox.session import AsyncSmartboxSession
+
+
+@asynccontextmanager
+async def fake_fleet(**kwargs):
+    async with FakeSmartboxServer(**kwargs) as server:
+        session = AsyncSmartboxSession(
+            api_name="test_api",
+            username="test_user",
+            password="test_password",
+            api_host=server.api_host,
+        )
+        try:
+            yield server, session
+        finally:
+            await session.close()
+
+
+@pytest.mark.asyncio
+async def test_fake_server_read_endpoints(reseller):
+    async with fake_fleet(devices=4, nodes_per_device=3, homes=2) as (
+        fake_server,
+        fake_session,
+    ):
+        devices = await fake_session.get_devices()
+        assert [device["dev_id"] for device in devices] == [
+            "device1",
+            "device2",
+            "device3",
+            "device4",
+        ]
+        homes = await fake_session.get_grouped_devices()
+        assert [len(home["devs"]) for home in homes] == [2, 2]
+        nodes = await fake_session.get_nodes("device1")
+        assert [node["type"] for node in nodes] == ["htr", "acm", "htr_mod"]
+        assert await fake_session.get_device_connected("device1") == {
+            "connected": True
+        }
+
+        fake_session.raw_response = False
+        status = await fake_session.get_node_status("device1", nodes[2])
+        assert isinstance(status, HtrModNodeStatus)
+        setup = await fake_session.get_node_setup("device1", nodes[0])
+        assert setup.units == "C"
+        samples = await fake_session.get_node_samples(
+            "device1", nodes[0], start_time=3600, end_time=4 * 3600
+        )
+        assert isinstance(samples, Samples)
+        assert [sample.t for sample in samples.samples] == [
+            3600,
+            7200,
+            10800,
+            14400,
+        ]
+        assert fake_server.stats["tokens"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fake_server_write_endpoints(reseller):
+    async with fake_fleet(devices=4, nodes_per_device=3, homes=2) as (
+        fake_server,
+        fake_session,
+    ):
+        node = (await fake_session.get_nodes("device2"))[0]
+        await fake_session.set_node_status(
+            "device2", node, {"stemp": "23.5", "units": "C"}
+        )
+        assert (await fake_session.get_node_status("device2", node))[
+            "stemp"
+        ] == ("23.5")
+        assert await fake_session.set_home_power_limit("home1", 1500) == {}
+        assert await fake_session.get_device_power_limit("device1") == 1500
+        assert await fake_session.get_device_power_limit("device2") == 0
+        await fake_session.set_device_away_status("device3", {"away": True})
+        assert fake_server.snapshot()["device3"]["away_status"]["away"] is True
+
+
+@pytest.mark.asyncio
+async def test_fake_server_token_expiry(reseller):
+    async with fake_fleet(devices=4, nodes_per_device=3, homes=2) as (
+        fake_server,
+        fake_session,
+    ):
+        await fake_session.get_devices()
+        fake_server.expire_tokens()
+        response = await fake_session._api_request("devs")
+        assert response == {"error": "invalid_token"}
+        assert fake_server.stats["unauthorized"] == 1
+
+        # A session whose token is about to expire refreshes it
+        fake_session._expires_at = fake_session._expires_at.replace(year=2000)
+        assert len(await fake_session.get_devices()) == 4
+        assert fake_server.stats["token_refreshes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fake_server_error_injection(reseller):
+    async with fake_fleet(error_rate=1.0, seed=1) as (server, session):
+        response = await session._api_request("devs")
+        assert response["statusCode"] == 500
+        assert server.stats["injected_errors"] == 1
@@ -0,0 +1,192 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from smartbox.fleet import FleetUpdateManager
+from smartbox.socket import SocketSession
+from tests.common import load_fixture
+
+
+@pytest.fixture
+def fleet(mock_session):
+    return FleetUpdateManager(mock_session, ["dev1", "dev2"])
+
+
+def test_fleet_devices(fleet):
+    assert fleet.device_ids == ["dev1", "dev2"]
+    sessions = fleet.socket_sessions
+    assert all(isinstance(s, SocketSession) for s in sessions.values())
+    fleet.add_device("dev1")
+    fleet.add_device("dev3")
+    assert fleet.device_ids == ["dev1", "dev2", "dev3"]
+
+
+def test_fleet_shared_subscriptions(fleet):
+    status_callback = MagicMock()
+    away_callback = MagicMock()
+    fleet.subscribe_to_node_status(status_callback)
+    fleet.subscribe_to_device_away_status(away_callback)
+    # One set of subscriptions for all the devices
+    assert len(fleet._update_subscriptions) == 2
+
+    fleet._dev_data_cb(
+        {
+            "away_status": {"away": False},
+            "nodes": [{"type": "htr", "addr": 1, "status": {"mtemp": "1"}}],
+        },
+        device_id="dev1",
+    )
+    fleet._update_cb(
+        {"path": "/htr/1/status", "body": {"mtemp": "2"}}, device_id="dev2"
+    )
+    fleet._update_cb(
+        {"path": "/mgr/away_status", "body": {"away": True}}, device_id="dev2"
+    )
+    assert status_callback.call_args_list == [
+        (("dev1", "htr", 1, {"mtemp": "1"}),),
+        (("dev2", "htr", 1, {"mtemp": "2"}),),
+    ]
+    assert away_callback.call_args_list == [
+        (("dev1", {"away": False}),),
+        (("dev2", {"away": True}),),
+    ]
+    assert fleet.device_state("dev1").node_status("htr", 1) == {"mtemp": "1"}
+    assert fleet.device_state("dev2").node_status("htr", 1) == {"mtemp": "2"}
+    assert fleet.device_state("dev2").away_status == {"away": True}
+
+
+def test_fleet_model_and_change_subscriptions(fleet):
+    model_callback = MagicMock()
+    change_callback = MagicMock()
+    fleet.subscribe_to_node_setup_model(model_callback)
+    fleet.subscribe_to_updates(
+        r"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/setup",
+        ".body",
+        change_callback,
+        changes_only=True,
+    )
+    setup = json.loads(load_fixture("devs/device1/htr/0/setup.json"))
+    for device_id in ("dev1", "dev2", "dev1"):
+        fleet._update_cb(
+            {"path": "/htr/1/setup", "body": setup}, device_id=device_id
+        )
+    # Changes are tracked per device
+    assert change_callback.call_count == 2
+    assert change_callback.call_args.args == ("dev2", setup)
+    dev1_setup = fleet.node_states("dev1").setup("htr", 1)
+    dev2_setup = fleet.node_states("dev2").setup("htr", 1)
+    assert dev1_setup is not dev2_setup
+    assert model_callback.call_args_list == [
+        (("dev1", "htr", 1, dev1_setup),),
+        (("dev2", "htr", 1, dev2_setup),),
+        (("dev1", "htr", 1, dev1_setup),),
+    ]
+
+
+async def test_fleet_async_callbacks(mock_session):
+    fleet = FleetUpdateManager(
+        mock_session, ["dev1", "dev2"], overflow_policy="coalesce"
+    )
+    callback = AsyncMock()
+    fleet.subscribe_to_node_status(callback)
+    for device_id in ("dev1", "dev2", "dev1"):
+        fleet._update_cb(
+            {"path": "/htr/1/status", "body": {"mtemp": device_id}},
+            device_id=device_id,
+        )
+    await fleet.join_callbacks()
+    # Coalesced per device
+    assert callback.await_args_list == [
+        (("dev1", "htr", 1, {"mtemp": "dev1"}),),
+        (("dev2", "htr", 1, {"mtemp": "dev2"}),),
+    ]
+    await fleet.cancel()
+
+
+async def test_fleet_run_restarts_failed_sockets(fleet):
+    runs = {"dev1": 0, "dev2": 0}
+
+    def socket_run(device_id):
+        async def run():
+            runs[device_id] += 1
+            if device_id == "dev1" and runs[device_id] == 1:
+                raise ConnectionError
+            await asyncio.Event().wait()
+
+        return run
+
+    sessions = fleet.socket_sessions
+    with (
+        patch("smartbox.fleet._RESTART_DELAY", 0),
+        patch.object(sessions["dev1"], "run", socket_run("dev1")),
+        patch.object(sessions["dev2"], "run", socket_run("dev2")),
+        patch.object(sessions["dev1"], "cancel", AsyncMock()) as cancel1,
+        patch.object(sessions["dev2"], "cancel", AsyncMock()) as cancel2,
+    ):
+        task = asyncio.ensure_future(fleet.run())
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert runs == {"dev1": 2, "dev2": 1}
+        await fleet.cancel()
+        await asyncio.wait_for(task, 1)
+    cancel1.assert_awaited_once()
+    cancel2.assert_awaited_once()
+
+
+async def test_fleet_restarts_socket_session(mock_session, fleet):
+    mock_session.access_token = "token"
+    mock_session.api_host = "https://api.example.com"
+    mock_session.check_refresh_auth = AsyncMock()
+    sessions = fleet.socket_sessions
+    sio = sessions["dev1"]._sio
+    ping_tasks = []
+    start_background_task = sio.start_background_task
+
+    def start_ping(target):
+        ping_tasks.append(start_background_task(target))
+        return ping_tasks[-1]
+
+    async def connect(*args, **kwargs):
+        if len(ping_tasks) < 3:
+            raise RuntimeError
+        await asyncio.Event().wait()
+
+    with (
+        patch("smartbox.fleet._RESTART_DELAY", 0),
+        patch.object(sio, "start_background_task", start_ping),
+        patch.object(sio, "connect", connect),
+        patch.object(sessions["dev2"], "run", asyncio.Event().wait),
+    ):
+        task = asyncio.ensure_future(fleet.run())
+        for _ in range(10):
+            await asyncio.sleep(0)
+        # The ping task of a failed run is cancelled with it
+        assert len(ping_tasks) == 3
+        assert [ping_task.done() for ping_task in ping_tasks] == [
+            True,
+            True,
+            False,
+        ]
+        await fleet.cancel()
+        await asyncio.wait_for(task, 1)
+    assert all(ping_task.done() for ping_task in ping_tasks)
+
+
+async def test_fleet_run_cancelled(fleet):
+    sessions = fleet.socket_sessions
+    with (
+        patch.object(sessions["dev1"], "run", asyncio.Event().wait),
+        patch.object(sessions["dev2"], "run", asyncio.Event().wait),
+    ):
+        task = asyncio.ensure_future(fleet.run())
+        await asyncio.sleep(0)
+        device_tasks = list(fleet._tasks.values())
+        assert len(device_tasks) == 2
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    # The device tasks are stopped with the run
+    assert all(device_task.done() for device_task in device_tasks)
+    assert not fleet._tasks
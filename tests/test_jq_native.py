@@ -0,0 +1,113 @@
+import jq
+import pytest
+
+from smartbox.jq_native import compile_native, field_path, jq_type_name
+
+DATA = [
+    {},
+    {"connected": True, "body": {"connected": False, "power_limit": "10"}},
+    {"body": None, "nodes": None},
+    {"body": "text", "nodes": "text"},
+    {"body": [1, 2], "nodes": {"a": {"addr": 1}, "b": {"addr": 2}}},
+    {
+        "htr_system": {"setup": {"power_limit": 0}},
+        "nodes": [
+            {"addr": 0, "type": "htr", "status": {"mtemp": "19"}},
+            {"addr": 1, "type": "acm", "setup": {"units": "C"}},
+            "not a node",
+            {"addr": 2, "type": "htr"},
+        ],
+    },
+]
+
+EXPRESSIONS = [
+    ".",
+    ".connected",
+    ".body.connected",
+    ".htr_system.setup.power_limit",
+    ".nodes[]",
+    ".nodes[] | .addr",
+    ".nodes[].addr",
+    "(.nodes[] | {addr, type, status})?",
+    "(.nodes[] | {addr, type, setup})",
+    ".nodes[]? | .type?",
+    "{connected, body} | .body",
+    ".body | .connected?",
+    "(.body)",
+    ".[]",
+]
+
+
+def _jq(expr, data):
+    try:
+        return jq.compile(expr).input(data).all(), None
+    except ValueError:
+        return None, ValueError
+
+
+def _native(expr, data):
+    outputs = []
+    try:
+        outputs.extend(compile_native(expr)(data))
+    except ValueError:
+        return None, ValueError
+    return outputs, None
+
+
+@pytest.mark.parametrize("expr", EXPRESSIONS)
+@pytest.mark.parametrize("data", DATA)
+def test_native_matches_jq(expr, data):
+    assert _native(expr, data) == _jq(expr, data)
+
+
+@pytest.mark.parametrize(
+    ("value", "name"),
+    [
+        (None, "null"),
+        (True, "boolean"),
+        (1, "number"),
+        (1.5, "number"),
+        ("text", "string"),
+        ([1], "array"),
+        ({"a": 1}, "object"),
+    ],
+)
+def test_jq_type_name(value, name):
+    assert jq_type_name(value) == name
+    if name not in {"null", "object"}:
+        # Same type names as the errors of jq
+        for evaluate in (jq.compile(".a").input, compile_native(".a")):
+            with pytest.raises(ValueError, match=f"Cannot index {name} with"):
+                list(evaluate(value))
+
+
+def test_native_try_keeps_outputs_before_error():
+    data = {"nodes": [{"addr": 1}, "text", {"addr": 2}]}
+    assert list(compile_native("(.nodes[] | .addr)?")(data)) == [1]
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        'select(.a == "b")',
+        ".nodes | map(.addr)",
+        ".nodes[0]",
+        '.["a"]',
+        "{a: .b}",
+        "..",
+        ".a,.b",
+        "(.a",
+        ".a)",
+        "",
+    ],
+)
+def test_native_unsupported(expr):
+    assert compile_native(expr) is None
+
+
+def test_field_path():
+    assert field_path(".a") == ("a",)
+    assert field_path(".body.power_limit") == ("body", "power_limit")
+    assert field_path(".a[]") is None
+    assert field_path(".a .b") is None
+    assert field_path(".") is None
@@ -1,5 +1,11 @@
+import json
+
+from pydantic import ValidationError
+import pytest
+
 from smartbox.models import (
     AcmNodeStatus,
+    DefaultNodeSetup,
     DefaultNodeStatus,
     Guests,
     GuestUser,
@@ -7,9 +13,20 @@ from smartbox.models import (
     HtrNodeStatus,
     NodeExtraOptions,
     NodeFactoryOptions,
+    NodeProg,
     NodeSetup,
     NodeStatus,
+    PmoSetup,
+    Sample,
+    SmartboxNodeType,
+    celsius_to_fahrenheit,
+    convert_temperature,
+    fahrenheit_to_celsius,
+    parse_number,
+    validate_node_setup,
+    validate_node_status,
 )
+from tests.common import load_fixture
 
 
 def test_node_factory_options():
@@ -281,3 +298,138 @@ def test_guests():
     assert len(guests.guest_users) == 2
     assert guests.guest_users[0].email == "guest1@example.com"
     assert not guests.guest_users[1].pending
+
+
+def test_node_prog_days():
+    prog = NodeProg(prog=[day for day in range(7) for _ in range(48)])
+    assert prog.slots_per_day == 48
+    days = prog.days()
+    assert len(days) == 7
+    assert days[3] == bytes([3] * 48)
+    assert NodeProg.from_days(days) == prog
+    assert NodeProg.from_days([[1, 2]] * 7).prog == [1, 2] * 7
+
+
+def test_node_prog_from_days_invalid():
+    with pytest.raises(ValueError, match="7 days"):
+        NodeProg.from_days([b"\x00"] * 6)
+    with pytest.raises(ValueError, match="7 days"):
+        NodeProg.from_days([b"\x00"] * 6 + [b"\x00\x01"])
+
+
+def test_node_prog_invalid():
+    with pytest.raises(ValueError, match="7 days"):
+        NodeProg(prog=[0] * 169)
+    with pytest.raises(ValueError, match="less than or equal to 255"):
+        NodeProg(prog=[256] * 7)
+    with pytest.raises(ValueError, match="greater than or equal to 0"):
+        NodeProg(prog=[-1] * 7)
+
+
+def _status_fixture(path):
+    return json.loads(load_fixture(f"devs/{path}/status.json"))
+
+
+def test_validate_node_status_dispatch():
+    htr_status = _status_fixture("device1/htr/0")
+    assert type(validate_node_status("htr", htr_status)) is HtrNodeStatus
+    assert type(validate_node_status("thm", htr_status)) is DefaultNodeStatus
+    acm_status = {**htr_status, "charging": True, "charge_level": 3}
+    assert type(validate_node_status("acm", acm_status)) is AcmNodeStatus
+    # The fields only known for acm nodes are not mistaken for htr ones
+    assert type(validate_node_status("htr", acm_status)) is HtrNodeStatus
+    htr_mod_status = {
+        **htr_status,
+        "on": True,
+        "selected_temp": "comfort",
+        "comfort_temp": "22.0",
+        "eco_offset": "4.0",
+    }
+    assert (
+        type(validate_node_status(SmartboxNodeType.HTR_MOD, htr_mod_status))
+        is HtrModNodeStatus
+    )
+
+
+def test_validate_node_status_fallback():
+    # acm status without charge information falls back to the default model
+    acm_status = _status_fixture("device1/acm/1")
+    assert type(validate_node_status("acm", acm_status)) is DefaultNodeStatus
+    assert type(validate_node_status("unknown", acm_status)) is HtrNodeStatus
+    with pytest.raises(ValidationError):
+        validate_node_status("acm", {"mode": "auto"})
+    with pytest.raises(ValidationError):
+        validate_node_status("thm", {"mode": "auto"})
+
+
+def test_validate_node_setup_dispatch():
+    setup = json.loads(load_fixture("devs/device1/htr/0/setup.json"))
+    pmo_setup = json.loads(load_fixture("devs/device1/pmo/3/setup.json"))
+    assert type(validate_node_setup("htr", setup).root) is DefaultNodeSetup
+    assert type(validate_node_setup("pmo", pmo_setup).root) is PmoSetup
+    assert type(validate_node_setup("unknown", pmo_setup).root) is PmoSetup
+    with pytest.raises(ValidationError):
+        validate_node_setup("pmo", setup)
+
+
+def test_validate_node_from_json_body():
+    for path, node_type in (
+        ("device1/htr/0", "htr"),
+        ("device1/acm/1", "acm"),
+        ("device2/htr_mod/0", "htr_mod"),
+        ("device1/htr/0", "unknown"),
+    ):
+        body = load_fixture(f"devs/{path}/status.json").encode()
+        assert validate_node_status(node_type, body) == validate_node_status(
+            node_type, json.loads(body)
+        )
+    body = load_fixture("devs/device1/pmo/3/setup.json").encode()
+    assert type(validate_node_setup("pmo", body).root) is PmoSetup
+    with pytest.raises(ValidationError):
+        validate_node_status("acm", b'{"mode": "auto"}')
+
+
+def test_convert_temperature():
+    assert celsius_to_fahrenheit(20.0) == 68.0
+    assert fahrenheit_to_celsius(68.0) == 20.0
+    assert convert_temperature(20.0, "C", "F") == 68.0
+    assert convert_temperature(68.0, "F", "C") == 20.0
+    assert convert_temperature(21.5, "C", "C") == 21.5
+    assert convert_temperature(None, "C", "F") is None
+    assert convert_temperature(1.0, "C", "F", difference=True) == 1.8
+    assert convert_temperature(1.8, "F", "C", difference=True) == 1.0
+    with pytest.raises(ValueError, match="Unknown temperature units K"):
+        convert_temperature(20.0, "C", "K")
+    assert parse_number("") is None
+    assert parse_number("510") == 510.0
+
+
+def test_node_status_parsed_values():
+    status = HtrNodeStatus.model_validate(_status_fixture("device1/htr/0"))
+    assert status.mtemp_value == 25.7
+    assert status.stemp_value == 20.3
+    assert status.comf_temp_value == 22.0
+    assert status.eco_temp_value == 18.0
+    assert status.power_value == 510.0
+    assert status.temperature("stemp", "F") == pytest.approx(68.54)
+    # Parsed once, dropped on assignment
+    assert "mtemp_value" in status.__dict__
+    status.mtemp = "19.0"
+    assert status.mtemp_value == 19.0
+    assert "mtemp_value" not in status.model_dump()
+    # Copies only keep the parsed values of the fields they didn't update
+    copy = status.model_copy(update={"mtemp": "99.0"})
+    assert copy.mtemp_value == 99.0
+    assert copy.stemp_value == 20.3
+    assert status.mtemp_value == 19.0
+
+
+def test_node_setup_and_sample_parsed_values():
+    setup = validate_node_setup(
+        "htr", json.loads(load_fixture("devs/device1/htr/0/setup.json"))
+    )
+    assert setup.offset_value == float(setup.offset)
+    assert setup.offset_in("F") == pytest.approx(setup.offset_value * 1.8)
+    assert setup.power_value == float(setup.power)
+    sample = Sample(t=0, counter=1.0, temp="11.3")
+    assert sample.temp_value == 11.3
@@ -0,0 +1,109 @@
+import json
+
+from pydantic import ValidationError
+import pytest
+
+from smartbox.models import (
+    AcmNodeStatus,
+    DefaultNodeStatus,
+    HtrNodeStatus,
+    PmoSetup,
+)
+from smartbox.node_state import NodeStates, apply_delta
+from tests.common import load_fixture
+
+
+def _fixture(path):
+    return json.loads(load_fixture(f"devs/{path}.json"))
+
+
+def test_apply_delta():
+    status = HtrNodeStatus.model_validate(_fixture("device1/htr/0/status"))
+    same = apply_delta(
+        status, {"stemp": "21.5", "active": "true", "unknown": 1}
+    )
+    assert same is status
+    assert status.stemp == "21.5"
+    assert status.active is True
+    with pytest.raises(ValidationError):
+        apply_delta(status, {"stemp": "22.0", "duty": "high"})
+    assert status.stemp == "21.5"
+
+
+def test_apply_delta_nested():
+    setup = _fixture("device1/htr/0/setup")
+    states = NodeStates()
+    model = states.apply_setup("htr", 0, setup)
+    assert (
+        states.apply_setup(
+            "htr", 0, {"extra_options": {"boost_time": 30}, "units": "F"}
+        )
+        is model
+    )
+    assert model.extra_options.boost_time == 30
+    assert (
+        model.extra_options.boost_temp == setup["extra_options"]["boost_temp"]
+    )
+    assert model.units == "F"
+    assert states.setup("htr", 0) is model
+    assert states.setup("htr", 1) is None
+
+
+def test_apply_delta_nested_invalid():
+    setup = NodeStates().apply_setup("htr", 0, _fixture("device1/htr/0/setup"))
+    model = setup.root
+    boost_time = model.extra_options.boost_time
+    with pytest.raises(ValidationError):
+        apply_delta(
+            model, {"extra_options": {"boost_time": 5}, "away_mode": "off"}
+        )
+    # The valid nested field isn't applied either
+    assert model.extra_options.boost_time == boost_time
+    with pytest.raises(ValidationError):
+        apply_delta(
+            model, {"extra_options": {"boost_time": "long"}, "units": "F"}
+        )
+    assert model.units == "C"
+
+
+def test_node_states_status():
+    states = NodeStates()
+    body = _fixture("device1/htr/0/status")
+    status = states.apply_status("htr", 0, body)
+    assert type(status) is HtrNodeStatus
+    assert states.apply_status("htr", 0, {"mtemp": "19.0"}) is status
+    assert status.mtemp == "19.0"
+    assert states.status("htr", 0) is status
+    states.clear()
+    assert states.status("htr", 0) is None
+
+
+def test_node_states_status_promotion():
+    states = NodeStates()
+    body = _fixture("device1/acm/1/status")
+    status = states.apply_status("acm", 1, body)
+    assert type(status) is DefaultNodeStatus
+    promoted = states.apply_status(
+        "acm", 1, {"charging": True, "charge_level": 2, "mtemp": "18.0"}
+    )
+    assert type(promoted) is AcmNodeStatus
+    assert promoted.charge_level == 2
+    assert promoted.mtemp == "18.0"
+    assert promoted.mode == status.mode
+    assert states.status("acm", 1) is promoted
+
+
+def test_node_states_pmo_setup():
+    states = NodeStates()
+    setup = states.apply_setup("pmo", 3, _fixture("device1/pmo/3/setup"))
+    states.apply_setup("pmo", 3, {"power_limit": "1200"})
+    assert type(setup.root) is PmoSetup
+    assert setup.power_limit == 1200
+
+
+def test_apply_delta_refreshes_parsed_values():
+    states = NodeStates()
+    status = states.apply_status("htr", 0, _fixture("device1/htr/0/status"))
+    assert status.mtemp_value == 25.7
+    states.apply_status("htr", 0, {"mtemp": "19.5"})
+    assert status.mtemp_value == 19.5
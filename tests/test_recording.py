@@ -0,0 +1,144 @@
+import gzip
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from smartbox.fleet import FleetUpdateManager
+from smartbox.recording import (
+    EventRecorder,
+    RecordedEvent,
+    ReplayStats,
+    read_recording,
+    replay,
+)
+from smartbox.socket import SmartboxAPIV2Namespace
+from smartbox.update_manager import UpdateManager
+
+DEV_DATA = {"nodes": [{"type": "htr", "addr": 1, "status": {"mtemp": "1"}}]}
+UPDATE = {"path": "/htr/1/status", "body": {"mtemp": "2"}}
+
+
+def test_event_recorder(tmp_path):
+    path = tmp_path / "events.jsonl.gz"
+    with EventRecorder(path) as recorder:
+        recorder.record("dev_data", DEV_DATA, "dev1")
+        recorder.record("update", UPDATE)
+        assert recorder.count == 2
+    recorder.record("update", UPDATE)
+    assert recorder.count == 2
+
+    with gzip.open(path, "rt") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["event"] for line in lines] == ["dev_data", "update"]
+    assert lines[0]["t"] <= lines[1]["t"]
+
+    events = list(read_recording(path))
+    assert events[0] == RecordedEvent(
+        lines[0]["t"], "dev_data", DEV_DATA, "dev1"
+    )
+    assert events[1].data == UPDATE
+    assert events[1].device_id is None
+
+
+async def test_namespace_records_dispatched_events(tmp_path, mocker):
+    recorder = EventRecorder(tmp_path / "events.jsonl.gz")
+    namespace = SmartboxAPIV2Namespace(
+        mocker.MagicMock(),
+        "/ns",
+        MagicMock(),
+        MagicMock(),
+        recorder,
+        "dev1",
+    )
+    namespace.emit = AsyncMock()
+    # Ignored before dev data
+    await namespace.on_update(UPDATE)
+    await namespace.on_dev_data(DEV_DATA)
+    await namespace.on_update(UPDATE)
+    recorder.close()
+    events = list(read_recording(recorder.path))
+    assert [(e.event, e.data, e.device_id) for e in events] == [
+        ("dev_data", DEV_DATA, "dev1"),
+        ("update", UPDATE, "dev1"),
+    ]
+
+
+def _events(count, interval=0.0):
+    yield RecordedEvent(0.0, "dev_data", DEV_DATA, "dev2")
+    for i in range(1, count):
+        body = {"path": "/htr/1/status", "body": {"mtemp": str(i)}}
+        yield RecordedEvent(i * interval, "update", body, "dev2")
+
+
+async def test_replay_max_speed(mock_session):
+    manager = UpdateManager(mock_session, "dev1")
+    callback = MagicMock()
+    manager.subscribe_to_node_status(callback)
+    stats = await replay(manager, _events(100), speed=None)
+    assert callback.call_count == 100
+    assert manager.device_state.node_status("htr", 1) == {"mtemp": "99"}
+    assert stats.events == 100
+    assert stats.throughput > 0
+    assert 0 <= stats.latency_p50 <= stats.latency_p99 <= stats.latency_max
+
+
+async def test_replay_real_time(tmp_path, mock_session):
+    path = tmp_path / "events.jsonl.gz"
+    with EventRecorder(path) as recorder:
+        for event in _events(3):
+            recorder.record(event.event, event.data, event.device_id)
+    recorded = list(read_recording(path))
+    paced = [
+        RecordedEvent(i * 0.02, e.event, e.data, e.device_id)
+        for i, e in enumerate(recorded)
+    ]
+    fleet = FleetUpdateManager(mock_session, ["dev1", "dev2"])
+    callback = MagicMock()
+    fleet.subscribe_to_node_status(callback)
+
+    stats = await replay(fleet, paced, speed=2)
+    assert stats.duration >= 0.02
+    assert [c.args[0] for c in callback.call_args_list] == ["dev2"] * 3
+    assert fleet.device_state("dev1").node("htr", 1) is None
+
+    stats = await replay(fleet, path, speed=None)
+    assert stats.events == 3
+
+
+@pytest.mark.parametrize("speed", [0, -1.0])
+async def test_replay_invalid_speed(mock_session, speed):
+    manager = UpdateManager(mock_session, "dev1")
+    with pytest.raises(ValueError, match="Invalid replay speed"):
+        await replay(manager, _events(3), speed=speed)
+
+
+async def test_fleet_recorder_closed_once(tmp_path, mock_session):
+    recorder = EventRecorder(tmp_path / "events.jsonl.gz")
+    fleet = FleetUpdateManager(
+        mock_session, ["dev1", "dev2"], recorder=recorder
+    )
+    sessions = fleet.socket_sessions
+    # The recording goes on after a device socket is cancelled
+    await sessions["dev1"].cancel()
+    await sessions["dev2"].namespace.on_dev_data(DEV_DATA)
+    await fleet.cancel()
+    events = list(read_recording(recorder.path))
+    assert [(e.event, e.device_id) for e in events] == [("dev_data", "dev2")]
+
+
+def test_replay_stats():
+    stats = ReplayStats.from_latencies([0.3, 0.1, 0.2, 0.4], 2.0)
+    assert stats.events == 4
+    assert stats.throughput == 2.0
+    assert stats.latency_mean == pytest.approx(0.25)
+    assert stats.latency_p50 == 0.2
+    assert stats.latency_p99 == 0.4
+    assert stats.latency_max == 0.4
+    assert ReplayStats.from_latencies([], 0.0).events == 0
+
+
+def test_feed_unknown_event(mock_session):
+    manager = UpdateManager(mock_session, "dev1")
+    with pytest.raises(ValueError, match="Unknown socket event ping"):
+        manager.feed("ping", {})
@@ -0,0 +1,67 @@
+import dataclasses
+import json
+
+import pytest
+
+from smartbox.models import HtrNodeStatus
+from smartbox.records import NodeStatusRecord
+from tests.common import load_fixture
+
+
+def _status(path):
+    return json.loads(load_fixture(f"devs/{path}/status.json"))
+
+
+def test_node_status_record_from_dict():
+    status = _status("device1/htr/0")
+    record = NodeStatusRecord.from_dict(status, "htr")
+    assert record.node_type == "htr"
+    assert record.mtemp == 25.7
+    assert record.stemp == 20.3
+    assert record.power == 510.0
+    assert record.locked is False
+    assert record.charging is None
+    model = HtrNodeStatus.model_validate(status)
+    assert record.mode == model.mode
+    assert record.duty == model.duty
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        record.mtemp = 20.0
+
+
+def test_node_status_record_type_fields():
+    status = {**_status("device1/acm/1"), "charging": True, "charge_level": 3}
+    record = NodeStatusRecord.from_json(json.dumps(status).encode(), "acm")
+    assert record.charging is True
+    assert record.charge_level == 3
+    status = {**_status("device2/htr_mod/0"), "comfort_temp": "21.5", "on": 1}
+    record = NodeStatusRecord.from_dict(status)
+    assert record.node_type is None
+    assert record.comfort_temp == 21.5
+    assert record.on is True
+    assert record.eco_offset is None
+
+
+def test_node_status_record_invalid():
+    status = _status("device1/htr/0")
+    with pytest.raises(ValueError, match="mtemp"):
+        NodeStatusRecord.from_dict(
+            {k: v for k, v in status.items() if k != "mtemp"}
+        )
+    with pytest.raises(ValueError, match="warm"):
+        NodeStatusRecord.from_dict({**status, "stemp": "warm"})
+    with pytest.raises(ValueError, match="Invalid node status"):
+        NodeStatusRecord.from_dict({**status, "duty": None})
+    assert NodeStatusRecord.from_dict({**status, "stemp": ""}).stemp is None
+
+
+def test_node_status_record_booleans():
+    status = _status("device1/htr/0")
+    record = NodeStatusRecord.from_dict(
+        {**status, "active": "false", "locked": 1, "boost": "True"}
+    )
+    assert record.active is False
+    assert record.locked is True
+    assert record.boost is True
+    with pytest.raises(ValueError, match="Invalid boolean"):
+        NodeStatusRecord.from_dict({**status, "active": "maybe"})
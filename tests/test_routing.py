@@ -0,0 +1,139 @@
+import re
+
+import pytest
+
+from smartbox.routing import PathRouter
+
+NODE_STATUS = r"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/status"
+
+
+@pytest.fixture
+def router():
+    router = PathRouter()
+    router.add(r"^/mgr/away_status", "away_status")
+    router.add(r"^/connected", "connected")
+    router.add(r"^/htr_system/(setup|power_limit)", "power_limit")
+    router.add(NODE_STATUS, "status")
+    router.add(r"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/setup", "setup")
+    router.add(r"^/acm/(?P<addr>\d+)/status$", "acm_status")
+    return router
+
+
+def test_router_literals(router):
+    assert router.match("/mgr/away_status") == [("away_status", {})]
+    assert router.match("/connected") == [("connected", {})]
+    assert router.match("/htr_system/setup") == [("power_limit", {})]
+    assert router.match("/htr_system/power_limit") == [("power_limit", {})]
+    assert router.match("/htr_system/other") == []
+    assert len(router) == 6
+
+
+def test_router_wildcards(router):
+    assert router.match("/htr/2/status") == [
+        ("status", {"node_type": "htr", "addr": "2"})
+    ]
+    assert router.match("/acm/3/status") == [
+        ("status", {"node_type": "acm", "addr": "3"}),
+        ("acm_status", {"addr": "3"}),
+    ]
+    assert router.match("/acm/3/setup") == [
+        ("setup", {"node_type": "acm", "addr": "3"})
+    ]
+    # Typed wildcards
+    assert router.match("/htr/x/status") == []
+    assert router.match("//1/status") == []
+
+
+def test_router_prefix_and_exact(router):
+    assert router.match("/acm/3/status/extra") == [
+        ("status", {"node_type": "acm", "addr": "3"})
+    ]
+    assert router.match("/connected/x") == [("connected", {})]
+    # Like re.search, the last segment of a route without $ is a prefix
+    assert router.match("/connectedx") == [("connected", {})]
+    assert router.match("/acm/3/statusX") == [
+        ("status", {"node_type": "acm", "addr": "3"})
+    ]
+    assert router.match("/acm/3/status/extra/x") == [
+        ("status", {"node_type": "acm", "addr": "3"})
+    ]
+    assert router.match("/acm/3/statusX/x") == [
+        ("status", {"node_type": "acm", "addr": "3"})
+    ]
+    assert router.match("/acm/3/statu") == []
+    assert router.match("connected") == []
+
+
+def test_router_decimal_digits(router):
+    # "²" is a digit for str.isdigit, but neither for \d nor int()
+    assert router.match("/htr/1²/status") == []
+    # ARABIC-INDIC DIGIT ONE is a decimal digit for both
+    assert router.match("/htr/\u0661/status") == [
+        ("status", {"node_type": "htr", "addr": "\u0661"})
+    ]
+
+
+@pytest.mark.parametrize(
+    "path_regex",
+    [
+        r"/status$",
+        r"^/htr.*/status",
+        r"^/(?P<addr>\d+)?",
+        re.compile("^/CONNECTED", re.IGNORECASE),
+    ],
+)
+def test_router_regex_fallback(path_regex):
+    router = PathRouter()
+    router.add(NODE_STATUS, "first")
+    router.add(path_regex, "regex")
+    router.add(NODE_STATUS, "last")
+    path = "/htr/1/status"
+    expected = re.compile(path_regex).search(path)
+    matches = router.match(path)
+    targets = [target for target, _ in matches]
+    if expected:
+        assert targets == ["first", "regex", "last"]
+        assert matches[1][1] == expected.groupdict()
+    else:
+        assert targets == ["first", "last"]
+    assert bool(router.match("/connected")) == bool(
+        re.compile(path_regex).search("/connected")
+    )
+
+
+def test_router_matches_regex_search():
+    patterns = [
+        NODE_STATUS,
+        r"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/version",
+        r"^/htr_system/(setup|power_limit)",
+        r"^/mgr/away_status",
+        r"^/connected",
+        r"^/acm/(?P<addr>\d+)",
+        r"^/pmo/(?P<addr>\d+)/samples$",
+    ]
+    router = PathRouter()
+    for pattern in patterns:
+        router.add(pattern, pattern)
+    for path in [
+        "/htr/0/status",
+        "/htr_mod/12/version",
+        "/htr_system/setup",
+        "/mgr/away_status",
+        "/pmo/3/samples",
+        "/pmo/3/samples/x",
+        "/mgr/nodes",
+        "/connected",
+        "/connectedness",
+        "/mgr/away_statusX",
+        "/htr/1/statusX",
+        "/htr/1²/status",
+        "/htr_system/setupX",
+        "/acm/12x/status",
+        "/acm/x12",
+        "/acm/",
+    ]:
+        assert router.match(path) == [
+            (pattern, re.search(pattern, path).groupdict())
+            for pattern in patterns
+            if re.search(pattern, path)
+        ]
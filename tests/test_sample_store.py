@@ -0,0 +1,110 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from smartbox.models import Samples
+from smartbox.sample_store import SampleStore
+from smartbox.session import AsyncSmartboxSession
+from tests.common import load_fixture
+
+HTR_NODE = {"name": "Node 1 0", "addr": 0, "type": "htr", "installed": True}
+PMO_NODE = {"name": "Node 1 3", "addr": 3, "type": "pmo", "installed": True}
+
+
+def _samples(t_values):
+    return [{"t": t, "temp": "20.5", "counter": t * 2} for t in t_values]
+
+
+@pytest.fixture
+def store():
+    store = SampleStore()
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def samples_session():
+    session = MagicMock(spec=AsyncSmartboxSession)
+    session.get_node_samples = AsyncMock()
+    return session
+
+
+def test_sample_store_add_and_query(store):
+    assert store.last_timestamp("device1", "htr", 0) is None
+    assert store.add_samples("device1", "htr", 0, _samples([0, 60, 120])) == 3
+    # overlapping samples are not stored twice
+    assert store.add_samples("device1", "htr", 0, _samples([120, 180])) == 1
+    assert store.add_samples("device1", "htr", 0, []) == 0
+    assert store.last_timestamp("device1", "htr", 0) == 180
+    assert store.query("device1", "htr", 0, start=60, end=180) == {
+        "samples": [
+            {"t": 60, "counter": 120.0, "temp": "20.5"},
+            {"t": 120, "counter": 240.0, "temp": "20.5"},
+        ]
+    }
+    assert store.query("device1", "htr", 1) == {"samples": []}
+
+
+def test_sample_store_query_columnar(store):
+    response = json.loads(load_fixture("devs/device1/pmo/3/samples.json"))
+    store.add_samples("device1", "pmo", 3, response["samples"])
+    columnar = store.query_columnar("device1", "pmo", 3)
+    assert columnar.is_pmo
+    assert list(columnar.max) == [2411.0, 2185.0]
+    store.add_samples("device1", "htr", 0, _samples([0, 60]))
+    columnar = store.query_columnar("device1", "htr", 0, start=60)
+    assert list(columnar.t) == [60]
+    assert list(columnar.temp) == [20.5]
+
+
+@pytest.mark.asyncio
+async def test_sample_store_sync(store, samples_session):
+    samples_session.get_node_samples.return_value = {
+        "samples": _samples([1000, 1060])
+    }
+    added = await store.sync(
+        samples_session, "device1", HTR_NODE, end_time=2000, initial_window=1500
+    )
+    assert added == 2
+    samples_session.get_node_samples.assert_awaited_once_with(
+        "device1", HTR_NODE, start_time=500, end_time=2000
+    )
+
+    # Only the new tail is fetched on the next sync
+    samples_session.get_node_samples.reset_mock()
+    samples_session.get_node_samples.return_value = Samples.model_validate(
+        {"samples": _samples([1120])}
+    )
+    added = await store.sync(
+        samples_session, "device1", HTR_NODE, end_time=3000
+    )
+    assert added == 1
+    samples_session.get_node_samples.assert_awaited_once_with(
+        "device1", HTR_NODE, start_time=1061, end_time=3000
+    )
+    assert store.last_timestamp("device1", "htr", 0) == 1120
+
+    # Nothing to fetch when already up to date
+    samples_session.get_node_samples.reset_mock()
+    assert (
+        await store.sync(samples_session, "device1", HTR_NODE, end_time=1100)
+        == 0
+    )
+    samples_session.get_node_samples.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_sample_store_persistence(tmp_path, samples_session):
+    path = tmp_path / "samples.db"
+    samples_session.get_node_samples.return_value = json.loads(
+        load_fixture("devs/device1/pmo/3/samples.json")
+    )
+    store = SampleStore(path)
+    await store.sync(samples_session, "device1", PMO_NODE, end_time=1738400000)
+    store.close()
+
+    store = SampleStore(path)
+    assert store.last_timestamp("device1", "pmo", 3) == 1738361700
+    assert len(store.query("device1", "pmo", 3)["samples"]) == 2
+    store.close()
@@ -0,0 +1,146 @@
+import json
+import math
+
+import pytest
+
+from smartbox.models import Samples
+from smartbox.samples import ColumnarSamples
+from tests.common import load_fixture
+
+
+def _load(path):
+    return json.loads(load_fixture(f"devs/{path}/samples.json"))
+
+
+def test_columnar_samples_from_response():
+    response = _load("device1/htr/0")
+    columnar = ColumnarSamples.from_response(response)
+    assert len(columnar) == len(response["samples"])
+    assert not columnar.is_pmo
+    assert columnar.t[0] == response["samples"][0]["t"]
+    assert columnar.temp[0] == float(response["samples"][0]["temp"])
+    assert columnar.min is None
+
+
+def test_columnar_samples_pmo():
+    response = _load("device1/pmo/3")
+    columnar = ColumnarSamples.from_response(response)
+    assert columnar.is_pmo
+    assert columnar.temp is None
+    assert list(columnar.max) == [2411.0, 2185.0]
+    assert list(columnar.counter) == [16612253.89, 16612548.73]
+    assert repr(columnar) == "ColumnarSamples(len=2, pmo=True)"
+
+
+@pytest.mark.parametrize("path", ["device1/htr/0", "device1/pmo/3"])
+def test_columnar_samples_from_samples(path):
+    response = _load(path)
+    from_model = ColumnarSamples.from_samples(Samples.model_validate(response))
+    from_response = ColumnarSamples.from_response(response)
+    assert from_model.t == from_response.t
+    assert from_model.counter == from_response.counter
+    assert from_model.temp == from_response.temp
+    assert from_model.max == from_response.max
+
+
+def test_columnar_samples_empty():
+    columnar = ColumnarSamples.from_response({"samples": []})
+    assert len(columnar) == 0
+    assert list(columnar.energy_deltas()) == []
+    assert columnar.total_energy() == 0
+
+
+def test_columnar_samples_energy_deltas():
+    columnar = ColumnarSamples.from_response(
+        {
+            "samples": [
+                {"t": 0, "temp": "20.0", "counter": 100},
+                {"t": 60, "temp": "20.5", "counter": 150},
+                {"t": 120, "temp": "21.0", "counter": 150},
+                # counter reset
+                {"t": 180, "temp": "21.0", "counter": 30},
+            ]
+        }
+    )
+    assert list(columnar.energy_deltas()) == [50.0, 0.0, 30.0]
+    assert columnar.total_energy() == 80.0
+
+
+def test_columnar_samples_between():
+    columnar = ColumnarSamples.from_response(
+        {
+            "samples": [
+                {"t": t, "temp": str(t / 10), "counter": t}
+                for t in range(0, 600, 60)
+            ]
+        }
+    )
+    window = columnar.between(120, 300)
+    assert list(window.t) == [120, 180, 240]
+    assert list(window.temp) == [12.0, 18.0, 24.0]
+    assert len(columnar.between(1000, 2000)) == 0
+
+
+def test_columnar_samples_to_numpy():
+    np = pytest.importorskip("numpy")
+    columnar = ColumnarSamples.from_response(_load("device1/htr/0"))
+    arrays = columnar.to_numpy()
+    assert set(arrays) == {"t", "counter", "temp"}
+    assert np.array_equal(arrays["t"], list(columnar.t))
+
+
+def _hourly_samples():
+    return ColumnarSamples.from_response(
+        {
+            "samples": [
+                {"t": 0, "temp": "20.0", "counter": 100},
+                {"t": 1800, "temp": "22.0", "counter": 150},
+                {"t": 3600, "temp": "21.0", "counter": 200},
+                # two hours without samples, then a counter reset
+                {"t": 14400, "temp": "18.0", "counter": 40},
+                {"t": 16200, "temp": "19.0", "counter": 60},
+            ]
+        }
+    )
+
+
+def test_columnar_samples_resample():
+    resampled = _hourly_samples().resample(3600)
+    assert len(resampled) == 3
+    assert list(resampled.t) == [0, 3600, 14400]
+    assert list(resampled.count) == [2, 1, 2]
+    assert list(resampled.temp_mean) == [21.0, 21.0, 18.5]
+    assert list(resampled.temp_min) == [20.0, 21.0, 18.0]
+    assert list(resampled.temp_max) == [22.0, 21.0, 19.0]
+    assert list(resampled.energy) == [50.0, 50.0, 60.0]
+    assert resampled.min is None
+
+
+def test_columnar_samples_resample_fill_gaps():
+    resampled = _hourly_samples().resample(3600, fill_gaps=True)
+    assert list(resampled.t) == [0, 3600, 7200, 10800, 14400]
+    assert list(resampled.count) == [2, 1, 0, 0, 2]
+    assert math.isnan(resampled.temp_mean[2])
+    assert sum(resampled.energy) == 160.0
+
+
+def test_columnar_samples_resample_offset():
+    resampled = _hourly_samples().resample(86400, offset=3600)
+    assert list(resampled.t) == [-82800, 3600]
+    assert list(resampled.count) == [2, 3]
+
+
+def test_columnar_samples_resample_pmo():
+    columnar = ColumnarSamples.from_response(_load("device1/pmo/3"))
+    resampled = columnar.resample(86400)
+    assert list(resampled.count) == [2]
+    assert list(resampled.min) == [164.0]
+    assert list(resampled.max) == [2411.0]
+    assert resampled.temp_mean is None
+    assert resampled.energy[0] == pytest.approx(294.84)
+
+
+def test_columnar_samples_resample_invalid_interval():
+    with pytest.raises(ValueError, match="must be positive"):
+        _hourly_samples().resample(0)
+    assert len(ColumnarSamples.from_response({"samples": []}).resample(60)) == 0
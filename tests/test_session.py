@@ -1,15 +1,22 @@
 import datetime
+from functools import partial
 import json
 import math
 from unittest.mock import AsyncMock, patch
 
 import aiohttp
 from aiohttp import ClientSession
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 import pytest
 
 from smartbox import APIUnavailableError, InvalidAuthError, SmartboxError
-from smartbox.models import DefaultNodeSetup, NodeSetup
+from smartbox.models import (
+    DefaultNodeSetup,
+    NodeProg,
+    NodeSetup,
+    ValidationMode,
+)
+from smartbox.records import NodeStatusRecord
 from smartbox.session import (
     _DEFAULT_BACKOFF_FACTOR,
     _DEFAULT_RETRY_ATTEMPTS,
@@ -96,11 +103,15 @@ async def test_get_node_status(async_smartbox_session, caplog):
                         mock_node,
                     )
                     assert status_model.act_duty == status["act_duty"]
-                with pytest.raises(ValidationError):
-                    mock_api_request.return_value = {
-                        "sync_status": "synced",
-                        "mode": "auto",
-                    }
+                with (
+                    pytest.raises(ValidationError),
+                    patch.object(
+                        async_smartbox_session,
+                        "_api_request_bytes",
+                        new_callable=AsyncMock,
+                        return_value=b'{"sync_status": "synced", "mode": "auto"}',
+                    ),
+                ):
                     await async_smartbox_session.get_node_status(
                         mock_device["dev_id"],
                         mock_node,
@@ -1000,6 +1011,63 @@ async def test_api_request_success(async_session):
         )
 
 
+@pytest.mark.asyncio
+async def test_api_request_bytes_success(async_session):
+    path = "test_path"
+    body = b'{"key": "value"}'
+
+    with (
+        patch.object(
+            async_session,
+            "check_refresh_auth",
+            new_callable=AsyncMock,
+        ) as mock_check_refresh_auth,
+        patch.object(
+            async_session.client,
+            "get",
+            new_callable=AsyncMock,
+        ) as mock_get,
+    ):
+        mock_response = AsyncMock()
+        mock_response.read = AsyncMock(return_value=body)
+        mock_get.return_value = mock_response
+
+        result = await async_session._api_request_bytes(path)
+        mock_check_refresh_auth.assert_called_once()
+        assert result == body
+        mock_response.json.assert_not_called()
+        mock_get.assert_called_once_with(
+            f"{async_session._api_host}/api/v2/{path}",
+            headers=async_session._headers,
+        )
+
+
+@pytest.mark.asyncio
+async def test_api_request_bytes_errors(async_session):
+    with (
+        patch.object(
+            async_session, "check_refresh_auth", new_callable=AsyncMock
+        ),
+        patch.object(
+            async_session.client,
+            "get",
+            new_callable=AsyncMock,
+        ) as mock_get,
+    ):
+        mock_get.side_effect = aiohttp.ClientConnectionError()
+        with pytest.raises(APIUnavailableError):
+            await async_session._api_request_bytes("test_path")
+
+        mock_get.side_effect = aiohttp.ClientResponseError(
+            request_info=None,
+            history=None,
+            status=500,
+            message="Internal Server Error",
+        )
+        with pytest.raises(SmartboxError):
+            await async_session._api_request_bytes("test_path")
+
+
 @pytest.mark.asyncio
 async def test_api_request_check_refresh_auth_called(async_session):
     path = "test_path"
@@ -1182,28 +1250,30 @@ async def test_check_refresh_auth_token_expired(async_session):
 async def test_get_devices_raw_response_false(async_smartbox_session):
     with patch.object(
         async_smartbox_session,
-        "_api_request",
+        "_api_request_bytes",
         new_callable=AsyncMock,
     ) as mock_api_request:
-        mock_api_request.return_value = {
-            "invited_to": [],
-            "devs": [
-                {
-                    "dev_id": "device1",
-                    "name": "Device 1",
-                    "product_id": "prod123",
-                    "fw_version": "1.0.0",
-                    "serial_id": "serial123",
-                },
-                {
-                    "dev_id": "device2",
-                    "name": "Device 2",
-                    "product_id": "prod123",
-                    "fw_version": "1.0.0",
-                    "serial_id": "serial123",
-                },
-            ],
-        }
+        mock_api_request.return_value = json.dumps(
+            {
+                "invited_to": [],
+                "devs": [
+                    {
+                        "dev_id": "device1",
+                        "name": "Device 1",
+                        "product_id": "prod123",
+                        "fw_version": "1.0.0",
+                        "serial_id": "serial123",
+                    },
+                    {
+                        "dev_id": "device2",
+                        "name": "Device 2",
+                        "product_id": "prod123",
+                        "fw_version": "1.0.0",
+                        "serial_id": "serial123",
+                    },
+                ],
+            }
+        ).encode()
         async_smartbox_session.raw_response = False
         devices = await async_smartbox_session.get_devices()
         assert devices.devs[0].dev_id == "device1"
@@ -1307,11 +1377,15 @@ async def test_get_node_setup(async_smartbox_session, caplog):
                 )
                 if isinstance(setup_model, DefaultNodeSetup):
                     assert setup_model.away_mode == setup["away_mode"]
-                with pytest.raises(ValidationError):
-                    mock_api_request.return_value = {
-                        "sync_status": "synced",
-                        "control_mode": 1,
-                    }
+                with (
+                    pytest.raises(ValidationError),
+                    patch.object(
+                        async_smartbox_session,
+                        "_api_request_bytes",
+                        new_callable=AsyncMock,
+                        return_value=b'{"sync_status": "synced", "control_mode": 1}',
+                    ),
+                ):
                     await async_smartbox_session.get_node_setup(
                         device_id=mock_device_id, node=mock_node
                     )
@@ -1473,3 +1547,193 @@ async def test_get_deviceconnected_status(async_smartbox_session):
             )
             assert nodes_model.connected == nodes["connected"]
             async_smartbox_session.raw_response = True
+
+
+@pytest.mark.asyncio
+async def test_get_node_prog(async_smartbox_session):
+    mock_node = {
+        "name": "Node 1 0",
+        "addr": 0,
+        "type": "htr",
+        "installed": True,
+    }
+    url = "devs/device1/htr/0/prog"
+    prog = await async_smartbox_session.get_node_prog("device1", mock_node)
+    assert prog == await fake_get_request(None, url)
+
+    async_smartbox_session.raw_response = False
+    prog_model = await async_smartbox_session.get_node_prog(
+        "device1", mock_node
+    )
+    assert isinstance(prog_model, NodeProg)
+    assert prog_model.slots_per_day == 24
+    assert prog_model.prog == prog["prog"]
+    async_smartbox_session.raw_response = True
+
+
+@pytest.mark.asyncio
+async def test_set_node_prog(async_smartbox_session):
+    mock_node = {
+        "name": "Node 1 0",
+        "addr": 0,
+        "type": "htr",
+        "installed": True,
+    }
+    current = NodeProg.model_validate(
+        await fake_get_request(None, "devs/device1/htr/0/prog")
+    )
+    with patch.object(
+        async_smartbox_session,
+        "_api_post",
+        new_callable=AsyncMock,
+    ) as mock_api_post:
+        # Same programme, nothing is posted
+        assert not await async_smartbox_session.set_node_prog(
+            "device1", mock_node, current.model_dump()
+        )
+        mock_api_post.assert_not_called()
+
+        days = list(current.days())
+        days[6] = bytes([1] * 24)
+        new_prog = NodeProg.from_days(days)
+        assert await async_smartbox_session.set_node_prog(
+            "device1", mock_node, new_prog
+        )
+        mock_api_post.assert_called_once_with(
+            data={"prog": new_prog.prog},
+            path="devs/device1/htr/0/prog",
+        )
+
+    # A programme with an extra slot isn't the same programme
+    current_prog = {"prog": [*current.prog, 0]}
+    with (
+        patch.object(
+            async_smartbox_session,
+            "get_node_prog",
+            new_callable=AsyncMock,
+            return_value=current_prog,
+        ),
+        patch.object(
+            async_smartbox_session,
+            "_api_post",
+            new_callable=AsyncMock,
+        ) as mock_api_post,
+    ):
+        assert await async_smartbox_session.set_node_prog(
+            "device1", mock_node, current
+        )
+        mock_api_post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_set_home_away_status(async_smartbox_session):
+    with patch.object(
+        async_smartbox_session,
+        "_api_post",
+        new_callable=AsyncMock,
+    ) as mock_api_post:
+        failures = await async_smartbox_session.set_home_away_status(
+            "home1", {"away": True, "enabled": None}
+        )
+        assert failures == {}
+        assert mock_api_post.call_count == 2
+        mock_api_post.assert_any_call(
+            data={"away": True}, path="devs/device1/mgr/away_status"
+        )
+        mock_api_post.assert_any_call(
+            data={"away": True}, path="devs/device2/mgr/away_status"
+        )
+
+
+@pytest.mark.asyncio
+async def test_set_home_power_limit_partial_failure(async_smartbox_session):
+    homes = await async_smartbox_session.get_grouped_devices()
+    error = SmartboxError("device offline")
+
+    async def fake_post(data, path):
+        if path.startswith("devs/device2/"):
+            raise error
+        return {}
+
+    with patch.object(
+        async_smartbox_session,
+        "_api_post",
+        new_callable=AsyncMock,
+        side_effect=fake_post,
+    ) as mock_api_post:
+        failures = await async_smartbox_session.set_home_power_limit(
+            homes[0], 1000
+        )
+        assert failures == {"device2": error}
+        mock_api_post.assert_any_call(
+            data={"power_limit": "1000"},
+            path="devs/device1/htr_system/power_limit",
+        )
+
+        mock_api_post.reset_mock()
+        assert (
+            await async_smartbox_session.set_home_power_limit(homes[1], 1000)
+            == {}
+        )
+        mock_api_post.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_set_home_away_status_unknown_home(async_smartbox_session):
+    with pytest.raises(SmartboxError, match="Home unknown not found"):
+        await async_smartbox_session.set_home_away_status("unknown", {})
+
+
+@pytest.mark.asyncio
+async def test_validation_modes(async_smartbox_session):
+    assert async_smartbox_session.validation_mode is ValidationMode.RAW
+    async_smartbox_session.raw_response = False
+    assert async_smartbox_session.validation_mode is ValidationMode.FULL
+    device_id = "device1"
+    node = (await async_smartbox_session.get_nodes(device_id))[0]
+    getters = [
+        async_smartbox_session.get_devices,
+        async_smartbox_session.get_homes,
+        async_smartbox_session.get_grouped_devices,
+        partial(async_smartbox_session.get_home_guests, "test_home"),
+        partial(async_smartbox_session.get_nodes, device_id),
+        partial(async_smartbox_session.get_device_connected, device_id),
+        partial(async_smartbox_session.get_device_away_status, device_id),
+        partial(async_smartbox_session.get_node_status, device_id, node),
+        partial(async_smartbox_session.get_node_setup, device_id, node),
+        partial(async_smartbox_session.get_node_samples, device_id, node),
+        partial(async_smartbox_session.get_node_prog, device_id, node),
+    ]
+    validated = [await getter() for getter in getters]
+    assert all(isinstance(result, BaseModel | list) for result in validated)
+    async_smartbox_session.validation_mode = ValidationMode.RAW
+    assert async_smartbox_session.raw_response
+    assert isinstance(
+        await async_smartbox_session.get_node_status(device_id, node), dict
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_node_status_compact(async_smartbox_session):
+    node = {"name": "Heater", "addr": 0, "type": "htr", "installed": True}
+    async_smartbox_session.compact_status = True
+    raw = await async_smartbox_session.get_node_status("device1", node)
+    assert isinstance(raw, dict)
+    async_smartbox_session.raw_response = False
+    record = await async_smartbox_session.get_node_status("device1", node)
+    assert isinstance(record, NodeStatusRecord)
+    assert record.node_type == "htr"
+    assert record.mtemp == float(raw["mtemp"])
+
+    # The payload is validated in full mode
+    body = json.dumps({**raw, "active": "false", "duty": "high"}).encode()
+    with (
+        patch.object(
+            async_smartbox_session,
+            "_api_request_bytes",
+            new_callable=AsyncMock,
+            return_value=body,
+        ),
+        pytest.raises(ValidationError),
+    ):
+        await async_smartbox_session.get_node_status("device1", node)
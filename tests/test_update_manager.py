@@ -1,14 +1,24 @@
+import asyncio
+import json
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from smartbox import dispatch
+from smartbox.dispatch import threaded
 from smartbox.session import AsyncSmartboxSession
 from smartbox.socket import SocketSession
 from smartbox.update_manager import (
+    ChangeTracker,
     DevDataSubscription,
+    NodeSectionSubscription,
     OptimisedJQMatcher,
+    UpdateManager,
     UpdateSubscription,
+    iter_dev_data_nodes,
 )
+from tests.common import load_fixture
 
 
 @pytest.fixture
@@ -82,7 +92,7 @@ def test_optimised_jq_matcher_repr_simple():
 
 
 def test_optimised_jq_matcher_repr_complex():
-    matcher = OptimisedJQMatcher(".complex | .nested")
+    matcher = OptimisedJQMatcher(".complex | map(.nested)")
     assert repr(matcher) == repr(matcher._compiled_jq)
 
 
@@ -92,10 +102,30 @@ def test_optimised_jq_matcher_str_simple():
 
 
 def test_optimised_jq_matcher_str_complex():
-    matcher = OptimisedJQMatcher(".complex | .nested")
+    matcher = OptimisedJQMatcher(".complex | map(.nested)")
     assert str(matcher) == str(matcher._compiled_jq)
 
 
+def test_optimised_jq_matcher_native():
+    matcher = OptimisedJQMatcher("(.nodes[] | {addr, type})?")
+    assert str(matcher) == (
+        "OptimisedJQMatcher('(.nodes[] | {addr, type})?', fast_path=True)"
+    )
+    assert list(matcher.match({"nodes": [{"addr": 1, "type": "htr"}]})) == [
+        {"addr": 1, "type": "htr"}
+    ]
+    assert list(matcher.match({})) == []
+    matcher = OptimisedJQMatcher(".body.connected")
+    assert list(matcher.match({"body": {"connected": True}})) == [True]
+    assert list(matcher.match({})) == [None]
+    with pytest.raises(
+        ValueError, match='Cannot index string with "connected"'
+    ):
+        matcher.match({"body": "text"})
+    with pytest.raises(ValueError, match="Cannot index array"):
+        matcher.match({"body": [True]})
+
+
 def test_dev_data_subscription_match():
     callback = MagicMock()
     subscription = DevDataSubscription(".data", callback)
@@ -130,10 +160,17 @@ def test_update_manager_subscribe_to_device_away_status(update_manager):
     callback.assert_called_once_with("away")
 
 
+def test_update_manager_non_decimal_addr(update_manager):
+    callback = MagicMock()
+    update_manager.subscribe_to_node_status(callback)
+    update_manager._update_cb({"path": "/htr/1²/status", "body": {}})
+    callback.assert_not_called()
+
+
 def test_update_manager_subscribe_to_node_status(update_manager):
     callback = MagicMock()
     update_manager.subscribe_to_node_status(callback)
-    assert len(update_manager._dev_data_subscriptions) == 1
+    assert len(update_manager._node_section_subscriptions) == 1
     assert len(update_manager._update_subscriptions) == 1
 
     # Test dev data callback
@@ -150,10 +187,24 @@ def test_update_manager_subscribe_to_node_status(update_manager):
     callback.assert_called_once_with("node_type", 1, {"key": "value"})
 
 
+def test_update_manager_node_status_invalid_addr(update_manager):
+    callback = MagicMock()
+    update_manager.subscribe_to_node_status(callback)
+    dev_data = {
+        "nodes": [
+            {"type": "htr", "addr": "x", "status": {"key": "bad"}},
+            {"type": "htr", "status": {"key": "missing"}},
+            {"type": "htr", "addr": 2, "status": {"key": "value"}},
+        ],
+    }
+    update_manager._dev_data_cb(dev_data)
+    callback.assert_called_once_with("htr", 2, {"key": "value"})
+
+
 def test_update_manager_subscribe_to_node_setup(update_manager):
     callback = MagicMock()
     update_manager.subscribe_to_node_setup(callback)
-    assert len(update_manager._dev_data_subscriptions) == 1
+    assert len(update_manager._node_section_subscriptions) == 1
     assert len(update_manager._update_subscriptions) == 1
 
     # Test dev data callback
@@ -226,11 +277,10 @@ def test_update_manager_subscribe_to_device_connected(update_manager):
     callback.assert_called_once_with(update_data["body"]["connected"])
 
 
-
 def test_update_manager_subscribe_to_node_version(update_manager):
     callback = MagicMock()
     update_manager.subscribe_to_node_version(callback)
-    assert len(update_manager._dev_data_subscriptions) == 1
+    assert len(update_manager._node_section_subscriptions) == 1
     assert len(update_manager._update_subscriptions) == 1
 
     # Test dev data callback
@@ -282,3 +332,516 @@ def test_update_manager_subscribe_to_node_version(update_manager):
             "uid": "test123",
         },
     )
+
+
+def test_update_manager_subscribe_to_node_status_model(update_manager):
+    callback = MagicMock()
+    other_callback = MagicMock()
+    update_manager.subscribe_to_node_status_model(callback)
+    update_manager.subscribe_to_node_status_model(other_callback)
+    assert len(update_manager._update_subscriptions) == 1
+
+    status = json.loads(load_fixture("devs/device1/htr/0/status.json"))
+    update_manager._dev_data_cb(
+        {"nodes": [{"type": "htr", "addr": 0, "status": status}]}
+    )
+    model = update_manager.node_states.status("htr", 0)
+    callback.assert_called_once_with("htr", 0, model)
+    other_callback.assert_called_once_with("htr", 0, model)
+
+    callback.reset_mock()
+    update_manager._update_cb(
+        {"path": "/htr/0/status", "body": {"stemp": "25.0"}}
+    )
+    callback.assert_called_once_with("htr", 0, model)
+    assert model.stemp == "25.0"
+
+    # Invalid updates are logged and not passed on
+    callback.reset_mock()
+    update_manager._update_cb({"path": "/htr/0/status", "body": {"duty": "x"}})
+    callback.assert_not_called()
+
+
+def test_update_manager_subscribe_to_node_setup_model(update_manager):
+    callback = MagicMock()
+    update_manager.subscribe_to_node_setup_model(callback)
+    setup = json.loads(load_fixture("devs/device1/pmo/3/setup.json"))
+    update_manager._update_cb({"path": "/pmo/3/setup", "body": setup})
+    model = update_manager.node_states.setup("pmo", 3)
+    callback.assert_called_once_with("pmo", 3, model)
+    update_manager._update_cb(
+        {"path": "/pmo/3/setup", "body": {"power_limit": 500}}
+    )
+    assert model.power_limit == 500
+
+
+def test_iter_dev_data_nodes():
+    nodes = [{"addr": 0}, {"addr": 1}, "text", {"addr": 2}]
+    assert list(iter_dev_data_nodes({"nodes": nodes})) == nodes[:2]
+    assert list(iter_dev_data_nodes({"nodes": {"a": {"addr": 0}}})) == [
+        {"addr": 0}
+    ]
+    assert list(iter_dev_data_nodes({"nodes": None})) == []
+    assert list(iter_dev_data_nodes({})) == []
+
+
+def test_update_manager_dev_data_nodes_single_pass(update_manager):
+    calls = []
+    update_manager.subscribe_to_node_status(
+        lambda *args: calls.append(("status", *args))
+    )
+    update_manager.subscribe_to_node_setup(
+        lambda *args: calls.append(("setup", *args))
+    )
+    update_manager.subscribe_to_node_version(
+        lambda *args: calls.append(("version", *args))
+    )
+    nodes = [
+        {"type": "htr", "addr": "0", "status": {"mtemp": "19"}, "setup": {}},
+        {"type": "acm", "addr": 1, "version": {"fw_version": "1"}},
+    ]
+    update_manager._dev_data_cb({"nodes": nodes})
+    assert calls == [
+        ("status", "htr", 0, {"mtemp": "19"}),
+        ("setup", "htr", 0, {}),
+        ("version", "htr", 0, None),
+        ("status", "acm", 1, None),
+        ("setup", "acm", 1, None),
+        ("version", "acm", 1, {"fw_version": "1"}),
+    ]
+
+
+def test_node_section_subscription_match():
+    callback = MagicMock()
+    subscription = NodeSectionSubscription("setup", callback)
+    assert subscription.section == "setup"
+    subscription.match(
+        {"nodes": [{"type": "htr", "addr": 2, "setup": {}}, {"addr": 3}]}
+    )
+    callback.assert_called_once_with("htr", 2, {})
+
+
+def test_update_manager_subscribe_to_node(update_manager):
+    callback = MagicMock()
+    other_callback = MagicMock()
+    update_manager.subscribe_to_node("acm", 3, "status", callback)
+    update_manager.subscribe_to_node(
+        "acm", 4, "status", other_callback, fields=["mtemp", "stemp"]
+    )
+
+    update_manager._update_cb({"path": "/acm/3/status", "body": {"mtemp": "1"}})
+    callback.assert_called_once_with("acm", 3, {"mtemp": "1"})
+    other_callback.assert_not_called()
+
+    callback.reset_mock()
+    update_manager._update_cb(
+        {"path": "/acm/4/status", "body": {"mtemp": "2", "mode": "auto"}}
+    )
+    callback.assert_not_called()
+    other_callback.assert_called_once_with("acm", 4, {"mtemp": "2"})
+
+    # Updates without the fields of interest don't wake the callback
+    other_callback.reset_mock()
+    update_manager._update_cb(
+        {"path": "/acm/4/status", "body": {"mode": "off"}}
+    )
+    update_manager._update_cb({"path": "/acm/4/setup", "body": {"mtemp": "3"}})
+    update_manager._update_cb({"path": "/htr/4/status", "body": {"mtemp": "3"}})
+    other_callback.assert_not_called()
+
+
+def test_update_manager_subscribe_to_node_dev_data(update_manager):
+    callback = MagicMock()
+    update_manager.subscribe_to_node(
+        "htr", 1, "setup", callback, fields=["units"]
+    )
+    update_manager._dev_data_cb(
+        {
+            "nodes": [
+                {"type": "htr", "addr": 0, "setup": {"units": "C"}},
+                {"type": "htr", "addr": "1", "setup": {"units": "F", "x": 1}},
+                {"type": "htr", "addr": None},
+                {"type": "acm", "addr": 1, "setup": {"units": "C"}},
+            ]
+        }
+    )
+    callback.assert_called_once_with("htr", 1, {"units": "F"})
+
+
+async def test_update_manager_async_callbacks(update_manager):
+    callback = AsyncMock()
+    sync_callback = MagicMock()
+    update_manager.subscribe_to_node_status(callback)
+    update_manager.subscribe_to_node_status(sync_callback)
+
+    assert (
+        update_manager._update_cb(
+            {"path": "/htr/1/status", "body": {"mtemp": "1"}}
+        )
+        is None
+    )
+    update_manager._dev_data_cb(
+        {"nodes": [{"type": "acm", "addr": 2, "status": {"mtemp": "2"}}]}
+    )
+    sync_callback.assert_called_with("acm", 2, {"mtemp": "2"})
+    callback.assert_not_awaited()
+
+    await update_manager.join_callbacks()
+    assert callback.await_args_list == [
+        (("htr", 1, {"mtemp": "1"}),),
+        (("acm", 2, {"mtemp": "2"}),),
+    ]
+    # Dev data and updates share the queue of the subscriber
+    (stats,) = update_manager.callback_queue_stats
+    assert stats.delivered == 2
+    with patch.object(update_manager.socket_session, "cancel", AsyncMock()):
+        await update_manager.cancel()
+
+
+async def test_update_manager_async_callbacks_backpressure(mock_session):
+    release = asyncio.Event()
+
+    async def callback(data):
+        await release.wait()
+
+    update_manager = UpdateManager(mock_session, "device_id", 2)
+    update_manager.subscribe_to_device_away_status(callback)
+    assert (
+        update_manager._update_cb(
+            {"path": "/mgr/away_status", "body": {"away": True}}
+        )
+        is None
+    )
+    backpressure = update_manager._update_cb(
+        {"path": "/mgr/away_status", "body": {"away": False}}
+    )
+    assert backpressure is not None
+    release.set()
+    await asyncio.wait_for(backpressure, 1)
+    await update_manager.join_callbacks()
+    assert update_manager.callback_queue_stats[0].delivered == 2
+    with patch.object(update_manager.socket_session, "cancel", AsyncMock()):
+        await update_manager.cancel()
+
+
+async def test_update_manager_async_callbacks_coalesce(mock_session):
+    callback = AsyncMock()
+    update_manager = UpdateManager(
+        mock_session, "device_id", overflow_policy="coalesce"
+    )
+    update_manager.subscribe_to_dev_data(".nodes[]", callback)
+    for mtemp in ("1", "2"):
+        update_manager._dev_data_cb(
+            {
+                "nodes": [
+                    {"type": "htr", "addr": 1, "status": {"mtemp": mtemp}},
+                    {"type": "htr", "addr": 2, "status": {"mtemp": mtemp}},
+                ]
+            }
+        )
+    await update_manager.join_callbacks()
+    # The calls for a node replace each other, not those of other nodes
+    assert [call.args[0]["addr"] for call in callback.await_args_list] == [
+        1,
+        2,
+    ]
+    assert all(
+        call.args[0]["status"] == {"mtemp": "2"}
+        for call in callback.await_args_list
+    )
+    with patch.object(update_manager.socket_session, "cancel", AsyncMock()):
+        await update_manager.cancel()
+
+
+async def test_update_manager_threaded_callbacks(mock_session):
+    threads = []
+
+    def callback(node_type, addr, data):
+        threads.append(threading.current_thread())
+
+    update_manager = UpdateManager(
+        mock_session, "device_id", executor_workers=2
+    )
+    update_manager.subscribe_to_node_status(threaded(callback))
+    update_manager._update_cb({"path": "/htr/1/status", "body": {"mtemp": "1"}})
+    update_manager._dev_data_cb(
+        {"nodes": [{"type": "acm", "addr": 2, "status": {"mtemp": "2"}}]}
+    )
+    await update_manager.join_callbacks()
+    assert len(threads) == 2
+    assert threading.current_thread() not in threads
+    with patch.object(update_manager.socket_session, "cancel", AsyncMock()):
+        await update_manager.cancel()
+
+
+async def test_update_manager_threaded_device_callbacks_keep_order(
+    mock_session, monkeypatch
+):
+    # Each origin gets its own lane, the dev data call blocks its lane
+    origins = {}
+    origin = dispatch._origin
+    monkeypatch.setattr(
+        dispatch,
+        "_origin",
+        lambda args: origins.setdefault(origin(args), len(origins)),
+    )
+    release = threading.Event()
+    received = []
+
+    def callback(away_status):
+        if not away_status["away"]:
+            release.wait(1)
+        received.append(away_status)
+
+    update_manager = UpdateManager(
+        mock_session, "device_id", executor_workers=2
+    )
+    update_manager.subscribe_to_device_away_status(threaded(callback))
+    update_manager._dev_data_cb({"away_status": {"away": False}})
+    update_manager._update_cb(
+        {"path": "/mgr/away_status", "body": {"away": True}}
+    )
+    await asyncio.sleep(0.05)
+    release.set()
+    await update_manager.join_callbacks()
+    # The dev data and the update share a lane
+    assert len(origins) == 1
+    assert received == [{"away": False}, {"away": True}]
+    with patch.object(update_manager.socket_session, "cancel", AsyncMock()):
+        await update_manager.cancel()
+
+
+async def test_update_manager_threaded_model_callbacks(mock_session):
+    received = []
+    update_manager = UpdateManager(mock_session, "device_id")
+    update_manager.subscribe_to_node_status_model(
+        threaded(lambda _node_type, _addr, status: received.append(status))
+    )
+    status = json.loads(load_fixture("devs/device1/htr/0/status.json"))
+    update_manager._dev_data_cb(
+        {"nodes": [{"type": "htr", "addr": 0, "status": status}]}
+    )
+    update_manager._update_cb(
+        {"path": "/htr/0/status", "body": {"stemp": "25.0"}}
+    )
+    await update_manager.join_callbacks()
+    # Threads get copies, not the model updated in the event loop
+    model = update_manager.node_states.status("htr", 0)
+    assert all(status is not model for status in received)
+    assert [status.stemp for status in received] == [status["stemp"], "25.0"]
+    with patch.object(update_manager.socket_session, "cancel", AsyncMock()):
+        await update_manager.cancel()
+
+
+async def test_update_manager_coalesce_updates(mock_session):
+    update_manager = UpdateManager(
+        mock_session, "device_id", coalesce_interval=0.01
+    )
+    status_callback = MagicMock()
+    setup_callback = MagicMock()
+    update_manager.subscribe_to_node_status(status_callback)
+    update_manager.subscribe_to_node_setup(setup_callback)
+
+    update_manager._update_cb({"path": "/htr/1/status", "body": {"mtemp": "1"}})
+    update_manager._update_cb(
+        {"path": "/htr/1/setup", "body": {"factory_options": {"a": 1}}}
+    )
+    update_manager._update_cb(
+        {"path": "/htr/1/status", "body": {"mtemp": "2", "stemp": "3"}}
+    )
+    update_manager._update_cb(
+        {"path": "/htr/1/setup", "body": {"factory_options": {"b": 2}}}
+    )
+    update_manager._update_cb({"path": "/htr/2/status", "body": {"mtemp": "4"}})
+    status_callback.assert_not_called()
+    assert update_manager.coalesced_updates == 2
+
+    await asyncio.sleep(0.05)
+    assert status_callback.call_args_list == [
+        (("htr", 1, {"mtemp": "2", "stemp": "3"}),),
+        (("htr", 2, {"mtemp": "4"}),),
+    ]
+    setup_callback.assert_called_once_with(
+        "htr", 1, {"factory_options": {"a": 1, "b": 2}}
+    )
+
+    # A new tick starts with the next update
+    update_manager._update_cb({"path": "/htr/1/status", "body": {"mtemp": "5"}})
+    update_manager.flush_updates()
+    status_callback.assert_called_with("htr", 1, {"mtemp": "5"})
+
+
+async def test_update_manager_coalesce_callback_error(mock_session, caplog):
+    update_manager = UpdateManager(
+        mock_session, "device_id", coalesce_interval=0.01
+    )
+    callback = MagicMock(side_effect=[RuntimeError("boom"), None])
+    update_manager.subscribe_to_node_status(callback)
+    update_manager._update_cb({"path": "/htr/1/status", "body": {"mtemp": "1"}})
+    update_manager._update_cb({"path": "/htr/2/status", "body": {"mtemp": "2"}})
+    await asyncio.sleep(0.05)
+    # The update after the failing one is still dispatched
+    assert callback.call_count == 2
+    callback.assert_called_with("htr", 2, {"mtemp": "2"})
+    assert "Error dispatching update" in caplog.text
+
+
+async def test_update_manager_coalesce_flushed_before_dev_data(mock_session):
+    update_manager = UpdateManager(
+        mock_session, "device_id", coalesce_interval=1
+    )
+    calls = []
+    update_manager.subscribe_to_node_status(
+        lambda node_type, addr, data: calls.append(data)
+    )
+    update_manager._update_cb({"path": "/htr/1/status", "body": {"mtemp": "1"}})
+    update_manager._dev_data_cb(
+        {"nodes": [{"type": "htr", "addr": 1, "status": {"mtemp": "2"}}]}
+    )
+    assert calls == [{"mtemp": "1"}, {"mtemp": "2"}]
+    assert update_manager._flush_handle is None
+
+
+def test_update_manager_device_state(update_manager):
+    update_manager._dev_data_cb(
+        {
+            "connected": True,
+            "nodes": [{"type": "htr", "addr": 1, "status": {"mtemp": "1"}}],
+        }
+    )
+    update_manager._update_cb({"path": "/htr/1/status", "body": {"stemp": "2"}})
+    state = update_manager.device_state
+    assert state.node_status("htr", 1) == {"mtemp": "1", "stemp": "2"}
+    assert state.revision("htr", 1) == 2
+    assert state.connected is True
+
+
+def test_change_tracker():
+    tracker = ChangeTracker()
+    assert tracker.changes("a", {"mtemp": "1", "opts": {"x": 1}}) == {
+        "mtemp": (None, "1"),
+        "opts": (None, {"x": 1}),
+    }
+    assert tracker.changes("a", {"mtemp": "1"}) is None
+    assert tracker.changes("a", {"opts": {"x": 1}}) is None
+    assert tracker.changes("a", {"mtemp": "2", "opts": {"y": 2}}) == {
+        "mtemp": ("1", "2"),
+        "opts": ({"x": 1}, {"x": 1, "y": 2}),
+    }
+    # Keys are tracked separately
+    assert tracker.changes("b", {"mtemp": "2"}) == {"mtemp": (None, "2")}
+    assert tracker.changes("c", True) == (None, True)
+    assert tracker.changes("c", True) is None
+    assert tracker.changes("c", False) == (True, False)
+
+
+def test_update_subscription_changes_only():
+    callback = MagicMock()
+    subscription = UpdateSubscription(
+        r"^/(?P<node_type>[^/]+)/(?P<addr>\d+)/status",
+        ".body",
+        callback,
+        changes_only=True,
+    )
+    update = {"path": "/htr/1/status", "body": {"mtemp": "1", "stemp": "2"}}
+    assert subscription.match(update)
+    callback.assert_called_once_with(
+        {"mtemp": "1", "stemp": "2"},
+        changes={"mtemp": (None, "1"), "stemp": (None, "2")},
+        node_type="htr",
+        addr="1",
+    )
+    callback.reset_mock()
+    subscription.match(update)
+    subscription.match({"path": "/htr/1/status", "body": {"stemp": "2"}})
+    callback.assert_not_called()
+    subscription.match({"path": "/htr/2/status", "body": {"stemp": "2"}})
+    subscription.match({"path": "/htr/1/status", "body": {"stemp": "3"}})
+    assert callback.call_args_list == [
+        (
+            ({"stemp": "2"},),
+            {
+                "changes": {"stemp": (None, "2")},
+                "node_type": "htr",
+                "addr": "2",
+            },
+        ),
+        (
+            ({"stemp": "3"},),
+            {"changes": {"stemp": ("2", "3")}, "node_type": "htr", "addr": "1"},
+        ),
+    ]
+
+
+def test_update_manager_changes_only_many_nodes(update_manager):
+    dev_data_callback = MagicMock()
+    update_callback = MagicMock()
+    update_manager.subscribe_to_dev_data(
+        ".nodes[] | .status", dev_data_callback, changes_only=True
+    )
+    update_manager.subscribe_to_updates(
+        r"^/htr/\d+/status", ".body", update_callback, changes_only=True
+    )
+    update_manager._dev_data_cb(
+        {
+            "nodes": [
+                {"type": "htr", "addr": 1, "status": {"mtemp": "1"}},
+                {"type": "htr", "addr": 2, "status": {"mtemp": "2"}},
+            ]
+        }
+    )
+    update_manager._dev_data_cb(
+        {
+            "nodes": [
+                {"type": "htr", "addr": 1, "status": {"mtemp": "1"}},
+                {"type": "htr", "addr": 2, "status": {"mtemp": "3"}},
+            ]
+        }
+    )
+    # Each node is compared with its own last value
+    assert dev_data_callback.call_args_list == [
+        (({"mtemp": "1"},), {"changes": {"mtemp": (None, "1")}}),
+        (({"mtemp": "2"},), {"changes": {"mtemp": (None, "2")}}),
+        (({"mtemp": "3"},), {"changes": {"mtemp": ("2", "3")}}),
+    ]
+
+    for addr, mtemp in ((1, "1"), (2, "2"), (1, "1"), (2, "4")):
+        update_manager._update_cb(
+            {"path": f"/htr/{addr}/status", "body": {"mtemp": mtemp}}
+        )
+    assert update_callback.call_args_list == [
+        (({"mtemp": "1"},), {"changes": {"mtemp": (None, "1")}}),
+        (({"mtemp": "2"},), {"changes": {"mtemp": (None, "2")}}),
+        (({"mtemp": "4"},), {"changes": {"mtemp": ("2", "4")}}),
+    ]
+
+
+def test_update_manager_changes_only(update_manager):
+    connected_callback = MagicMock()
+    node_callback = MagicMock()
+    update_manager.subscribe_to_dev_data(
+        ".connected", connected_callback, changes_only=True
+    )
+    update_manager.subscribe_to_node(
+        "acm", 2, "status", node_callback, ["mtemp"], changes_only=True
+    )
+    dev_data = {
+        "connected": True,
+        "nodes": [{"type": "acm", "addr": 2, "status": {"mtemp": "1"}}],
+    }
+    update_manager._dev_data_cb(dev_data)
+    update_manager._dev_data_cb(dev_data)
+    connected_callback.assert_called_once_with(True, changes=(None, True))
+    node_callback.assert_called_once_with(
+        "acm", 2, {"mtemp": "1"}, changes={"mtemp": (None, "1")}
+    )
+
+    node_callback.reset_mock()
+    update_manager._update_cb(
+        {"path": "/acm/2/status", "body": {"mtemp": "1", "stemp": "5"}}
+    )
+    node_callback.assert_not_called()
+    update_manager._update_cb({"path": "/acm/2/status", "body": {"mtemp": "3"}})
+    node_callback.assert_called_once_with(
+        "acm", 2, {"mtemp": "3"}, changes={"mtemp": ("1", "3")}
+    )